@@ -1,5 +1,4 @@
-from typing import Literal, Optional, Any
-from dataclasses import dataclass
+from typing import Iterable, Literal, Optional, Any, List, Tuple
 
 
 High = Literal[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
@@ -9,68 +8,110 @@ HIGH_HASH = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
 SUIT_HASH = ["c", "d", "h", "s"]
 SUIT_SYMBOL = ["♣", "♦", "♥", "♠"]
 
+FULL_DECK_MASK = (1 << 52) - 1
+
 
-@dataclass
 class Card:
-    """Class representing playing cards"""
+    """Class representing playing cards.
+    The 52 cards are preallocated: every constructor call returns
+    the shared (immutable) instance of the requested card"""
+
+    __slots__ = ("id", "high", "suit", "hash", "key", "mask")
 
-    def __init__(
-        self,
+    def __new__(
+        cls,
         id: Optional[int] = None,
         high: Optional[High] = None,
         suit: Optional[Suit] = None,
         card_hash: Optional[str] = None,
     ):
         if id is not None:
-            self.id = id
-            self.high = id % 13
-            self.suit = int(float(id - self.high) / 13)
+            if 0 <= id < 52:
+                return CARDS[id]
         elif high is not None and suit is not None:
-            self.high = high
-            self.suit = suit
-            self.id = self.high + self.suit * 13
+            if 0 <= high < 13 and 0 <= suit < 4:
+                return CARDS[high + suit * 13]
         elif card_hash is not None:
-            self.high = HIGH_HASH.index(card_hash[0])
-            self.suit = SUIT_HASH.index(card_hash[1])
-            self.id = self.high + self.suit * 13
-        else:
-            raise ValueError("Wrong arguments for Card object")
+            if card_hash in _CARDS_BY_HASH:
+                return _CARDS_BY_HASH[card_hash]
+        raise ValueError("Wrong arguments for Card object")
+
+    @classmethod
+    def _create(cls, id: int) -> "Card":
+        card = object.__new__(cls)
+        high = id % 13
+        suit = id // 13
+        object.__setattr__(card, "id", id)
+        object.__setattr__(card, "high", high)
+        object.__setattr__(card, "suit", suit)
+        object.__setattr__(card, "hash", f"{HIGH_HASH[high]}{SUIT_HASH[suit]}")
+        # ordering key: by high first, then by suit
+        object.__setattr__(card, "key", 4 * high + suit)
+        # bit of the card in a 52 bits card set
+        object.__setattr__(card, "mask", 1 << id)
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card objects are immutable")
 
-    @property
-    def hash(self) -> str:
-        "Compute a hash of a card"
-        return f"{HIGH_HASH[self.high]}{SUIT_HASH[self.suit]}"
+    def __delattr__(self, name):
+        raise AttributeError("Card objects are immutable")
+
+    def __reduce__(self):
+        return (Card, (self.id,))
+
+    def __hash__(self):
+        return self.id
 
     def __str__(self):
         return f"{HIGH_HASH[self.high]}{SUIT_SYMBOL[self.suit]}"
 
+    def __repr__(self):
+        return f"Card({self.hash})"
+
     def __le__(self, card):
-        if self.high < card.high or (self.high == card.high and self.suit <= card.suit):
-            return True
-        return False
+        return self.key <= card.key
 
     def __lt__(self, card):
-        if self.high < card.high or (self.high == card.high and self.suit < card.suit):
-            return True
-        return False
+        return self.key < card.key
 
     def __ge__(self, card):
-        if self.high > card.high or (self.high == card.high and self.suit >= card.suit):
-            return True
-        return False
+        return self.key >= card.key
 
     def __gt__(self, card):
-        if self.high > card.high or (self.high == card.high and self.suit > card.suit):
-            return True
-        return False
+        return self.key > card.key
 
     def __eq__(self, card):
-        if self.high == card.high and self.suit == card.suit:
-            return True
-        return False
+        if isinstance(card, Card):
+            return self.id == card.id
+        return NotImplemented
+
+    def __ne__(self, card):
+        if isinstance(card, Card):
+            return self.id != card.id
+        return NotImplemented
 
     def is_in(self, hand: Any):
-        for card in hand.cards:
-            if self.id == card.id:
-                return True
-        return False
+        return bool(hand.mask & self.mask)
+
+
+CARDS: Tuple[Card, ...] = tuple(Card._create(card_id) for card_id in range(52))
+_CARDS_BY_HASH = {card.hash: card for card in CARDS}
+
+
+def cards_mask(cards: Iterable[Card]) -> int:
+    """Return the 52 bits mask of a set of cards"""
+    mask = 0
+    for card in cards:
+        mask |= card.mask
+    return mask
+
+
+def mask_ids(mask: int) -> List[int]:
+    """Return the ids of the cards of a mask, in increasing order"""
+    return [card_id for card_id in range(52) if mask >> card_id & 1]
+
+
+def mask_cards(mask: int) -> List[Card]:
+    """Return the cards of a mask, in increasing id order"""
+    return [CARDS[card_id] for card_id in mask_ids(mask)]
@@ -0,0 +1,138 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List
+import os
+
+import numpy as np
+
+from poqrl.hand.decoding import hand_combinations
+from poqrl.hand.enumeration import CombinationEnumerator
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.types.combination import Combination
+
+CHECKSUM_MASK = (1 << 64) - 1
+
+# number of hands of each combination, from the poker literature
+REFERENCE_COMBINATION_COUNTS = {
+    5: (1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 40),
+    7: (
+        23294460,
+        58627800,
+        31433400,
+        6461620,
+        6180020,
+        4047644,
+        3473184,
+        224848,
+        41584,
+    ),
+}
+# number of distinct values and checksum of the values of every hand, on the
+# value scale of Hand.value. It differs from the 7462 (resp. 4824) classes of the
+# literature: 3 flush values are equal to full house values, and the 7 cards
+# two pairs hands take 818 values instead of 763
+REFERENCE_N_VALUES = {5: 7459, 7: 4876}
+REFERENCE_CHECKSUMS = {5: 0x1D1C7A3C182CD35C, 7: 0xD45C0554C9155750}
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """Hash values into uncorrelated 64 bits integers (splitmix64 finalizer),
+    such that the sum of the hashes detects a value swapped for another"""
+    mixed = values.astype(np.uint64)
+    mixed ^= mixed >> np.uint64(30)
+    mixed *= np.uint64(0xBF58476D1CE4E5B9)
+    mixed ^= mixed >> np.uint64(27)
+    mixed *= np.uint64(0x94D049BB133111EB)
+    mixed ^= mixed >> np.uint64(31)
+    return mixed
+
+
+@dataclass
+class Census:
+    """Statistics of the values of every hand of a given size.
+    The checksum is the sum (modulo 2**64) of the hashed values,
+    so censuses of disjoint hands are merged in any order"""
+
+    n_cards: int
+    n_hands: int = 0
+    combination_counts: np.ndarray = field(
+        default_factory=lambda: np.zeros(len(Combination), dtype=np.int64)
+    )
+    value_counts: Dict[int, int] = field(default_factory=dict)
+    checksum: int = 0
+
+    def add(self, other: "Census") -> "Census":
+        """Merge the census of other hands into this one"""
+        self.n_hands += other.n_hands
+        self.combination_counts += other.combination_counts
+        for value, count in other.value_counts.items():
+            self.value_counts[value] = self.value_counts.get(value, 0) + count
+        self.checksum = (self.checksum + other.checksum) & CHECKSUM_MASK
+        return self
+
+    def mismatches(self) -> List[str]:
+        """Compare the census to the reference counts of its hand size
+        Returns:
+            a description of every difference, empty if the census is correct"""
+        errors = []
+        reference_counts = REFERENCE_COMBINATION_COUNTS.get(self.n_cards)
+        if reference_counts is None:
+            return [f"No reference census for {self.n_cards} cards hands"]
+        if self.n_hands != sum(reference_counts):
+            errors.append(f"{self.n_hands} hands instead of {sum(reference_counts)}")
+        for combination, count, expected in zip(
+            Combination, self.combination_counts, reference_counts
+        ):
+            if count != expected:
+                errors.append(f"{count} {combination.label} instead of {expected}")
+        if len(self.value_counts) != REFERENCE_N_VALUES[self.n_cards]:
+            errors.append(
+                f"{len(self.value_counts)} distinct values "
+                f"instead of {REFERENCE_N_VALUES[self.n_cards]}"
+            )
+        if self.checksum != REFERENCE_CHECKSUMS[self.n_cards]:
+            errors.append(
+                f"Checksum {self.checksum:#018x} "
+                f"instead of {REFERENCE_CHECKSUMS[self.n_cards]:#018x}"
+            )
+        return errors
+
+
+def block_census(card_ids: np.ndarray) -> Census:
+    """Census of an array of hands of shape (N, n_cards)"""
+    values = evaluate_batch(card_ids)
+    combinations = hand_combinations(card_ids, values)
+    unique_values, counts = np.unique(values, return_counts=True)
+    return Census(
+        n_cards=card_ids.shape[1],
+        n_hands=len(values),
+        combination_counts=np.bincount(combinations, minlength=len(Combination)),
+        value_counts=dict(zip(unique_values.tolist(), counts.tolist())),
+        checksum=int(_mix(values).sum(dtype=np.uint64)),
+    )
+
+
+def range_census(n_cards: int, start: int, stop: int) -> Census:
+    """Census of the hands of ranks in [start, stop)"""
+    census = Census(n_cards)
+    for card_ids in CombinationEnumerator(n_cards).blocks(start, stop):
+        census.add(block_census(card_ids))
+    return census
+
+
+def hand_census(n_cards: int = 7, n_workers: int | None = None) -> Census:
+    """Evaluate every hand of n_cards cards, split by ranges of combination
+    ranks across a process pool"""
+    enumerator = CombinationEnumerator(n_cards)
+    if n_workers == 1:
+        return range_census(n_cards, 0, len(enumerator))
+    census = Census(n_cards)
+    n_chunks = 4 * (n_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(range_census, n_cards, start, stop)
+            for start, stop in enumerator.split(n_chunks)
+        ]
+        for future in futures:
+            census.add(future.result())
+    return census
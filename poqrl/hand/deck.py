@@ -1,34 +1,84 @@
-import random
-from typing import Optional, List
-from poqrl.hand.card import Card
+from typing import Optional, List, Tuple
 
-random.seed(77)
+import numpy as np
+
+from poqrl.hand.card import Card, CARDS, FULL_DECK_MASK, cards_mask
+from poqrl.hand.utils import Seed, default_seed
+
+UNIFORM_BLOCK_SIZE = 64
 
 
 class Deck:
-    def __init__(self, distributed_cards: Optional[List[Card]] = None):
-        self.deck = []
+    """Deck of cards dealt by a lazy Fisher-Yates shuffle: each distributed
+    card is drawn among the remaining ones when it is dealt, so the cost of
+    a hand is proportional to the number of cards dealt.
+    Each deck draws from its own generator, such that several decks
+    (e.g. parallel tables) give independent and reproducible deals.
+    Without seed, the generator is seeded by 'default_seed'"""
+
+    def __init__(
+        self, distributed_cards: Optional[List[Card]] = None, seed: Seed = None
+    ):
         if distributed_cards:
             self.ditributed_cards = distributed_cards
         else:
             self.ditributed_cards = []
+        self.rng = np.random.default_rng(default_seed() if seed is None else seed)
+
+        self.distributed_mask = cards_mask(self.ditributed_cards)
+        # card ids: the distributed ones first, then the ones to distribute
+        self._card_ids = [card.id for card in self.ditributed_cards] + [
+            card.id for card in CARDS if not self.distributed_mask & card.mask
+        ]
+        self._n_distributed = len(self.ditributed_cards)
+        # uniform draws are generated by blocks, a single draw being costly
+        self._uniforms: List[float] = []
 
-        distributed_ids = [card.id for card in self.ditributed_cards]
-        for card_id in range(52):
-            if card_id not in distributed_ids:
-                self.deck.append(Card(id=card_id))
-        random.shuffle(self.deck)
+    @property
+    def deck(self) -> List[Card]:
+        """The cards that can still be distributed"""
+        return [CARDS[card_id] for card_id in self._card_ids[self._n_distributed :]]
 
     def distribute_random_card(self):
         """Distribute a card randomly chosen in the deck.
         The returned card should not have been distributed previously
         """
-        card = self.deck.pop()
+        if self._n_distributed == len(self._card_ids):
+            raise IndexError("No card left in the deck")
+        card_ids = self._card_ids
+        position = self._n_distributed
+        if not self._uniforms:
+            self._uniforms = self.rng.random(UNIFORM_BLOCK_SIZE).tolist()
+        chosen = position + int(self._uniforms.pop() * (len(card_ids) - position))
+        card_ids[position], card_ids[chosen] = card_ids[chosen], card_ids[position]
+        self._n_distributed += 1
+        card = CARDS[card_ids[position]]
         self.ditributed_cards.append(card)
+        self.distributed_mask |= card.mask
         return card
 
+    @property
+    def remaining_mask(self) -> int:
+        """Mask of the cards that can still be distributed"""
+        return FULL_DECK_MASK ^ self.distributed_mask
+
     def shuffle(self):
-        """Reset the deck as if no card has been distributed previously"""
-        self.deck += self.ditributed_cards
-        random.shuffle(self.deck)
+        """Reset the deck as if no card has been distributed previously.
+        Nothing is shuffled: the cards are drawn when distributed"""
+        self._n_distributed = 0
         self.ditributed_cards = []
+        self.distributed_mask = 0
+
+    def snapshot(self) -> Tuple[List[int], int, int]:
+        """Return the position of the deck: the order of the card ids,
+        the number of distributed cards and their mask"""
+        return list(self._card_ids), self._n_distributed, self.distributed_mask
+
+    def restore(self, snapshot: Tuple[List[int], int, int]):
+        """Set the deck back to a position returned by 'snapshot'.
+        The generator is not restored: the next cards are new random draws"""
+        card_ids, self._n_distributed, self.distributed_mask = snapshot
+        self._card_ids = list(card_ids)
+        self.ditributed_cards = [
+            CARDS[card_id] for card_id in card_ids[: self._n_distributed]
+        ]
@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from poqrl.hand.evaluator import CARD_KEY_ARRAY, FLUSH_CHECK_ADD, FLUSH_CHECK_MASK
+from poqrl.types.combination import Combination, COMBINATION_BASE_VALUES
+
+COMBINATION_BASE_ARRAY = np.array(COMBINATION_BASE_VALUES, dtype=np.int64)
+
+
+@dataclass(frozen=True)
+class DecodedValue:
+    """Combination of a hand value, and the highs that rank it
+    in its combination, by decreasing importance (e.g. the high of the set
+    then the high of the pair for a full house)"""
+
+    combination: Combination
+    highs: Tuple[int, ...]
+
+
+def _overflow_values() -> Dict[int, Combination]:
+    """The value scale is not contiguous per combination: the best high
+    (resp. flush) hands have a value above the lowest pair (resp. full house).
+    Return these values with their combination"""
+    straights = [set(range(high - 4, high + 1)) for high in range(4, 13)]
+    straights.append({12, 0, 1, 2, 3})
+    overflow = {}
+    for highs in combinations(range(13), 5):
+        if set(highs) in straights:
+            continue
+        rank = sum(comb(high, i + 1) for i, high in enumerate(highs))
+        for combination, weight in ((Combination.HIGH, 1020), (Combination.FLUSH, 4)):
+            value = COMBINATION_BASE_VALUES[combination] + weight * rank
+            if value >= COMBINATION_BASE_VALUES[combination + 1]:
+                overflow[value] = combination
+    return overflow
+
+
+def _full_house_values() -> List[int]:
+    base = COMBINATION_BASE_VALUES[Combination.FULL_HOUSE]
+    return [
+        base + 288 * set_high + 6 * (pair if pair < set_high else pair - 1)
+        for set_high in range(13)
+        for pair in range(13)
+        if pair != set_high
+    ]
+
+
+# a few flush values are equal to full house values: they are decoded as full house
+_ALL_OVERFLOW_VALUES = _overflow_values()
+AMBIGUOUS_VALUES = frozenset(set(_ALL_OVERFLOW_VALUES) & set(_full_house_values()))
+OVERFLOW_VALUES = {
+    value: combination
+    for value, combination in _ALL_OVERFLOW_VALUES.items()
+    if value not in AMBIGUOUS_VALUES
+}
+OVERFLOW_VALUE_ARRAY = np.array(sorted(OVERFLOW_VALUES), dtype=np.int64)
+AMBIGUOUS_VALUE_ARRAY = np.array(sorted(AMBIGUOUS_VALUES), dtype=np.int64)
+
+
+def decode_combination(value: int) -> Combination:
+    """Return the combination of a hand value"""
+    if value in OVERFLOW_VALUES:
+        return OVERFLOW_VALUES[value]
+    index = 8
+    while value < COMBINATION_BASE_VALUES[index]:
+        index -= 1
+    return Combination(index)
+
+
+def decode_combinations(values: np.ndarray) -> np.ndarray:
+    """Vectorized version of 'decode_combination'
+    Returns:
+        an integer array of the Combination of each value"""
+    values = np.asarray(values)
+    combinations = np.searchsorted(COMBINATION_BASE_ARRAY, values, side="right") - 1
+    # the overflow values belong to the combination below their range
+    combinations -= np.isin(values, OVERFLOW_VALUE_ARRAY)
+    return combinations
+
+
+def hand_combinations(card_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Return the Combination of hands of at most 7 cards, given their values.
+    Unlike 'decode_combinations', the ambiguous values are decoded with the
+    suits of the hand: it cannot be both a flush and a full house
+    Args:
+        card_ids: integer array of shape (N, k) of card ids
+        values: the N values of the hands"""
+    combinations = decode_combinations(values)
+    ambiguous = np.isin(values, AMBIGUOUS_VALUE_ARRAY)
+    if ambiguous.any():
+        keys = CARD_KEY_ARRAY[card_ids[ambiguous]].sum(axis=1)
+        is_flush = (keys + FLUSH_CHECK_ADD) & FLUSH_CHECK_MASK != 0
+        combinations[ambiguous] = np.where(
+            is_flush, Combination.FLUSH, Combination.FULL_HOUSE
+        )
+    return combinations
+
+
+def _largest_high(rank: int, k: int, weight: int = 1) -> int:
+    """Return the largest high such that weight * comb(high, k) <= rank"""
+    high = k - 1
+    while high < 12 and weight * comb(high + 1, k) <= rank:
+        high += 1
+    return high
+
+
+def _distinct_highs(rank: int, n_highs: int, weight: int = 1) -> List[int]:
+    """Inverse of the sum of weight * comb(high_i, n_highs - i)
+    over decreasing distinct highs"""
+    highs = []
+    for k in range(n_highs, 0, -1):
+        high = _largest_high(rank, k, weight)
+        rank -= weight * comb(high, k)
+        highs.append(high)
+    return highs
+
+
+def decode_value(value: int) -> DecodedValue:
+    """Decode a hand value into its combination and highs,
+    by inverting the value formulas of 'Hand'"""
+    combination = decode_combination(value)
+    offset = value - COMBINATION_BASE_VALUES[combination]
+    if combination == Combination.HIGH:
+        highs = _distinct_highs(offset, 5, 1020)
+    elif combination == Combination.PAIR:
+        pair, offset = divmod(offset, 84480)
+        singles = []
+        for k, weight in ((3, 64), (2, 16), (1, 4)):
+            high = _largest_high(offset, k, weight)
+            offset -= weight * comb(high, k)
+            singles.append(high)
+        highs = [pair] + singles
+    elif combination == Combination.TWO_PAIRS:
+        big_pair = _largest_high(offset, 2, 1584)
+        offset -= comb(big_pair, 2) * 1584
+        small_pair, offset = divmod(offset, 264)
+        single = offset // 4
+        # the single high is shifted depending on its position relative to the pairs
+        if single + 2 < small_pair:
+            single += 2
+        elif single + 1 < big_pair and single + 1 != small_pair:
+            single += 1
+        highs = [big_pair, small_pair, single]
+    elif combination == Combination.SET:
+        set_high, offset = divmod(offset, 4224)
+        first_single = _largest_high(offset, 2, 16)
+        offset -= comb(first_single, 2) * 16
+        highs = [set_high, first_single, offset // 4]
+    elif combination == Combination.QUINTE:
+        highs = [offset // 1020 + 3]
+    elif combination == Combination.FLUSH:
+        highs = _distinct_highs(offset, 5, 4)
+    elif combination == Combination.FULL_HOUSE:
+        set_high, offset = divmod(offset, 288)
+        pair = offset // 6
+        highs = [set_high, pair if pair < set_high else pair + 1]
+    elif combination == Combination.SQUARE:
+        square, offset = divmod(offset, 48)
+        single = offset // 4
+        highs = [square, single if single < square else single + 1]
+    else:
+        highs = [offset // 4 + 3]
+    return DecodedValue(combination, tuple(highs))
@@ -0,0 +1,99 @@
+from math import comb
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from poqrl.hand.card import FULL_DECK_MASK, mask_ids
+
+BLOCK_SIZE = 1 << 16
+
+# BINOMIALS[k, n] = comb(n, k), for every subset size of a 7 cards hand
+BINOMIALS = np.array(
+    [[comb(n, k) for n in range(53)] for k in range(8)], dtype=np.int64
+)
+
+
+def rank_combination(indices: Sequence[int]) -> int:
+    """Return the rank of a combination in the combinatorial number system
+    (colexicographic order)
+    Args:
+        indices: the strictly increasing indices of the combination"""
+    return sum(comb(index, i + 1) for i, index in enumerate(indices))
+
+
+def unrank_combination(rank: int, k: int) -> List[int]:
+    """Return the strictly increasing indices of the combination of size k
+    with the given rank in the combinatorial number system"""
+    indices = []
+    for i in range(k, 0, -1):
+        index = i - 1
+        while comb(index + 1, i) <= rank:
+            index += 1
+        indices.append(index)
+        rank -= comb(index, i)
+    return indices[::-1]
+
+
+def unrank_combinations(ranks: np.ndarray, k: int) -> np.ndarray:
+    """Vectorized version of 'unrank_combination'
+    Returns:
+        an array of shape (len(ranks), k) of strictly increasing indices"""
+    ranks = np.array(ranks, dtype=np.int64)
+    indices = np.empty((len(ranks), k), dtype=np.int64)
+    for i in range(k, 0, -1):
+        index = np.searchsorted(BINOMIALS[i], ranks, side="right") - 1
+        indices[:, i - 1] = index
+        ranks -= BINOMIALS[i, index]
+    return indices
+
+
+class CombinationEnumerator:
+    """Enumerate the combinations of n_cards cards among the cards
+    which are not dead, in the combinatorial number system order.
+    The combinations are ranked, such that any range of ranks can be
+    generated independently, by blocks of card id arrays"""
+
+    def __init__(self, n_cards: int, dead_mask: int = 0):
+        self.n_cards = n_cards
+        self.dead_mask = dead_mask
+        self.card_ids = np.array(mask_ids(FULL_DECK_MASK ^ dead_mask), dtype=np.int8)
+        self._card_indices = np.full(52, -1, dtype=np.int64)
+        self._card_indices[self.card_ids] = np.arange(len(self.card_ids))
+
+    def __len__(self) -> int:
+        return comb(len(self.card_ids), self.n_cards)
+
+    def rank(self, card_ids: Sequence[int]) -> int:
+        """Return the rank of a combination of (not dead) card ids"""
+        indices = sorted(int(self._card_indices[card_id]) for card_id in card_ids)
+        if len(indices) != self.n_cards or (indices and indices[0] < 0):
+            raise ValueError(f"{list(card_ids)} is not a combination to enumerate")
+        return rank_combination(indices)
+
+    def unrank(self, rank: int) -> List[int]:
+        """Return the card ids of the combination of a given rank"""
+        if not 0 <= rank < len(self):
+            raise IndexError(f"Combination rank {rank} out of range")
+        return [int(self.card_ids[i]) for i in unrank_combination(rank, self.n_cards)]
+
+    def combinations(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Return the card ids of the combinations of ranks in [start, stop)
+        Returns:
+            an array of shape (stop - start, n_cards)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        indices = unrank_combinations(np.arange(start, stop), self.n_cards)
+        return self.card_ids[indices]
+
+    def blocks(
+        self, start: int = 0, stop: int | None = None, block_size: int = BLOCK_SIZE
+    ) -> Iterator[np.ndarray]:
+        """Generate the combinations of ranks in [start, stop),
+        by arrays of at most block_size combinations"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for block_start in range(start, stop, block_size):
+            yield self.combinations(block_start, min(block_start + block_size, stop))
+
+    def split(self, n_chunks: int) -> List[Tuple[int, int]]:
+        """Split the ranks into n_chunks contiguous ranges [start, stop)"""
+        bounds = np.linspace(0, len(self), n_chunks + 1).astype(np.int64)
+        return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List
+import os
+
+import numpy as np
+
+from poqrl.hand.card import Card, cards_mask
+from poqrl.hand.enumeration import CombinationEnumerator
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.hand.hand import Hand
+
+BOARD_CARDS = 5
+# number of runouts above which the enumeration is split in a process pool
+POOL_MIN_RUNOUTS = 500_000
+
+
+@dataclass
+class Equity:
+    """Share of the runouts won, tied and lost by a holding.
+    'share' is the expected share of the pot: the tied pots are split
+    between the tied players"""
+
+    win: float
+    tie: float
+    loss: float
+    share: float
+
+
+def _count_outcomes(
+    holding_ids: List[np.ndarray],
+    board_ids: np.ndarray,
+    dead_mask: int,
+    start: int,
+    stop: int,
+) -> np.ndarray:
+    """Count the outcomes of the runouts of ranks in [start, stop)
+    Returns:
+        an array of shape (n_players, 4) of the win, tie, loss and pot share
+        counts of each player"""
+    n_players = len(holding_ids)
+    enumerator = CombinationEnumerator(BOARD_CARDS - len(board_ids), dead_mask)
+    counts = np.zeros((n_players, 4))
+    for runouts in enumerator.blocks(start, stop):
+        n_runouts = len(runouts)
+        board = np.concatenate(
+            [np.broadcast_to(board_ids, (n_runouts, len(board_ids))), runouts], axis=1
+        )
+        values = np.stack(
+            [
+                evaluate_batch(
+                    np.concatenate(
+                        [np.broadcast_to(ids, (n_runouts, len(ids))), board], axis=1
+                    )
+                )
+                for ids in holding_ids
+            ]
+        )
+        winners = values == values.max(axis=0)
+        n_winners = winners.sum(axis=0)
+        counts[:, 0] += (winners & (n_winners == 1)).sum(axis=1)
+        counts[:, 1] += (winners & (n_winners > 1)).sum(axis=1)
+        counts[:, 2] += (~winners).sum(axis=1)
+        counts[:, 3] += (winners / n_winners).sum(axis=1)
+    return counts
+
+
+def equity(
+    holdings: List[Hand],
+    board: Hand | None = None,
+    dead: Iterable[Card] = (),
+    n_workers: int | None = None,
+) -> List[Equity]:
+    """Compute the exact equity of each holding, by enumerating every runout
+    of the board and evaluating the final hands in batch
+    Args:
+        holdings: the private cards of each player
+        board: the known board cards (0 to 5 cards)
+        dead: cards known to be out of the deck (e.g. folded or burnt)
+        n_workers: number of processes used when the number of runouts is large
+    Returns:
+        the equity of each player, in the order of the holdings"""
+    board_cards = board.cards if board is not None else []
+    if len(board_cards) > BOARD_CARDS:
+        raise ValueError(f"A board cannot have {len(board_cards)} cards")
+    if len(holdings) < 2:
+        raise ValueError("Equity needs at least two holdings")
+    known_cards = [card for holding in holdings for card in holding.cards]
+    known_cards += list(board_cards) + list(dead)
+    dead_mask = cards_mask(known_cards)
+    if dead_mask.bit_count() != len(known_cards):
+        raise ValueError("A card cannot be in several holdings, board or dead cards")
+
+    holding_ids = [
+        np.array([card.id for card in holding.cards], dtype=np.int8)
+        for holding in holdings
+    ]
+    board_ids = np.array([card.id for card in board_cards], dtype=np.int8)
+    enumerator = CombinationEnumerator(BOARD_CARDS - len(board_cards), dead_mask)
+    n_runouts = len(enumerator)
+    if n_runouts == 0:
+        raise ValueError("Not enough cards left to complete the board")
+    if n_runouts < POOL_MIN_RUNOUTS or n_workers == 1:
+        counts = _count_outcomes(holding_ids, board_ids, dead_mask, 0, n_runouts)
+    else:
+        n_chunks = 4 * (n_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [
+                executor.submit(
+                    _count_outcomes, holding_ids, board_ids, dead_mask, start, stop
+                )
+                for start, stop in enumerator.split(n_chunks)
+            ]
+            counts = sum(future.result() for future in futures)
+    counts = counts / n_runouts
+    return [Equity(*player_counts.tolist()) for player_counts in counts]
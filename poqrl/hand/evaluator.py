@@ -0,0 +1,338 @@
+from enum import Enum, unique
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from poqrl.hand.card import Card, CARDS
+import poqrl.hand.hand_values as hand_values
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_TABLE_NAME = "hand_lookup_table.npy"
+
+# Rank keys whose sums are unique for every multiset of exactly n <= 7 ranks
+# (with at most 4 cards per rank). Each card also adds SIZE_KEY, so that
+# the key of a hand is unique whatever its number of cards.
+RANK_KEYS = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+SIZE_KEY = 1 << 23
+# Suit counts are packed in 4 bits per suit: adding 3 to every nibble sets
+# the high bit of the nibbles which count at least 5 cards
+SUIT_KEYS = (1, 1 << 4, 1 << 8, 1 << 12)
+FLUSH_CHECK_ADD = 0x3333
+FLUSH_CHECK_MASK = 0x8888
+
+# The key of a card packs its rank key above its suit key
+SUIT_KEY_BITS = 16
+CARD_KEYS = tuple(
+    ((RANK_KEYS[card.high] + SIZE_KEY) << SUIT_KEY_BITS) + SUIT_KEYS[card.suit]
+    for card in CARDS
+)
+
+
+@unique
+class Evaluator(Enum):
+    """Define the algorithm used by 'Hand.evaluate'"""
+
+    SCAN = "scan"
+    LOOKUP = "lookup"
+
+
+def _rank_multisets(n_cards: int, high: int = 12) -> Iterable[List[int]]:
+    """Generate every multiset of n_cards ranks (lower or equal to high),
+    with at most 4 cards per rank"""
+    if n_cards == 0:
+        yield []
+        return
+    if high < 0:
+        return
+    for count in range(min(4, n_cards), -1, -1):
+        for lower_highs in _rank_multisets(n_cards - count, high - 1):
+            yield [high] * count + lower_highs
+
+
+def _scan_value(cards: List[Card]) -> int:
+    # imported here as poqrl.hand.hand depends on this module
+    from poqrl.hand.hand import Hand
+
+    return Hand(card_list=cards).scan_evaluate()
+
+
+# The rank keys are found by a perfect hash (hash and displace): a key is
+# hashed into a bucket, and the displacement of its bucket sends it to a slot
+# of its own. The flush hands are indexed by the rank mask of their suit
+HASH_MULTIPLIER = 0x9E3779B1
+SLOT_MULTIPLIER = 0x85EBCA77
+HASH_MASK = 0xFFFFFFFF
+BUCKET_SHIFT = 16  # 2^16 buckets
+SLOT_SHIFT = 15  # 2^17 slots
+N_SLOTS = 1 << (32 - SLOT_SHIFT)
+N_FLUSH_MASKS = 1 << 13
+# version of the layout, stored in the last cell of the displacement row
+LOOKUP_TABLE_VERSION = 3
+
+
+def _lookup_entries() -> Tuple[Dict[int, int], Dict[int, int]]:
+    """Compute the value of every hand of 5 to 7 cards with the 'scan' evaluator
+    Returns:
+        the values of the non flush hands by rank key,
+        and the values of the flush hands by rank mask"""
+    rank_values: Dict[int, int] = {}
+    flush_values: Dict[int, int] = {}
+    for n_cards in range(5, 8):
+        for highs in _rank_multisets(n_cards):
+            # suits are spread such that no flush is possible
+            cards = [Card(high=high, suit=i % 4) for i, high in enumerate(highs)]
+            key = sum(CARD_KEYS[card.id] for card in cards) >> SUIT_KEY_BITS
+            rank_values[key] = _scan_value(cards)
+        for highs in combinations(range(13), n_cards):
+            cards = [Card(high=high, suit=0) for high in highs]
+            flush_values[sum(1 << high for high in highs)] = _scan_value(cards)
+    return rank_values, flush_values
+
+
+def _hash_displacements(keys: Iterable[int]) -> List[int]:
+    """Find the displacement of each bucket, such that every key has its own slot.
+    The largest buckets are placed first, while most slots are free"""
+    buckets: Dict[int, List[int]] = {}
+    for key in keys:
+        hashed = key * HASH_MULTIPLIER & HASH_MASK
+        buckets.setdefault(hashed >> BUCKET_SHIFT, []).append(hashed)
+    taken = bytearray(N_SLOTS)
+    displacements = [0] * (1 << (32 - BUCKET_SHIFT))
+    for bucket, hashes in sorted(buckets.items(), key=lambda item: -len(item[1])):
+        displacement = 0
+        while True:
+            slots = {
+                ((hashed ^ displacement) * SLOT_MULTIPLIER & HASH_MASK) >> SLOT_SHIFT
+                for hashed in hashes
+            }
+            if len(slots) == len(hashes) and not any(taken[slot] for slot in slots):
+                break
+            displacement += 1
+        for slot in slots:
+            taken[slot] = 1
+        displacements[bucket] = displacement
+    return displacements
+
+
+def _hash_slot(key: int, displacements: Sequence[int]) -> int:
+    hashed = key * HASH_MULTIPLIER & HASH_MASK
+    return (
+        (hashed ^ displacements[hashed >> BUCKET_SHIFT]) * SLOT_MULTIPLIER & HASH_MASK
+    ) >> SLOT_SHIFT
+
+
+def build_lookup_table() -> np.ndarray:
+    """Compute the lookup table with the 'scan' evaluator.
+    Returns:
+        an array of shape (4, N_SLOTS), with
+            row 0: the rank key of the hand of each slot (-1 if free)
+            row 1: the value of the hand of each slot
+            row 2: the displacement of each bucket, and the layout version
+            row 3: the value of the flush hand of each rank mask (0 if none)"""
+    rank_values, flush_values = _lookup_entries()
+    displacements = _hash_displacements(rank_values)
+    table = np.zeros((4, N_SLOTS), dtype=np.int64)
+    table[0] = -1
+    for key, value in rank_values.items():
+        slot = _hash_slot(key, displacements)
+        table[0, slot] = key
+        table[1, slot] = value
+    table[2, : len(displacements)] = displacements
+    table[2, -1] = LOOKUP_TABLE_VERSION
+    for mask, value in flush_values.items():
+        table[3, mask] = value
+    return table
+
+
+def _has_lookup_layout(table: np.ndarray) -> bool:
+    return (
+        table.dtype == np.int64
+        and table.shape == (4, N_SLOTS)
+        and table[2, -1] == LOOKUP_TABLE_VERSION
+    )
+
+
+def load_lookup_table(path: Path | None = None) -> np.ndarray:
+    """Memory-map the lookup table from disk (by default from the data directory).
+    If the file does not exist, cannot be read or has another layout
+    (e.g. saved by a previous version), the table is computed and saved.
+    It is written to a temporary file moved in place, such that concurrent
+    processes never read a partially written table. If it cannot be saved,
+    the computed table is used from memory"""
+    if path is None:
+        path = hand_values.HAND_QUANTILE_VALUES_FOLDER / LOOKUP_TABLE_NAME
+    try:
+        table = np.load(path, mmap_mode="r")
+        if _has_lookup_layout(table):
+            return table
+    except (OSError, ValueError):
+        pass
+    table = np.ascontiguousarray(build_lookup_table())
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+        ) as file:
+            try:
+                np.save(file, table)
+            except OSError:
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, path)
+    except OSError as error:
+        logger.warning("Lookup table not saved to %s: %s", path, error)
+        return table
+    return np.load(path, mmap_mode="r")
+
+
+_LOOKUP_TABLE: np.ndarray | None = None
+_LOOKUP_VIEWS: Tuple[memoryview, ...] | None = None
+
+
+def lookup_table() -> np.ndarray:
+    """The memory-mapped lookup table, opened on first call"""
+    global _LOOKUP_TABLE
+    if _LOOKUP_TABLE is None:
+        _LOOKUP_TABLE = load_lookup_table()
+    return _LOOKUP_TABLE
+
+
+def lookup_views() -> Tuple[memoryview, ...]:
+    """Views on the rows of the memory-mapped lookup table.
+    Indexing a memoryview returns python ints, so a single hand is looked up
+    in constant time without copying the table in each process"""
+    global _LOOKUP_VIEWS
+    if _LOOKUP_VIEWS is None:
+        _LOOKUP_VIEWS = tuple(memoryview(row) for row in lookup_table())
+    return _LOOKUP_VIEWS
+
+
+def reset_lookup_table() -> None:
+    """Forget the lookup table: it is opened again (e.g. from another
+    data directory) on next use"""
+    global _LOOKUP_TABLE, _LOOKUP_VIEWS
+    _LOOKUP_TABLE = None
+    _LOOKUP_VIEWS = None
+
+
+hand_values.DATA_DIR_RESET_HOOKS.append(reset_lookup_table)
+
+
+def _flush_mask(suit: int, cards: List[Card]) -> int:
+    mask = 0
+    for card in cards:
+        if card.suit == suit:
+            mask |= 1 << card.high
+    return mask
+
+
+def lookup_value(key: int, suit_masks: Sequence[int]) -> int:
+    """Return the value of a hand of 5 to 7 cards from its summary
+    Args:
+        key: the sum of the CARD_KEYS of the cards
+        suit_masks: the rank mask of the cards of each suit"""
+    slot_keys, slot_values, displacements, flush_values = (
+        _LOOKUP_VIEWS or lookup_views()
+    )
+    flush = (key + FLUSH_CHECK_ADD) & FLUSH_CHECK_MASK
+    if flush:
+        mask = suit_masks[flush.bit_length() // 4 - 1]
+        if mask < N_FLUSH_MASKS and flush_values[mask]:
+            return flush_values[mask]
+    else:
+        rank_key = key >> SUIT_KEY_BITS
+        hashed = rank_key * HASH_MULTIPLIER & HASH_MASK
+        slot = (
+            (hashed ^ displacements[hashed >> BUCKET_SHIFT]) * SLOT_MULTIPLIER
+            & HASH_MASK
+        ) >> SLOT_SHIFT
+        if slot_keys[slot] == rank_key:
+            return slot_values[slot]
+    n_cards = (key >> SUIT_KEY_BITS) // SIZE_KEY
+    raise ValueError(f"Cannot evaluate a hand of {n_cards} cards")
+
+
+def lookup_evaluate(cards: List[Card]) -> int:
+    """Return the value of a hand of 5 to 7 cards.
+    The non flush hands are looked up by the sum of their rank keys,
+    and the flush hands by the rank mask of their flush suit"""
+    key = 0
+    for card in cards:
+        key += CARD_KEYS[card.id]
+    suit_masks = [0, 0, 0, 0]
+    if (key + FLUSH_CHECK_ADD) & FLUSH_CHECK_MASK:
+        for card in cards:
+            suit_masks[card.suit] |= 1 << card.high
+    return lookup_value(key, suit_masks)
+
+
+CARD_KEY_ARRAY = np.array(CARD_KEYS, dtype=np.int64)
+CARD_SUITS = np.array([card.suit for card in CARDS], dtype=np.int64)
+FLUSH_SUIT_BITS = np.array([0x8, 0x80, 0x800, 0x8000], dtype=np.int64)
+CARD_HIGH_BITS = np.array([1 << card.high for card in CARDS], dtype=np.int64)
+
+
+def evaluate_batch(card_ids: np.ndarray) -> np.ndarray:
+    """Evaluate many hands at once, with array operations only
+    Args:
+        card_ids: integer array of shape (N, k), 5 <= k <= 7, of card ids
+    Returns:
+        an integer array of N values, identical to 'Hand.value'"""
+    card_ids = np.asarray(card_ids)
+    if card_ids.ndim != 2 or not 5 <= card_ids.shape[1] <= 7:
+        raise ValueError(f"Cannot evaluate hands of shape {card_ids.shape}")
+    slot_keys, slot_values, displacements, flush_values = lookup_table()
+    # rank keys and suit counts of every hand
+    hand_keys = CARD_KEY_ARRAY[card_ids].sum(axis=1)
+    flush = (hand_keys + FLUSH_CHECK_ADD) & FLUSH_CHECK_MASK
+    rank_keys = hand_keys >> SUIT_KEY_BITS
+    # unsigned products wrap around, as the python ones masked by HASH_MASK
+    hashed = (rank_keys.astype(np.uint64) * np.uint64(HASH_MULTIPLIER)) & np.uint64(
+        HASH_MASK
+    )
+    bucket_displacements = displacements[(hashed >> np.uint64(BUCKET_SHIFT))]
+    slots = (
+        ((hashed ^ bucket_displacements.astype(np.uint64)) * np.uint64(SLOT_MULTIPLIER))
+        & np.uint64(HASH_MASK)
+    ) >> np.uint64(SLOT_SHIFT)
+    values = np.where(slot_keys[slots] == rank_keys, slot_values[slots], 0)
+    is_flush = flush != 0
+    if is_flush.any():
+        flush_ids = card_ids[is_flush]
+        flush = flush[is_flush]
+        flush_suit = np.searchsorted(FLUSH_SUIT_BITS, flush)
+        in_suit = CARD_SUITS[flush_ids] == flush_suit[:, None]
+        flush_masks = (CARD_HIGH_BITS[flush_ids] * in_suit).sum(axis=1)
+        values[is_flush] = flush_values[flush_masks]
+    if not values.all():
+        raise ValueError("Hands with repeated cards cannot be evaluated")
+    return values
+
+
+def evaluate_holdings(
+    board: Sequence[Card], holdings: Sequence[Sequence[Card]]
+) -> List[int]:
+    """Return the value of each holding completed by a shared board.
+    The summary of the board is computed once, and only the cards
+    of each holding are added to it: at table sizes, scalar lookups are
+    cheaper than an 'evaluate_batch' call"""
+    board_key = 0
+    board_suit_masks = [0, 0, 0, 0]
+    for card in board:
+        board_key += CARD_KEYS[card.id]
+        board_suit_masks[card.suit] |= 1 << card.high
+    values = []
+    for holding in holdings:
+        key = board_key
+        suit_masks = list(board_suit_masks)
+        for card in holding:
+            key += CARD_KEYS[card.id]
+            suit_masks[card.suit] |= 1 << card.high
+        values.append(lookup_value(key, suit_masks))
+    return values
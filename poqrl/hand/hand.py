@@ -1,11 +1,21 @@
-from typing import List, Optional, Tuple
-from math import comb
+from typing import Dict, List, Optional, Tuple
+from math import comb, inf
 import numpy as np
 
-from poqrl.hand.card import Card, High
-from poqrl.hand.deck import Deck
+from poqrl.hand.card import Card, CARDS, High
 import poqrl.hand.utils as util
-from poqrl.hand.hand_values import HAND_AVG_VALUES, HAND_7_QUANTILE_10_VALUES
+from poqrl.hand.utils import Seed
+from poqrl.hand.evaluator import Evaluator, CARD_KEYS, lookup_value, evaluate_batch
+from poqrl.hand.isomorphism import hand_indexer
+from poqrl.hand.decoding import AMBIGUOUS_VALUES, decode_combination
+from poqrl.hand.stats_cache import HAND_STATS_CACHE
+from poqrl.hand.monte_carlo import MC_AVG_VALUE_SAMPLES, mc_hand_value
+from poqrl.hand.hand_values import (
+    HAND_AVG_VALUES,
+    HAND_7_QUANTILE_10_VALUES,
+    HAND_AVG_TABLES,
+    HAND_7_QUANTILE_10_TABLES,
+)
 
 HAND_MAX_VAL = 2598956
 HAND_MIN_VAL = 1020
@@ -14,6 +24,8 @@ HAND_MIN_VAL = 1020
 class Hand:
     """Define a hand"""
 
+    evaluator = Evaluator.LOOKUP
+
     def __init__(
         self,
         card_list: List[Card] | None = None,
@@ -22,7 +34,7 @@ class Hand:
         n_quantile_evaluation: int = 10,
     ):
         if card_list:
-            self.cards = card_list
+            self.cards = list(card_list)
         elif hand_hash:
             self.cards = [
                 Card(card_hash=hand_hash[i : i + 2])
@@ -37,6 +49,17 @@ class Hand:
         self._value = None
         self._avg_value = None
 
+        # summary of the cards, updated at each added card:
+        # 52 bits card mask, sum of the evaluator keys (rank and suit counts)
+        # and rank mask per suit
+        self.mask = 0
+        self._key = 0
+        self._suit_masks = [0, 0, 0, 0]
+        for card in self.cards:
+            self.mask |= card.mask
+            self._key += CARD_KEYS[card.id]
+            self._suit_masks[card.suit] |= 1 << card.high
+
     @property
     def value(self):
         """Return the absolute value of the hand.
@@ -52,12 +75,19 @@ class Hand:
             hand_size = len(self.cards)
             if hand_size == self.max_cards:
                 self._avg_value = self.value
+                return self._avg_value
+            table_value = self._table_row(HAND_AVG_TABLES)
+            if table_value is not None:
+                self._avg_value = float(table_value)
             elif (
                 hand_size in HAND_AVG_VALUES and self.hash in HAND_AVG_VALUES[hand_size]
             ):
                 self._avg_value = HAND_AVG_VALUES[hand_size][self.hash]
             else:
-                self._avg_value = self.compute_mc_avg_value()
+                self._avg_value = HAND_STATS_CACHE.get(
+                    ("avg_value", hand_size, self.canonical_index),
+                    self.compute_mc_avg_value,
+                )
         return self._avg_value
 
     @property
@@ -66,20 +96,40 @@ class Hand:
             self._quantile_values = self.value
         else:
             if self._quantile_values is None:
-                if HAND_7_QUANTILE_10_VALUES[len(self.cards)] is None:
-                    self._quantile_values = self.compute_quantile_values()
+                table_quantiles = self._table_row(HAND_7_QUANTILE_10_TABLES)
+                if table_quantiles is not None:
+                    self._quantile_values = table_quantiles
+                elif HAND_7_QUANTILE_10_VALUES[len(self.cards)] is None:
+                    self._quantile_values = HAND_STATS_CACHE.get(
+                        (
+                            "quantile_values",
+                            self.max_cards,
+                            self.n_quantile_evaluation,
+                            len(self.cards),
+                            self.canonical_index,
+                        ),
+                        self.compute_quantile_values,
+                    )
                 else:
                     self._quantile_values = HAND_7_QUANTILE_10_VALUES[len(self.cards)][
                         self.light_hash
                     ]
         return np.array(self._quantile_values)
 
+    def _table_row(self, tables: Dict[int, np.ndarray | None]) -> np.ndarray | None:
+        """Return the row of the hand in the table of its size,
+        None if there is no table or if the hand is missing (NaN) from it"""
+        table = tables.get(len(self.cards))
+        if table is None:
+            return None
+        row = np.asarray(table[self.canonical_index])
+        if np.isnan(row).any():
+            return None
+        return row
+
     def compute_quantile_values(self):
-        hand_generator = util.all_hands_from_cards(self.max_cards, self.cards)
-        values = []
+        values = evaluate_batch(util.all_completion_ids(self.max_cards, self.cards))
         q = np.arange(0, 1.1, 1 / self.n_quantile_evaluation)
-        for full_hand in hand_generator:
-            values.append(full_hand.value)
         return np.quantile(values, q)
 
     def __le__(self, hand):
@@ -98,10 +148,22 @@ class Hand:
         """Add a card to the hand.
         When adding a card, the value of the hand should be reevaluated"""
         self.cards.append(card)
+        self.mask |= card.mask
+        self._key += CARD_KEYS[card.id]
+        self._suit_masks[card.suit] |= 1 << card.high
         self._value = None
         self._avg_value = None
         self._quantile_values = None
 
+    def copy(self) -> "Hand":
+        """Return a copy of the hand, with its computed values"""
+        hand = Hand.__new__(Hand)
+        attributes = self.__dict__.copy()
+        attributes["cards"] = self.cards.copy()
+        attributes["_suit_masks"] = self._suit_masks.copy()
+        hand.__dict__ = attributes
+        return hand
+
     def sort(self):
         """Sort the list of cards.
         It is usefull for the scan of the hand and for its hash key"""
@@ -125,35 +187,36 @@ class Hand:
         for card in self.cards:
             if card.suit not in permutation:
                 permutation[card.suit] = len(permutation)
-            hash_value += Card(high=card.high, suit=permutation[card.suit]).hash
+            hash_value += CARDS[card.high + 13 * permutation[card.suit]].hash
         return hash_value
 
+    @property
+    def canonical_index(self) -> int:
+        """Index of the hand up to a permutation of the suits.
+        The indices of the hands with the same number of cards are dense"""
+        return hand_indexer((len(self.cards),)).index_masks((self.mask,))
+
     def __str__(self) -> str:
         return " ".join(str(card) for card in self.cards)
 
     def compute_7cards_hand_average_value(self):
-        avg_value = 0
-        hand_number = 0
-        for complete_hand in util.all_hands_from_cards(7, self.cards):
-            hand_number += 1
-            avg_value = (
-                avg_value * ((hand_number - 1) / hand_number)
-                + complete_hand.value / hand_number
-            )
-        return avg_value
-
-    def compute_mc_avg_value(self, n_draw: int = 1000) -> float:
-        n_card = len(self.cards)
-        avg_value = 0.0
-        for draw in range(n_draw):
-            cards = list(self.cards)
-            deck = Deck(list(cards))
-            hand = Hand(cards)
-            for _ in range(7 - n_card):
-                hand.add_card(deck.distribute_random_card())
-            val = hand.value
-            avg_value = (avg_value / (draw + 1)) * draw + val / (draw + 1)
-        return avg_value
+        return float(np.mean(evaluate_batch(util.all_completion_ids(7, self.cards))))
+
+    def compute_mc_avg_value(
+        self, n_samples: int = MC_AVG_VALUE_SAMPLES, seed: Seed = None
+    ) -> float:
+        """Estimate the average value of the hand completed to 7 cards,
+        from n_samples completions. Without seed, the completions of the
+        canonical hand are drawn with a seed derived from its index: the
+        estimate does not depend on the suits, the run or the machine"""
+        cards = self.cards
+        if seed is None:
+            index = self.canonical_index
+            cards = hand_indexer((len(cards),)).unindex(index)
+            seed = np.random.default_rng([len(cards), index])
+        return mc_hand_value(
+            cards, tolerance=0.0, time_budget=inf, seed=seed, max_samples=n_samples
+        ).mean
 
     @staticmethod
     def _scan_sorted_hand(
@@ -206,6 +269,8 @@ class Hand:
 
     def get_combination(self):
         "Get the combination name of the hand"
+        if len(self.cards) >= 5 and self.value not in AMBIGUOUS_VALUES:
+            return decode_combination(self.value).label
         same_kind, straight, suits = self._scan()
         return self._get_combination_from_scan(same_kind, straight, suits)
 
@@ -233,7 +298,14 @@ class Hand:
             return "high"
 
     def evaluate(self) -> int:
-        """Evaluate the relative value of the hand"""
+        """Evaluate the relative value of the hand,
+        with the algorithm selected by 'Hand.evaluator'"""
+        if self.evaluator is Evaluator.LOOKUP:
+            return lookup_value(self._key, self._suit_masks)
+        return self.scan_evaluate()
+
+    def scan_evaluate(self) -> int:
+        """Evaluate the relative value of the hand by scanning its cards"""
         same_kind, straight, suits = self._scan()
         flush = self._biggest_flush(suits)
         if flush:
@@ -250,9 +322,9 @@ class Hand:
         elif self._is_set(same_kind):
             return self._set_value(same_kind[2][0], same_kind[0])
         elif self._is_twopairs(same_kind):
-            return self._twopairs_value(
-                same_kind[1][0], same_kind[1][1], same_kind[0][0]
-            )
+            # a 6 cards hand with three pairs has no single card
+            single_high = same_kind[0][0] if same_kind[0] else same_kind[1][2]
+            return self._twopairs_value(same_kind[1][0], same_kind[1][1], single_high)
         elif self._is_pair(same_kind):
             return self._pair_value(same_kind[1][0], same_kind[0])
         else:
@@ -0,0 +1,348 @@
+from math import comb
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+import re
+
+import numpy as np
+
+from poqrl.hand.card import Card, HIGH_HASH, cards_mask, mask_ids
+from poqrl.hand.enumeration import CombinationEnumerator
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.hand.hand import Hand
+from poqrl.hand.stats_cache import HandStatsCache
+
+N_COMBOS = comb(52, 2)
+BOARD_CARDS = 5
+# the runouts of smaller boards are too many to be enumerated at each decision
+MIN_BOARD_CARDS = 3
+RUNOUT_BLOCK_SIZE = 128
+# up to this number of combos, the hero combos are compared one by one
+MAX_DIRECT_COMBOS = 8
+# the showdowns of a flop take about 6 MB
+BOARD_SHOWDOWNS_CACHE_SIZE = 16
+
+# card ids of the 1326 two cards combos, in the combinatorial number system order
+COMBO_IDS = CombinationEnumerator(2).combinations().astype(np.int64)
+COMBO_MASKS = (np.uint64(1) << COMBO_IDS.astype(np.uint64)).sum(axis=1, dtype=np.uint64)
+# the 51 combos holding each card, and the position of each combo
+# among the combos of each of its cards
+CARD_COMBOS = np.array(
+    [np.flatnonzero((COMBO_IDS == card_id).any(axis=1)) for card_id in range(52)]
+)
+COMBO_GROUP_POSITIONS = np.array(
+    [
+        [np.searchsorted(CARD_COMBOS[card_id], combo) for card_id in card_ids]
+        for combo, card_ids in enumerate(COMBO_IDS)
+    ]
+)
+BOARD_SHOWDOWNS_CACHE = HandStatsCache(BOARD_SHOWDOWNS_CACHE_SIZE)
+RANK_PATTERN = "".join(HIGH_HASH)
+CLASS_PATTERN = re.compile(
+    rf"^([{RANK_PATTERN}])([{RANK_PATTERN}])([so]?)(\+?)"
+    rf"(?:-([{RANK_PATTERN}])([{RANK_PATTERN}])([so]?))?(?::([0-9.]+))?$"
+)
+
+
+def combo_index(card1: Card, card2: Card) -> int:
+    """Return the index of a two cards combo"""
+    low, high = sorted((card1.id, card2.id))
+    if low == high:
+        raise ValueError("A combo needs two different cards")
+    return comb(high, 2) + low
+
+
+def _class_combos(high1: int, high2: int, suitedness: str) -> List[int]:
+    """Return the combos of a 169 class, e.g. (12, 11, 's') for AKs"""
+    combos = []
+    for suit1 in range(4):
+        for suit2 in range(4):
+            if high1 == high2 and suit1 >= suit2:
+                continue
+            if suitedness == "s" and suit1 != suit2:
+                continue
+            if suitedness == "o" and suit1 == suit2:
+                continue
+            combos.append(
+                combo_index(Card(high=high1, suit=suit1), Card(high=high2, suit=suit2))
+            )
+    return combos
+
+
+def _parse_class(token: str) -> Tuple[List[int], float]:
+    """Return the combos and the weight of a token of range notation"""
+    match = CLASS_PATTERN.match(token)
+    if match is None:
+        raise ValueError(f"Cannot parse range token '{token}'")
+    (
+        first,
+        second,
+        suitedness,
+        plus,
+        last_first,
+        last_second,
+        last_suitedness,
+        weight,
+    ) = match.groups()
+    high1, high2 = HIGH_HASH.index(first), HIGH_HASH.index(second)
+    if high1 < high2:
+        high1, high2 = high2, high1
+    if high1 == high2 and suitedness:
+        raise ValueError(f"A pair cannot be suited or offsuit: '{token}'")
+    if last_first and (plus or last_suitedness != suitedness):
+        raise ValueError(f"The ends of the range do not match: '{token}'")
+    if high1 == high2:
+        # pairs: TT, TT+ (up to AA), TT-77
+        low = high1
+        top = 12 if plus else high1
+        if last_first:
+            if last_second != last_first:
+                raise ValueError(f"The ends of the range do not match: '{token}'")
+            low = min(high1, HIGH_HASH.index(last_first))
+            top = max(high1, HIGH_HASH.index(last_first))
+        classes = [(high, high) for high in range(low, top + 1)]
+    else:
+        # the second high varies: ATs, ATs+ (up to AKs), A5s-A2s
+        low = high2
+        top = high1 - 1 if plus else high2
+        if last_first:
+            if (
+                HIGH_HASH.index(last_first) != high1
+                or HIGH_HASH.index(last_second) >= high1
+            ):
+                raise ValueError(f"The ends of the range do not match: '{token}'")
+            low = min(high2, HIGH_HASH.index(last_second))
+            top = max(high2, HIGH_HASH.index(last_second))
+        classes = [(high1, high) for high in range(low, top + 1)]
+    combos = [
+        combo
+        for high1, high2 in classes
+        for combo in _class_combos(high1, high2, suitedness)
+    ]
+    return combos, float(weight) if weight is not None else 1.0
+
+
+class Range:
+    """Weighted range of two cards holdings: a weight for each of the 1326 combos"""
+
+    def __init__(self, weights: np.ndarray | None = None):
+        if weights is None:
+            weights = np.zeros(N_COMBOS)
+        self.weights = np.array(weights, dtype=np.float64)
+        if self.weights.shape != (N_COMBOS,):
+            raise ValueError(f"A range needs {N_COMBOS} weights")
+
+    @classmethod
+    def parse(cls, notation: str) -> "Range":
+        """Build a range from a comma separated list of 169 classes,
+        such as "AKs, TT+, A5s-A2s, KQo:0.5" (with an optional weight)"""
+        weights = np.zeros(N_COMBOS)
+        for token in notation.replace(" ", "").split(","):
+            if token:
+                combos, weight = _parse_class(token)
+                weights[combos] = weight
+        return cls(weights)
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Card]) -> "Range":
+        """Build the range of a single holding"""
+        weights = np.zeros(N_COMBOS)
+        weights[combo_index(*cards)] = 1.0
+        return cls(weights)
+
+    def __len__(self) -> int:
+        """Number of combos with a positive weight"""
+        return int(np.count_nonzero(self.weights))
+
+    def remove_cards(self, cards: Iterable[Card]) -> "Range":
+        """Return the range without the combos holding one of the cards"""
+        blocked = (COMBO_MASKS & np.uint64(cards_mask(cards))) != 0
+        return Range(np.where(blocked, 0.0, self.weights))
+
+    def combo_equities(
+        self, villain: "Range", board: Hand, dead: Iterable[Card] = ()
+    ) -> np.ndarray:
+        """Return the equity of each combo of the range against the villain range
+        (NaN for the combos out of the range, or which never meet the villain range)"""
+        wins, meetings = _showdown_sums(self, villain, board, dead)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.weights > 0, wins / meetings, np.nan)
+
+    def equity(self, villain: "Range", board: Hand, dead: Iterable[Card] = ()) -> float:
+        """Return the equity of the range against the villain range: the share
+        of the pot won (ties split) over every pair of compatible combos and
+        every runout of the board (of 3 to 5 cards)"""
+        wins, meetings = _showdown_sums(self, villain, board, dead)
+        total = (self.weights * meetings).sum()
+        if total == 0:
+            raise ValueError("The ranges never meet on this board")
+        return float((self.weights * wins).sum() / total)
+
+
+def hand_vs_range_equity(
+    hand: Hand, villain: Range, board: Hand, dead: Iterable[Card] = ()
+) -> float:
+    """Return the equity of a two cards holding against a range"""
+    return Range.from_cards(hand.cards).equity(villain, board, dead)
+
+
+@dataclass
+class BoardShowdowns:
+    """The showdowns of every combo on every runout of a board, which do not
+    depend on the ranges: the combos are only ranked by their value
+    Attributes:
+        runout_masks: the card mask of each full board
+        ranks: the dense rank of the value of each combo on each runout
+            (of shape (n_runouts, 1326), 0 for the combos blocked by the runout)
+        group_ranks: the dense rank of the combos holding each card
+            among them (of shape (n_runouts, 52, 51), ordered as CARD_COMBOS)"""
+
+    runout_masks: np.ndarray
+    ranks: np.ndarray
+    group_ranks: np.ndarray
+
+
+def _dense_ranks(values: np.ndarray) -> np.ndarray:
+    """Rank the values of each row, equal values having the same rank"""
+    order = np.argsort(values, axis=-1)
+    sorted_values = np.take_along_axis(values, order, axis=-1)
+    run_starts = np.ones(values.shape, dtype=bool)
+    run_starts[..., 1:] = sorted_values[..., 1:] != sorted_values[..., :-1]
+    ranks = np.empty(values.shape, dtype=np.int16)
+    np.put_along_axis(ranks, order, run_starts.cumsum(axis=-1) - 1, axis=-1)
+    return ranks
+
+
+def _compute_board_showdowns(board_mask: int) -> BoardShowdowns:
+    board_ids = np.array(mask_ids(board_mask), dtype=np.int64)
+    runouts = CombinationEnumerator(BOARD_CARDS - len(board_ids), board_mask)
+    runout_masks = []
+    ranks = []
+    for runout_ids in runouts.blocks(block_size=RUNOUT_BLOCK_SIZE):
+        n_runouts = len(runout_ids)
+        runout_ids = runout_ids.astype(np.int64)
+        masks = (np.uint64(1) << runout_ids.astype(np.uint64)).sum(
+            axis=1, dtype=np.uint64
+        ) | np.uint64(board_mask)
+        # only the combos without any card of the full board are evaluated
+        live = (COMBO_MASKS[None, :] & masks[:, None]) == 0
+        full_boards = np.concatenate(
+            [np.broadcast_to(board_ids, (n_runouts, len(board_ids))), runout_ids],
+            axis=1,
+        )
+        runouts_of_live, live_combos = np.nonzero(live)
+        values = np.zeros((n_runouts, N_COMBOS), dtype=np.int64)
+        values[live] = evaluate_batch(
+            np.concatenate(
+                [COMBO_IDS[live_combos], full_boards[runouts_of_live]], axis=1
+            )
+        )
+        runout_masks.append(masks)
+        ranks.append(_dense_ranks(values))
+    all_ranks = np.concatenate(ranks)
+    return BoardShowdowns(
+        runout_masks=np.concatenate(runout_masks),
+        ranks=all_ranks,
+        group_ranks=_dense_ranks(
+            np.take_along_axis(
+                all_ranks[:, None, :],
+                np.broadcast_to(CARD_COMBOS, (len(all_ranks), 52, 51)),
+                axis=2,
+            )
+        ).astype(np.int8),
+    )
+
+
+def board_showdowns(board_mask: int) -> BoardShowdowns:
+    """Return the showdowns of the runouts of a board, computed once per board"""
+    return BOARD_SHOWDOWNS_CACHE.get(
+        board_mask, lambda: _compute_board_showdowns(board_mask)
+    )
+
+
+def _rank_sums(ranks: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """For each element of each row, return the total weight of the elements of
+    the same row with a lower rank, and with an equal rank
+    Args:
+        ranks, weights: arrays of shape (..., n) of dense ranks and weights"""
+    n = ranks.shape[-1]
+    rows = ranks.reshape(-1, n)
+    # position of the rank of each element among the ranks of every row
+    positions = (rows + n * np.arange(len(rows))[:, None]).ravel()
+    rank_weights = np.bincount(positions, weights=weights.ravel(), minlength=rows.size)
+    below = rank_weights.reshape(rows.shape).cumsum(axis=1).ravel() - rank_weights
+    less = below[positions].reshape(ranks.shape)
+    equal = rank_weights[positions].reshape(ranks.shape)
+    return less, equal
+
+
+def _direct_showdown_sums(
+    hero_combos: np.ndarray,
+    ranks: np.ndarray,
+    live: np.ndarray,
+    villain_weights: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compare each hero combo to every villain combo, faster than ranking
+    the weights of the villain range for a few hero combos"""
+    wins = np.zeros(N_COMBOS)
+    meetings = np.zeros(N_COMBOS)
+    for combo in hero_combos:
+        # the villain combos sharing a card with the hero combo are removed
+        weights = villain_weights * ((COMBO_MASKS & COMBO_MASKS[combo]) == 0)
+        hero_ranks = ranks[:, combo, None]
+        less = (weights * (ranks < hero_ranks)).sum(axis=1)
+        equal = (weights * (ranks == hero_ranks)).sum(axis=1)
+        hero_live = live[:, combo]
+        wins[combo] = ((less + 0.5 * equal) * hero_live).sum()
+        meetings[combo] = (weights.sum(axis=1) * hero_live).sum()
+    return wins, meetings
+
+
+def _showdown_sums(
+    hero: Range, villain: Range, board: Hand, dead: Iterable[Card]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum over the runouts and the compatible villain combos of
+    the won share of each hero combo, and of the villain weights it meets.
+    The showdowns of the runouts are computed once per board (about 0.5 s
+    for a flop) and cached, the following calls on the board only sum the
+    weights: on a flop, about 0.2 s for two ranges and 0.03 s for a hand"""
+    board_cards = board.cards if board is not None else []
+    if len(board_cards) > BOARD_CARDS:
+        raise ValueError(f"A board cannot have {len(board_cards)} cards")
+    if len(board_cards) < MIN_BOARD_CARDS:
+        raise ValueError(
+            f"Range equities need a board of at least {MIN_BOARD_CARDS} cards: "
+            f"the runouts of a {len(board_cards)} cards board are too many"
+        )
+    showdowns = board_showdowns(cards_mask(board_cards))
+    dead_mask = np.uint64(cards_mask(dead))
+    # the runouts with a dead card are skipped
+    kept = (showdowns.runout_masks & dead_mask) == 0
+    runout_masks = showdowns.runout_masks[kept] | dead_mask
+    ranks = showdowns.ranks[kept]
+    group_ranks = showdowns.group_ranks[kept]
+    # combos without any card of the board, of the runout or dead
+    live = (COMBO_MASKS[None, :] & runout_masks[:, None]) == 0
+    villain_weights = villain.weights * live
+    hero_combos = np.flatnonzero(hero.weights)
+    if len(hero_combos) <= MAX_DIRECT_COMBOS:
+        return _direct_showdown_sums(hero_combos, ranks, live, villain_weights)
+    less, equal = _rank_sums(ranks, villain_weights)
+    group_weights = villain_weights[:, CARD_COMBOS]
+    group_less, group_equal = _rank_sums(group_ranks, group_weights)
+    group_less = group_less.reshape(len(ranks), -1)
+    group_equal = group_equal.reshape(len(ranks), -1)
+    group_totals = group_weights.sum(axis=2)
+    total = villain_weights.sum(axis=1, keepdims=True)
+    # remove the villain combos sharing a card with the hero combo:
+    # the hero combo itself shares both cards, so it is removed twice
+    for card_position in range(2):
+        cards = COMBO_IDS[:, card_position]
+        group_positions = cards * 51 + COMBO_GROUP_POSITIONS[:, card_position]
+        less -= group_less[:, group_positions]
+        equal -= group_equal[:, group_positions]
+        total = total - group_totals[:, cards]
+    equal += villain_weights
+    total = total + villain_weights
+    wins = ((less + 0.5 * equal) * live).sum(axis=0)
+    meetings = (total * live).sum(axis=0)
+    return wins, meetings
@@ -1,10 +1,32 @@
-from typing import Dict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
 from pathlib import Path
+import json
+import logging
+import os
 import pickle
+import time
 
+import numpy as np
 
-HAND_VALUES_HASH_PATH = Path("hand_values")
-HAND_QUANTILE_VALUES_FOLDER = Path("store")
+from poqrl.hand.card import Card
+from poqrl.hand.isomorphism import hand_indexer
+
+logger = logging.getLogger(__name__)
+
+# The data folders are found in the directory given by the POQRL_DATA_DIR
+# environment variable, or in the root of the repository
+DATA_DIR_ENV = "POQRL_DATA_DIR"
+DATA_DIR = Path(os.environ.get(DATA_DIR_ENV, Path(__file__).resolve().parents[2]))
+HAND_VALUES_HASH_PATH = DATA_DIR / "hand_values"
+HAND_QUANTILE_VALUES_FOLDER = DATA_DIR / "store"
+
+# Binary hand tables: a header followed by a fixed dtype array,
+# whose rows are indexed by the canonical index of the hands
+HAND_TABLE_MAGIC = b"POQRLTAB"
+HAND_TABLE_VERSION = 1
+HAND_TABLE_ALIGNMENT = 64
+HAND_TABLE_DTYPE = np.float32
 
 
 def load_hand_value_dict(n_card_hand: int) -> Dict[str, float]:
@@ -32,14 +54,9 @@ def load_hand_quantiles(n_cards: int, folder: Path):
     filepath = folder / filename
     if filepath.exists():
         with open(filepath, "rb") as file:
-            quantile_values = pickle.load(file)
-            print(
-                f"File {filename} loaded with {len(quantile_values)} values for {n_cards}"
-            )
-            return quantile_values
-    else:
-        print(f"Filename {filename} does not exist in {folder}")
-        return None
+            return pickle.load(file)
+    logger.debug("File %s does not exist in %s", filename, folder)
+    return None
 
 
 def save_hand_value_dict(n_card_hand: int, value_dict: Dict[str, float]) -> None:
@@ -49,9 +66,196 @@ def save_hand_value_dict(n_card_hand: int, value_dict: Dict[str, float]) -> None
     # hand_value_file.close()
 
 
-# HAND_AVG_VALUES = {n_card: load_hand_value_dict(n_card) for n_card in range(2, 7)}
-HAND_AVG_VALUES = {n_card: load_hand_value_dict(n_card) for n_card in range(2, 5)}
-HAND_7_QUANTILE_10_VALUES = {
-    n_card: load_hand_quantiles(n_card, HAND_QUANTILE_VALUES_FOLDER)
-    for n_card in [2, 3, 4, 5, 6]
-}
+def save_hand_table(path: Path, table: np.ndarray, n_cards: int) -> None:
+    """Save a table of hand values in the binary hand table format.
+    Args:
+        path: the file to write
+        table: an array whose first dimension is the canonical index of the hands
+        n_cards: the number of cards of the hands"""
+    if len(table) != len(hand_indexer((n_cards,))):
+        raise ValueError(
+            f"A table of {n_cards} cards hands needs {len(hand_indexer((n_cards,)))} rows"
+        )
+    header = json.dumps(
+        {
+            "version": HAND_TABLE_VERSION,
+            "n_cards": n_cards,
+            "dtype": np.dtype(table.dtype).str,
+            "shape": list(table.shape),
+        }
+    ).encode()
+    header_size = len(HAND_TABLE_MAGIC) + 4 + len(header)
+    padding = -header_size % HAND_TABLE_ALIGNMENT
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as table_file:
+        table_file.write(HAND_TABLE_MAGIC)
+        table_file.write((len(header) + padding).to_bytes(4, "little"))
+        table_file.write(header + b" " * padding)
+        table_file.write(np.ascontiguousarray(table).tobytes())
+
+
+def read_hand_table_header(path: Path) -> Tuple[dict, int]:
+    """Return the header of a binary hand table, and the offset of its array"""
+    with open(path, "rb") as table_file:
+        if table_file.read(len(HAND_TABLE_MAGIC)) != HAND_TABLE_MAGIC:
+            raise ValueError(f"{path} is not a hand table")
+        header_length = int.from_bytes(table_file.read(4), "little")
+        header = json.loads(table_file.read(header_length))
+    if header["version"] != HAND_TABLE_VERSION:
+        raise ValueError(f"Unsupported hand table version {header['version']}")
+    return header, len(HAND_TABLE_MAGIC) + 4 + header_length
+
+
+def open_hand_table(path: Path) -> np.memmap:
+    """Open a binary hand table as a read-only memory map"""
+    header, offset = read_hand_table_header(path)
+    return np.memmap(
+        path,
+        dtype=np.dtype(header["dtype"]),
+        mode="r",
+        offset=offset,
+        shape=tuple(header["shape"]),
+    )
+
+
+def hand_value_table_path(n_card_hand: int) -> Path:
+    return HAND_VALUES_HASH_PATH / f"{n_card_hand}_card_hand_values.table"
+
+
+def hand_quantile_table_path(n_cards: int, folder: Path) -> Path:
+    return folder / f"hand_quantile_{n_cards}cards_of{7}_{10}.table"
+
+
+def save_hand_value_table(n_card_hand: int, values: np.ndarray) -> None:
+    """Save the average values (indexed by canonical index) of the hands of n_card_hand"""
+    save_hand_table(
+        hand_value_table_path(n_card_hand), values.astype(HAND_TABLE_DTYPE), n_card_hand
+    )
+
+
+def load_hand_value_table(n_card_hand: int) -> np.memmap | None:
+    """Memory-map the average values of the hands of n_card_hand cards.
+    The value of a hand is at its canonical index (NaN if not computed).
+    Returns None if the table does not exist"""
+    path = hand_value_table_path(n_card_hand)
+    if path.exists():
+        return open_hand_table(path)
+    return None
+
+
+def save_hand_quantile_table(n_cards: int, quantiles: np.ndarray, folder: Path) -> None:
+    """Save the quantiles (one row per canonical index) of the hands of n_cards"""
+    save_hand_table(
+        hand_quantile_table_path(n_cards, folder),
+        quantiles.astype(HAND_TABLE_DTYPE),
+        n_cards,
+    )
+
+
+def load_hand_quantile_table(n_cards: int, folder: Path) -> np.memmap | None:
+    """Memory-map the quantiles of the hands of n_cards cards.
+    Returns None if the table does not exist"""
+    path = hand_quantile_table_path(n_cards, folder)
+    if path.exists():
+        return open_hand_table(path)
+    return None
+
+
+def hash_table_to_array(n_cards: int, hash_table: Dict[str, float]) -> np.ndarray:
+    """Convert a hash table keyed by hand hash (or light hash) into an array
+    indexed by canonical index. The hands missing from the hash table are NaN"""
+    indexer = hand_indexer((n_cards,))
+    first_value = np.asarray(next(iter(hash_table.values()), 0.0))
+    table = np.full((len(indexer),) + first_value.shape, np.nan)
+    for hand_hash, value in hash_table.items():
+        cards = [
+            Card(card_hash=hand_hash[i : i + 2]) for i in range(0, len(hand_hash), 2)
+        ]
+        table[indexer.index(cards)] = value
+    return table
+
+
+class LazyHandTables(Mapping):
+    """Tables of hand data by number of cards.
+    A table is loaded on its first access, then kept in memory"""
+
+    def __init__(self, name: str, loader: Callable[[int], Any], n_cards: Iterable[int]):
+        self.name = name
+        self._loader = loader
+        self._n_cards = tuple(n_cards)
+        self._tables: Dict[int, Any] = {}
+
+    def __getitem__(self, n_cards: int) -> Any:
+        if n_cards not in self._n_cards:
+            raise KeyError(n_cards)
+        if n_cards not in self._tables:
+            start = time.perf_counter()
+            table = self._loader(n_cards)
+            if table is None:
+                logger.info("No %s table for %d cards hands", self.name, n_cards)
+            else:
+                logger.info(
+                    "Loaded %s table for %d cards hands: %d entries in %.3fs",
+                    self.name,
+                    n_cards,
+                    len(table),
+                    time.perf_counter() - start,
+                )
+            self._tables[n_cards] = table
+        return self._tables[n_cards]
+
+    def __contains__(self, n_cards: object) -> bool:
+        return n_cards in self._n_cards
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._n_cards)
+
+    def __len__(self) -> int:
+        return len(self._n_cards)
+
+    def is_loaded(self, n_cards: int) -> bool:
+        return n_cards in self._tables
+
+    def clear(self) -> None:
+        """Forget the loaded tables, they are loaded again on next access"""
+        self._tables.clear()
+
+
+HAND_AVG_VALUES = LazyHandTables("average value", load_hand_value_dict, range(2, 5))
+HAND_7_QUANTILE_10_VALUES = LazyHandTables(
+    "quantile",
+    lambda n_card: load_hand_quantiles(n_card, HAND_QUANTILE_VALUES_FOLDER),
+    [2, 3, 4, 5, 6],
+)
+HAND_AVG_TABLES = LazyHandTables(
+    "average value array", load_hand_value_table, range(2, 7)
+)
+HAND_7_QUANTILE_10_TABLES = LazyHandTables(
+    "quantile array",
+    lambda n_card: load_hand_quantile_table(n_card, HAND_QUANTILE_VALUES_FOLDER),
+    [2, 3, 4, 5, 6],
+)
+HAND_TABLES = (
+    HAND_AVG_VALUES,
+    HAND_7_QUANTILE_10_VALUES,
+    HAND_AVG_TABLES,
+    HAND_7_QUANTILE_10_TABLES,
+)
+
+
+# functions called by 'set_data_dir' to forget the tables loaded by
+# the modules importing this one (e.g. the lookup table of the evaluator)
+DATA_DIR_RESET_HOOKS: List[Callable[[], None]] = []
+
+
+def set_data_dir(data_dir: Path) -> None:
+    """Read (and write) the hand tables in another data directory.
+    The tables already loaded are forgotten"""
+    global DATA_DIR, HAND_VALUES_HASH_PATH, HAND_QUANTILE_VALUES_FOLDER
+    DATA_DIR = Path(data_dir)
+    HAND_VALUES_HASH_PATH = DATA_DIR / "hand_values"
+    HAND_QUANTILE_VALUES_FOLDER = DATA_DIR / "store"
+    for tables in HAND_TABLES:
+        tables.clear()
+    for reset in DATA_DIR_RESET_HOOKS:
+        reset()
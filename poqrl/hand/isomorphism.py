@@ -0,0 +1,365 @@
+from bisect import bisect_right
+from functools import lru_cache
+from math import comb, prod
+from typing import Dict, List, Sequence, Tuple
+
+from poqrl.hand.card import Card, CARDS
+
+SUIT_MASK = (1 << 13) - 1
+
+# COLEX_RANKS[mask] = rank of a 13 bits mask among the masks with the same number of bits
+COLEX_RANKS = tuple(
+    sum(
+        comb(high, i + 1)
+        for i, high in enumerate(h for h in range(13) if mask >> h & 1)
+    )
+    for mask in range(1 << 13)
+)
+
+# A suit description packed in an int: its sizes per round (4 bits each) above
+# the index of its ranks, such that the packed descriptions sort as the tuples
+DESCRIPTION_BITS = 36  # 13! < 2^36 descriptions of a suit
+DESCRIPTION_MASK = (1 << DESCRIPTION_BITS) - 1
+# PACKED_SUIT_MASKS[mask] = packed description of a 13 bits mask of a single round
+PACKED_SUIT_MASKS = tuple(
+    mask.bit_count() << DESCRIPTION_BITS | COLEX_RANKS[mask] for mask in range(1 << 13)
+)
+
+SizeTuple = Tuple[int, ...]
+
+
+def _size_code(sizes: SizeTuple) -> int:
+    """Pack the sizes of a suit in each round, 4 bits per round"""
+    code = 0
+    for size in sizes:
+        code = code << 4 | size
+    return code
+
+
+def _rank_among(mask: int, used: int) -> int:
+    """Colex rank of mask among the subsets of the ranks not in used"""
+    rank = 0
+    i = 0
+    for high in range(13):
+        if mask >> high & 1:
+            i += 1
+            rank += comb(high - (used & ((1 << high) - 1)).bit_count(), i)
+    return rank
+
+
+def _unrank_among(rank: int, n_bits: int, used: int) -> int:
+    """Inverse of '_rank_among'"""
+    free_highs = [high for high in range(13) if not used >> high & 1]
+    mask = 0
+    for i in range(n_bits, 0, -1):
+        index = i - 1
+        while comb(index + 1, i) <= rank:
+            index += 1
+        rank -= comb(index, i)
+        mask |= 1 << free_highs[index]
+    return mask
+
+
+def _multiset_rank(indices: Sequence[int]) -> int:
+    """Rank of a non increasing sequence of indices among the multisets"""
+    size = len(indices)
+    return sum(comb(index + size - 1 - i, size - i) for i, index in enumerate(indices))
+
+
+def _multiset_unrank(rank: int, size: int) -> List[int]:
+    """Inverse of '_multiset_rank'"""
+    indices = []
+    for i in range(size):
+        k = size - i
+        value = k - 1
+        while comb(value + 1, k) <= rank:
+            value += 1
+        rank -= comb(value, k)
+        indices.append(value - (size - 1 - i))
+    return indices
+
+
+class HandIndexer:
+    """Index hands up to suit isomorphism.
+    Two hands which only differ by a permutation of the suits get the same
+    index, and the indices of a set of hands are dense in [0, len(indexer)).
+
+    The cards of a hand can be split into rounds (e.g. hole cards then board cards):
+    hands are then isomorphic if the suit permutation maps each round to each round.
+
+    Each suit of a hand is described by its ranks in each round. The suits
+    are sorted, and the index is the offset of the size of the suits in each round
+    plus the rank of the sorted suit descriptions among all such descriptions"""
+
+    def __init__(self, rounds: Tuple[int, ...]):
+        self.rounds = tuple(rounds)
+        self.n_cards = sum(self.rounds)
+        # offset of each configuration (sizes of the sorted suits), and
+        # size and number of multisets of each group of suits with equal sizes
+        self._configurations: Dict[
+            Tuple[SizeTuple, ...], Tuple[int, List[Tuple[int, int]]]
+        ] = {}
+        # the same, keyed by the size codes of the sorted suits
+        self._packed_configurations: Dict[
+            Tuple[int, ...], Tuple[int, List[Tuple[int, int]]]
+        ] = {}
+        self._offsets: List[int] = []
+        self._configuration_list: List[Tuple[SizeTuple, ...]] = []
+        offset = 0
+        for configuration in self._suit_size_configurations(list(self.rounds), 4, None):
+            groups = [
+                (
+                    group_size,
+                    comb(
+                        self._suit_description_count(sizes) + group_size - 1, group_size
+                    ),
+                )
+                for sizes, group_size in self._groups(configuration)
+            ]
+            self._configurations[configuration] = (offset, groups)
+            self._packed_configurations[
+                tuple(_size_code(sizes) for sizes in configuration)
+            ] = (offset, groups)
+            self._configuration_list.append(configuration)
+            self._offsets.append(offset)
+            offset += prod(n_multisets for _, n_multisets in groups)
+        self.size = offset
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _suit_size_configurations(self, remaining: List[int], n_suits: int, bound):
+        """Generate the non increasing sequences of n_suits size tuples
+        which sum to the remaining number of cards in each round"""
+        if n_suits == 0:
+            if not any(remaining):
+                yield ()
+            return
+        for sizes in self._size_tuples(remaining, 0, 13):
+            if bound is not None and sizes > bound:
+                continue
+            lower = [left - size for left, size in zip(remaining, sizes)]
+            for configuration in self._suit_size_configurations(
+                lower, n_suits - 1, sizes
+            ):
+                yield (sizes,) + configuration
+
+    def _size_tuples(self, remaining: List[int], round_index: int, free: int):
+        """Generate the sizes of a suit in the rounds from round_index,
+        in decreasing order"""
+        if round_index == len(remaining):
+            yield ()
+            return
+        for size in range(min(remaining[round_index], free), -1, -1):
+            for sizes in self._size_tuples(remaining, round_index + 1, free - size):
+                yield (size,) + sizes
+
+    @staticmethod
+    def _suit_description_count(sizes: SizeTuple) -> int:
+        """Number of possible suit descriptions with the given sizes per round"""
+        count = 1
+        free = 13
+        for size in sizes:
+            count *= comb(free, size)
+            free -= size
+        return count
+
+    @staticmethod
+    def _groups(configuration: Tuple[SizeTuple, ...]) -> List[Tuple[SizeTuple, int]]:
+        groups = []
+        for sizes in configuration:
+            if groups and groups[-1][0] == sizes:
+                groups[-1] = (sizes, groups[-1][1] + 1)
+            else:
+                groups.append((sizes, 1))
+        return groups
+
+    def _suit_descriptions(self, round_masks: Sequence[int]):
+        """Return for each suit its sizes per round and the index of its description"""
+        if len(round_masks) == 1:
+            mask = round_masks[0]
+            return [
+                ((suit_mask.bit_count(),), COLEX_RANKS[suit_mask], suit)
+                for suit, suit_mask in enumerate(
+                    (
+                        mask & SUIT_MASK,
+                        mask >> 13 & SUIT_MASK,
+                        mask >> 26 & SUIT_MASK,
+                        mask >> 39,
+                    )
+                )
+            ]
+        descriptions = []
+        for suit in range(4):
+            shift = 13 * suit
+            sizes = []
+            index = 0
+            used = 0
+            for round_mask in round_masks:
+                mask = round_mask >> shift & SUIT_MASK
+                n_bits = mask.bit_count()
+                if used:
+                    index = index * comb(13 - used.bit_count(), n_bits) + _rank_among(
+                        mask, used
+                    )
+                else:
+                    index = COLEX_RANKS[mask]
+                used |= mask
+                sizes.append(n_bits)
+            descriptions.append((tuple(sizes), index, suit))
+        return descriptions
+
+    def index_with_permutation(
+        self, round_masks: Sequence[int]
+    ) -> Tuple[int, List[int]]:
+        """Return the index of a hand, and the permutation that maps
+        each suit of the hand to its suit in the canonical hand
+        Args:
+            round_masks: the 52 bits mask of the cards of each round"""
+        descriptions = sorted(self._suit_descriptions(round_masks), reverse=True)
+        offset, groups = self._configurations[
+            (
+                descriptions[0][0],
+                descriptions[1][0],
+                descriptions[2][0],
+                descriptions[3][0],
+            )
+        ]
+        index = 0
+        start = 0
+        for group_size, n_multisets in groups:
+            if group_size == 1:
+                rank = descriptions[start][1]
+            else:
+                rank = _multiset_rank(
+                    [
+                        description[1]
+                        for description in descriptions[start : start + group_size]
+                    ]
+                )
+            index = index * n_multisets + rank
+            start += group_size
+        permutation = [0, 0, 0, 0]
+        for canonical_suit, description in enumerate(descriptions):
+            permutation[description[2]] = canonical_suit
+        return offset + index, permutation
+
+    def index_masks(self, round_masks: Sequence[int]) -> int:
+        """Return the index of a hand given by the card mask of each round.
+        Faster than 'index_with_permutation': the suit descriptions are
+        packed in ints, sorted by a sorting network"""
+        if len(round_masks) == 1:
+            mask = round_masks[0]
+            a = PACKED_SUIT_MASKS[mask & SUIT_MASK]
+            b = PACKED_SUIT_MASKS[mask >> 13 & SUIT_MASK]
+            c = PACKED_SUIT_MASKS[mask >> 26 & SUIT_MASK]
+            d = PACKED_SUIT_MASKS[mask >> 39]
+        else:
+            a, b, c, d = (
+                _size_code(sizes) << DESCRIPTION_BITS | index
+                for sizes, index, _ in self._suit_descriptions(round_masks)
+            )
+        # sort the 4 descriptions in decreasing order
+        if a < b:
+            a, b = b, a
+        if c < d:
+            c, d = d, c
+        if a < c:
+            a, c = c, a
+        if b < d:
+            b, d = d, b
+        if b < c:
+            b, c = c, b
+        offset, groups = self._packed_configurations[
+            (
+                a >> DESCRIPTION_BITS,
+                b >> DESCRIPTION_BITS,
+                c >> DESCRIPTION_BITS,
+                d >> DESCRIPTION_BITS,
+            )
+        ]
+        descriptions = (
+            a & DESCRIPTION_MASK,
+            b & DESCRIPTION_MASK,
+            c & DESCRIPTION_MASK,
+            d & DESCRIPTION_MASK,
+        )
+        index = 0
+        start = 0
+        for group_size, n_multisets in groups:
+            # the multiset ranks of the small groups are expanded
+            if group_size == 1:
+                rank = descriptions[start]
+            elif group_size == 2:
+                x, y = descriptions[start], descriptions[start + 1]
+                rank = x * (x + 1) // 2 + y
+            elif group_size == 3:
+                x, y, z = descriptions[start : start + 3]
+                rank = x * (x + 1) * (x + 2) // 6 + y * (y + 1) // 2 + z
+            else:
+                rank = _multiset_rank(descriptions)
+            index = index * n_multisets + rank
+            start += group_size
+        return offset + index
+
+    def index(self, cards: Sequence[Card]) -> int:
+        """Return the index of a hand, its cards being ordered by round"""
+        return self.index_masks(self.round_masks(cards))
+
+    def round_masks(self, cards: Sequence[Card]) -> List[int]:
+        """Return the card mask of each round of a hand"""
+        if len(cards) != self.n_cards:
+            raise ValueError(f"Expected {self.n_cards} cards, got {len(cards)}")
+        round_masks = []
+        start = 0
+        for n_round_cards in self.rounds:
+            mask = 0
+            for card in cards[start : start + n_round_cards]:
+                mask |= card.mask
+            round_masks.append(mask)
+            start += n_round_cards
+        return round_masks
+
+    def unindex_masks(self, index: int) -> List[int]:
+        """Return the card mask of each round of the canonical hand of an index"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"Hand index {index} out of range")
+        position = bisect_right(self._offsets, index) - 1
+        configuration = self._configuration_list[position]
+        index -= self._offsets[position]
+        _, groups = self._configurations[configuration]
+        group_indices = []
+        for group_size, n_multisets in reversed(groups):
+            group_indices.append(_multiset_unrank(index % n_multisets, group_size))
+            index //= n_multisets
+        descriptions = [
+            description for group in reversed(group_indices) for description in group
+        ]
+        round_masks = [0] * len(self.rounds)
+        for suit, (sizes, description) in enumerate(zip(configuration, descriptions)):
+            used = 0
+            round_counts = [
+                comb(13 - sum(sizes[:r]), sizes[r]) for r in range(len(sizes))
+            ]
+            for r, n_bits in enumerate(sizes):
+                rank = description // prod(round_counts[r + 1 :])
+                description %= prod(round_counts[r + 1 :])
+                mask = _unrank_among(rank, n_bits, used)
+                used |= mask
+                round_masks[r] |= mask << (13 * suit)
+        return round_masks
+
+    def unindex(self, index: int) -> List[Card]:
+        """Return the cards of the canonical hand of an index, ordered by round"""
+        return [
+            CARDS[card_id]
+            for mask in self.unindex_masks(index)
+            for card_id in range(52)
+            if mask >> card_id & 1
+        ]
+
+
+@lru_cache(maxsize=None)
+def hand_indexer(rounds: Tuple[int, ...]) -> HandIndexer:
+    """Return the shared indexer of hands with the given number of cards per round"""
+    return HandIndexer(rounds)
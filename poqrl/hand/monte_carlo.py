@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Callable, Iterable, List, Tuple
+import time
+
+import numpy as np
+
+from poqrl.hand.card import Card, FULL_DECK_MASK, cards_mask, mask_ids
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.hand.utils import Seed
+
+MAX_CARDS = 7
+BOARD_CARDS = 5
+MC_BLOCK_SIZE = 1 << 14
+MC_TOLERANCE = 2000.0
+MC_TIME_BUDGET = 1.0
+MC_MAX_SAMPLES = 1 << 22
+# samples of the cached average values: the standard error of the
+# average value of a hand is then about MC_TOLERANCE
+MC_AVG_VALUE_SAMPLES = 1 << 16
+
+
+@dataclass
+class MonteCarloEstimate:
+    """Estimate of a mean by sampling, with its confidence interval"""
+
+    mean: float
+    standard_error: float
+    n_samples: int
+    confidence: float = 0.95
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        half_width = (
+            NormalDist().inv_cdf(0.5 + self.confidence / 2) * self.standard_error
+        )
+        return self.mean - half_width, self.mean + half_width
+
+
+def sample_cards(
+    rng: np.random.Generator, dead_mask: int, n_cards: int, n_samples: int
+) -> np.ndarray:
+    """Draw n_samples sets of n_cards distinct cards among the cards not dead
+    Returns:
+        an array of shape (n_samples, n_cards) of card ids"""
+    card_ids = np.array(mask_ids(FULL_DECK_MASK ^ dead_mask), dtype=np.int8)
+    if n_cards > len(card_ids):
+        raise ValueError(f"Cannot draw {n_cards} cards among {len(card_ids)}")
+    if n_cards == 0:
+        return np.empty((n_samples, 0), dtype=np.int8)
+    # the n_cards smallest of random keys are a uniform draw without replacement
+    keys = rng.random((n_samples, len(card_ids)))
+    return card_ids[np.argpartition(keys, n_cards - 1, axis=1)[:, :n_cards]]
+
+
+def monte_carlo(
+    sample: Callable[[np.random.Generator, int], np.ndarray],
+    tolerance: float,
+    time_budget: float = MC_TIME_BUDGET,
+    max_samples: int = MC_MAX_SAMPLES,
+    block_size: int = MC_BLOCK_SIZE,
+    seed: Seed = None,
+    confidence: float = 0.95,
+) -> List[MonteCarloEstimate]:
+    """Estimate the means of several quantities, sampled by blocks.
+    The sampling stops once the standard error of every quantity is below
+    tolerance, when the time budget (in seconds) is spent or when
+    max_samples are drawn. At least one block is always drawn.
+    Args:
+        sample: function drawing a block of samples with a generator,
+            as an array of shape (n_quantities, block_size)
+    Returns:
+        the estimate of each quantity"""
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    n_samples = 0
+    sums = squares = 0.0
+    while True:
+        values = np.asarray(
+            sample(rng, min(block_size, max_samples - n_samples)), dtype=np.float64
+        )
+        n_samples += values.shape[1]
+        sums = sums + values.sum(axis=1)
+        squares = squares + (values**2).sum(axis=1)
+        means = sums / n_samples
+        variances = np.maximum(squares / n_samples - means**2, 0.0)
+        standard_errors = np.sqrt(variances / max(n_samples - 1, 1))
+        if (
+            standard_errors.max() <= tolerance
+            or n_samples >= max_samples
+            or time.perf_counter() - start >= time_budget
+        ):
+            break
+    return [
+        MonteCarloEstimate(float(mean), float(error), n_samples, confidence)
+        for mean, error in zip(means, standard_errors)
+    ]
+
+
+def mc_hand_value(
+    cards: Iterable[Card],
+    tolerance: float = MC_TOLERANCE,
+    time_budget: float = MC_TIME_BUDGET,
+    seed: Seed = None,
+    **kwargs,
+) -> MonteCarloEstimate:
+    """Estimate the average value of a hand completed to 7 cards"""
+    cards = list(cards)
+    dead_mask = cards_mask(cards)
+    hand_ids = np.array([card.id for card in cards], dtype=np.int8)
+
+    def sample(rng: np.random.Generator, n_samples: int) -> np.ndarray:
+        completions = sample_cards(rng, dead_mask, MAX_CARDS - len(cards), n_samples)
+        hands = np.concatenate(
+            [np.broadcast_to(hand_ids, (n_samples, len(hand_ids))), completions],
+            axis=1,
+        )
+        return evaluate_batch(hands)[None, :]
+
+    return monte_carlo(sample, tolerance, time_budget, seed=seed, **kwargs)[0]
+
+
+def mc_equity(
+    holdings: List[Iterable[Card]],
+    board: Iterable[Card] = (),
+    dead: Iterable[Card] = (),
+    tolerance: float = 1e-3,
+    time_budget: float = MC_TIME_BUDGET,
+    seed: Seed = None,
+    **kwargs,
+) -> List[MonteCarloEstimate]:
+    """Estimate the expected pot share of each holding (the tied pots are split),
+    by sampling the runouts of the board"""
+    holdings = [list(holding) for holding in holdings]
+    board = list(board)
+    known_cards = [card for holding in holdings for card in holding]
+    known_cards += board + list(dead)
+    dead_mask = cards_mask(known_cards)
+    if dead_mask.bit_count() != len(known_cards):
+        raise ValueError("A card cannot be in several holdings, board or dead cards")
+    holding_ids = [
+        np.array([card.id for card in holding], dtype=np.int8) for holding in holdings
+    ]
+    board_ids = np.array([card.id for card in board], dtype=np.int8)
+
+    def sample(rng: np.random.Generator, n_samples: int) -> np.ndarray:
+        runouts = sample_cards(rng, dead_mask, BOARD_CARDS - len(board), n_samples)
+        full_boards = np.concatenate(
+            [np.broadcast_to(board_ids, (n_samples, len(board_ids))), runouts], axis=1
+        )
+        values = np.stack(
+            [
+                evaluate_batch(
+                    np.concatenate(
+                        [np.broadcast_to(ids, (n_samples, len(ids))), full_boards],
+                        axis=1,
+                    )
+                )
+                for ids in holding_ids
+            ]
+        )
+        winners = values == values.max(axis=0)
+        return winners / winners.sum(axis=0)
+
+    return monte_carlo(sample, tolerance, time_budget, seed=seed, **kwargs)
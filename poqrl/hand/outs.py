@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from poqrl.hand.card import Card, CARDS, FULL_DECK_MASK, mask_ids
+from poqrl.hand.decoding import hand_combinations
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.hand.hand import Hand
+from poqrl.hand.isomorphism import hand_indexer
+from poqrl.hand.stats_cache import HAND_STATS_CACHE
+from poqrl.types.combination import Combination
+
+NEXT_CARD_HAND_SIZES = (5, 6)
+
+
+@dataclass
+class NextCardDistribution:
+    """Value of a hand after each card that can be dealt next.
+    A next card improves the hand (it is an out) if it upgrades its combination
+    Attributes:
+        value, combination: the value and combination of the current hand
+        card_ids: the ids of the cards left in the deck
+        values, combinations: the value and combination of the hand with each card
+    """
+
+    value: int
+    combination: Combination
+    card_ids: np.ndarray
+    values: np.ndarray
+    combinations: np.ndarray
+
+    @property
+    def improves(self) -> np.ndarray:
+        return self.combinations > self.combination
+
+    @property
+    def outs(self) -> List[Card]:
+        return [CARDS[card_id] for card_id in self.card_ids[self.improves]]
+
+    @property
+    def out_probability(self) -> float:
+        return float(self.improves.mean())
+
+    @property
+    def combination_probabilities(self) -> np.ndarray:
+        """Probability of each Combination after the next card"""
+        return np.bincount(self.combinations, minlength=len(Combination)) / len(
+            self.combinations
+        )
+
+    def features(self) -> np.ndarray:
+        """Draw features of the hand: the out probability, the mean gain of value
+        and the probability of each combination after the next card"""
+        return np.concatenate(
+            [
+                [self.out_probability, self.values.mean() - self.value],
+                self.combination_probabilities,
+            ]
+        )
+
+    def with_suits(self, suits: np.ndarray) -> "NextCardDistribution":
+        """Return the distribution with the suits of the next cards renamed
+        Args:
+            suits: the new suit of each suit"""
+        card_ids = suits[self.card_ids // 13] * 13 + self.card_ids % 13
+        order = np.argsort(card_ids)
+        return NextCardDistribution(
+            self.value,
+            self.combination,
+            card_ids[order],
+            self.values[order],
+            self.combinations[order],
+        )
+
+
+def compute_next_card_distribution(card_ids: List[int]) -> NextCardDistribution:
+    """Evaluate at once the hand completed by each card left in the deck"""
+    hand_ids = np.array([card_ids], dtype=np.int64)
+    next_ids = np.array(
+        mask_ids(FULL_DECK_MASK ^ sum(1 << card_id for card_id in card_ids))
+    )
+    hands = np.empty((len(next_ids), len(card_ids) + 1), dtype=np.int64)
+    hands[:, :-1] = hand_ids
+    hands[:, -1] = next_ids
+    values = evaluate_batch(hands)
+    value = evaluate_batch(hand_ids)
+    return NextCardDistribution(
+        int(value[0]),
+        Combination(int(hand_combinations(hand_ids, value)[0])),
+        next_ids,
+        values,
+        hand_combinations(hands, values),
+    )
+
+
+def _canonical_next_card_distribution(hand: Hand):
+    """Return the next card distribution of the canonical hand of a hand,
+    and the permutation mapping the suits of the hand to the canonical suits"""
+    n_cards = len(hand.cards)
+    if n_cards not in NEXT_CARD_HAND_SIZES:
+        raise ValueError(f"Cannot compute the next card of a {n_cards} cards hand")
+    indexer = hand_indexer((n_cards,))
+    index, permutation = indexer.index_with_permutation((hand.mask,))
+
+    def compute():
+        (mask,) = indexer.unindex_masks(index)
+        return compute_next_card_distribution(mask_ids(mask))
+
+    return HAND_STATS_CACHE.get(("next_cards", n_cards, index), compute), permutation
+
+
+def next_card_distribution(hand: Hand) -> NextCardDistribution:
+    """Return the value of a hand of 5 or 6 cards after each possible next card.
+    The distributions are cached by canonical index: the hands which only
+    differ by a permutation of the suits share the same evaluation"""
+    distribution, permutation = _canonical_next_card_distribution(hand)
+    inverse = np.empty(4, dtype=np.int64)
+    inverse[permutation] = np.arange(4)
+    return distribution.with_suits(inverse)
+
+
+def draw_features(hand: Hand) -> np.ndarray:
+    """Return the draw features of a hand of 5 or 6 cards (see
+    'NextCardDistribution.features'), which do not depend on the suits"""
+    return _canonical_next_card_distribution(hand)[0].features()
@@ -0,0 +1,354 @@
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import logging
+import os
+
+import numpy as np
+
+import poqrl.hand.hand_values as hand_values
+from poqrl.hand.card import FULL_DECK_MASK, mask_ids
+from poqrl.hand.enumeration import BLOCK_SIZE, CombinationEnumerator
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.hand.hand import HAND_MAX_VAL, HAND_MIN_VAL
+from poqrl.hand.isomorphism import hand_indexer
+
+logger = logging.getLogger(__name__)
+
+MAX_CARDS = 7
+N_QUANTILES = 10
+QUANTILES = np.arange(0, 1.1, 1 / N_QUANTILES)
+SHARD_SIZE = 4096
+
+
+def compute_hand_rows(n_cards: int, start: int, stop: int) -> np.ndarray:
+    """Compute the data of the canonical hands of n_cards with index in [start, stop)
+    Returns:
+        an array of shape (stop - start, 1 + len(QUANTILES)) with
+            column 0: the average value of the hand completed to 7 cards
+            columns 1:: the quantiles of the values of the completed hand"""
+    indexer = hand_indexer((n_cards,))
+    n_completions = comb(52 - n_cards, MAX_CARDS - n_cards)
+    # several hands are evaluated in the same batch when they have few completions
+    hands_per_batch = max(1, BLOCK_SIZE // n_completions)
+    rows = np.empty((stop - start, 1 + len(QUANTILES)))
+    for batch_start in range(start, stop, hands_per_batch):
+        batch_stop = min(batch_start + hands_per_batch, stop)
+        completions = []
+        for index in range(batch_start, batch_stop):
+            mask = indexer.unindex_masks(index)[0]
+            hand_ids = np.array(mask_ids(mask), dtype=np.int8)
+            enumerator = CombinationEnumerator(MAX_CARDS - n_cards, mask)
+            completion_ids = enumerator.combinations()
+            completions.append(
+                np.concatenate(
+                    [
+                        np.broadcast_to(hand_ids, (n_completions, n_cards)),
+                        completion_ids,
+                    ],
+                    axis=1,
+                )
+            )
+        values = evaluate_batch(np.concatenate(completions)).reshape(
+            batch_stop - batch_start, n_completions
+        )
+        rows[batch_start - start : batch_stop - start, 0] = values.mean(axis=1)
+        rows[batch_start - start : batch_stop - start, 1:] = np.quantile(
+            values, QUANTILES, axis=1
+        ).T
+    return rows
+
+
+class PrecomputeJob:
+    """Compute the average values and quantiles of every canonical hand of
+    a given number of cards. The canonical indices are split into shards,
+    computed by a process pool and saved as soon as they are done,
+    such that an interrupted job resumes from the missing shards"""
+
+    compute_shard = staticmethod(compute_hand_rows)
+
+    def __init__(
+        self, n_cards: int, checkpoint_dir: Path, shard_size: int = SHARD_SIZE
+    ):
+        self.n_cards = n_cards
+        self.size = len(hand_indexer((n_cards,)))
+        self.shard_size = shard_size
+        self.checkpoint_dir = Path(checkpoint_dir) / f"{n_cards}_cards"
+
+    def shards(self) -> List[Tuple[int, int]]:
+        return [
+            (start, min(start + self.shard_size, self.size))
+            for start in range(0, self.size, self.shard_size)
+        ]
+
+    def shard_path(self, start: int, stop: int) -> Path:
+        return self.checkpoint_dir / f"shard_{start:08d}_{stop:08d}.npy"
+
+    def pending_shards(self) -> List[Tuple[int, int]]:
+        return [
+            shard for shard in self.shards() if not self.shard_path(*shard).exists()
+        ]
+
+    def save_shard(self, start: int, stop: int, rows: np.ndarray) -> None:
+        """Save a shard atomically, a partially written shard is never seen"""
+        path = self.shard_path(start, stop)
+        temporary_path = path.with_suffix(".tmp")
+        with open(temporary_path, "wb") as shard_file:
+            np.save(shard_file, rows)
+        os.replace(temporary_path, path)
+
+    def run(self, n_workers: int | None = None) -> Iterator[Tuple[int, int]]:
+        """Compute the pending shards, and generate each shard once saved"""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        pending = self.pending_shards()
+        if not pending:
+            return
+        logger.info(
+            "%d cards hands: %d shards to compute out of %d",
+            self.n_cards,
+            len(pending),
+            len(self.shards()),
+        )
+        executor = ProcessPoolExecutor(max_workers=n_workers)
+        try:
+            futures = {
+                executor.submit(self.compute_shard, self.n_cards, start, stop): (
+                    start,
+                    stop,
+                )
+                for start, stop in pending
+            }
+            for future, (start, stop) in futures.items():
+                self.save_shard(start, stop, future.result())
+                yield start, stop
+        finally:
+            # on interruption, the shards not started yet are dropped
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def assemble(self) -> np.ndarray:
+        """Concatenate the shards of a finished job"""
+        pending = self.pending_shards()
+        if pending:
+            raise ValueError(
+                f"{len(pending)} shards of {self.n_cards} cards hands are missing"
+            )
+        return np.concatenate(
+            [np.load(self.shard_path(start, stop)) for start, stop in self.shards()]
+        )
+
+    def save_tables(self) -> None:
+        """Save the average value and quantile tables of the finished job"""
+        rows = self.assemble()
+        hand_values.save_hand_value_table(self.n_cards, rows[:, 0])
+        hand_values.save_hand_quantile_table(
+            self.n_cards, rows[:, 1:], hand_values.HAND_QUANTILE_VALUES_FOLDER
+        )
+
+
+# Streaming histograms: the completions of the hands of 6 cards are evaluated
+# once, and the statistics of the smaller hands are summed from their children
+N_BINS = 256
+BIN_EDGES = np.linspace(HAND_MIN_VAL, HAND_MAX_VAL + 1, N_BINS + 1)
+HandStats = Dict[str, np.ndarray]
+
+
+def compute_hand_histograms(n_cards: int, start: int, stop: int) -> HandStats:
+    """Compute the statistics of the values of the completions to 7 cards
+    of the canonical hands with index in [start, stop)
+    Returns:
+        a dictionary of arrays, with one row per hand:
+            histograms: the number of completion values in each of the N_BINS bins
+            sums, minimums, maximums: of the completion values"""
+    indexer = hand_indexer((n_cards,))
+    n_completions = comb(52 - n_cards, MAX_CARDS - n_cards)
+    hands_per_batch = max(1, BLOCK_SIZE // n_completions)
+    stats = {
+        # the smallest integer type fitting the counts keeps the histograms compact
+        "histograms": np.zeros(
+            (stop - start, N_BINS), dtype=np.min_scalar_type(n_completions)
+        ),
+        "sums": np.zeros(stop - start, dtype=np.int64),
+        "minimums": np.zeros(stop - start, dtype=np.int64),
+        "maximums": np.zeros(stop - start, dtype=np.int64),
+    }
+    for batch_start in range(start, stop, hands_per_batch):
+        batch_stop = min(batch_start + hands_per_batch, stop)
+        rows = slice(batch_start - start, batch_stop - start)
+        completions = []
+        for index in range(batch_start, batch_stop):
+            mask = indexer.unindex_masks(index)[0]
+            hand_ids = np.array(mask_ids(mask), dtype=np.int8)
+            completion_ids = CombinationEnumerator(
+                MAX_CARDS - n_cards, mask
+            ).combinations()
+            completions.append(
+                np.concatenate(
+                    [
+                        np.broadcast_to(hand_ids, (n_completions, n_cards)),
+                        completion_ids,
+                    ],
+                    axis=1,
+                )
+            )
+        values = evaluate_batch(np.concatenate(completions)).reshape(
+            batch_stop - batch_start, n_completions
+        )
+        bins = np.searchsorted(BIN_EDGES, values, side="right") - 1
+        hand_rows = np.repeat(np.arange(batch_stop - batch_start), n_completions)
+        np.add.at(stats["histograms"][rows], (hand_rows, bins.ravel()), 1)
+        stats["sums"][rows] = values.sum(axis=1)
+        stats["minimums"][rows] = values.min(axis=1)
+        stats["maximums"][rows] = values.max(axis=1)
+    return stats
+
+
+def child_indices(n_cards: int, start: int, stop: int) -> np.ndarray:
+    """Return the canonical indices of the hands of n_cards + 1 cards
+    made by adding a card to the canonical hands of index in [start, stop)
+    Returns:
+        an array of shape (stop - start, 52 - n_cards)"""
+    indexer = hand_indexer((n_cards,))
+    child_indexer = hand_indexer((n_cards + 1,))
+    children = np.empty((stop - start, 52 - n_cards), dtype=np.int64)
+    for row, index in enumerate(range(start, stop)):
+        mask = indexer.unindex_masks(index)[0]
+        children[row] = [
+            child_indexer.index_masks((mask | 1 << card_id,))
+            for card_id in mask_ids(FULL_DECK_MASK ^ mask)
+        ]
+    return children
+
+
+def aggregate_stats(n_cards: int, child_stats: HandStats, children: np.ndarray):
+    """Compute the statistics of hands of n_cards from those of their children.
+    Every completion of a hand is a completion of 7 - n_cards of its children,
+    so the summed histograms and sums are divided by 7 - n_cards
+    Args:
+        child_stats: the statistics of the hands of n_cards + 1 cards
+        children: the rows of child_stats of the children of each hand"""
+    multiplicity = MAX_CARDS - n_cards
+    return {
+        "histograms": (
+            child_stats["histograms"][children].sum(axis=1, dtype=np.uint32)
+            // multiplicity
+        ),
+        "sums": child_stats["sums"][children].sum(axis=1) // multiplicity,
+        "minimums": child_stats["minimums"][children].min(axis=1),
+        "maximums": child_stats["maximums"][children].max(axis=1),
+    }
+
+
+def histogram_quantiles(stats: HandStats, quantiles=QUANTILES) -> np.ndarray:
+    """Approximate the quantiles of the completion values from their histograms.
+    Each sorted value is placed in its bin as if the values of the bin were
+    uniformly spread, and the quantiles interpolate between the two sorted
+    values around them, as in np.quantile. Both lie in the bins of the exact
+    values, so the error is below the bin width (about 10148), at every level.
+    The quantiles 0 and 1 are the exact minimum and maximum
+    Returns:
+        an array of shape (n_hands, len(quantiles))"""
+    histograms = stats["histograms"].astype(np.int64)
+    cumulated = histograms.cumsum(axis=1)
+    n_values = cumulated[:, -1]
+    rows = np.arange(len(histograms))
+
+    def sorted_values(ranks: np.ndarray) -> np.ndarray:
+        bins = (cumulated > ranks[:, None]).argmax(axis=1)
+        before = cumulated[rows, bins] - histograms[rows, bins]
+        fraction = (ranks - before + 0.5) / histograms[rows, bins]
+        return BIN_EDGES[bins] + fraction * (BIN_EDGES[bins + 1] - BIN_EDGES[bins])
+
+    result = np.empty((len(histograms), len(quantiles)))
+    for column, quantile in enumerate(quantiles):
+        # position of the quantile among the sorted values, as in np.quantile
+        position = min(max(quantile, 0.0), 1.0) * (n_values - 1)
+        below = np.floor(position)
+        lower, upper = sorted_values(below), sorted_values(np.ceil(position))
+        result[:, column] = lower + (position - below) * (upper - lower)
+    result = np.clip(result, stats["minimums"][:, None], stats["maximums"][:, None])
+    result[:, np.asarray(quantiles) <= 0] = stats["minimums"][:, None]
+    result[:, np.asarray(quantiles) >= 1] = stats["maximums"][:, None]
+    return result
+
+
+class HistogramJob(PrecomputeJob):
+    """Compute the average values and quantiles of the hands of 2 to 6 cards
+    in a single pass: the completions of the canonical hands of 6 cards are
+    evaluated once (by resumable shards), and the statistics of each smaller
+    hand are summed from those of its children. The memory is bounded by
+    the number of canonical hands times the number of histogram bins"""
+
+    compute_shard = staticmethod(compute_hand_histograms)
+
+    def __init__(self, checkpoint_dir: Path, shard_size: int = SHARD_SIZE):
+        super().__init__(MAX_CARDS - 1, Path(checkpoint_dir) / "histograms", shard_size)
+
+    def shard_path(self, start: int, stop: int) -> Path:
+        return self.checkpoint_dir / f"shard_{start:08d}_{stop:08d}.npz"
+
+    def save_shard(self, start: int, stop: int, stats: HandStats) -> None:
+        path = self.shard_path(start, stop)
+        temporary_path = path.with_suffix(".tmp")
+        with open(temporary_path, "wb") as shard_file:
+            np.savez(shard_file, **stats)
+        os.replace(temporary_path, path)
+
+    def assemble(self) -> HandStats:
+        pending = self.pending_shards()
+        if pending:
+            raise ValueError(f"{len(pending)} shards of histograms are missing")
+        shards = [np.load(self.shard_path(*shard)) for shard in self.shards()]
+        return {
+            name: np.concatenate([shard[name] for shard in shards])
+            for name in shards[0].files
+        }
+
+    def level_stats(
+        self, min_cards: int = 2, n_workers: int | None = None
+    ) -> Iterator[Tuple[int, HandStats]]:
+        """Generate the statistics of the hands of each number of cards,
+        from 6 down to min_cards, once the shards are computed"""
+        stats = self.assemble()
+        yield self.n_cards, stats
+        for n_cards in range(self.n_cards - 1, min_cards - 1, -1):
+            size = len(hand_indexer((n_cards,)))
+            chunks = [
+                (start, min(start + self.shard_size, size))
+                for start in range(0, size, self.shard_size)
+            ]
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [
+                    executor.submit(child_indices, n_cards, start, stop)
+                    for start, stop in chunks
+                ]
+                level_chunks = [
+                    aggregate_stats(n_cards, stats, future.result())
+                    for future in futures
+                ]
+            stats = {
+                name: np.concatenate([chunk[name] for chunk in level_chunks])
+                for name in level_chunks[0]
+            }
+            yield n_cards, stats
+
+    def save_tables(
+        self,
+        min_cards: int = 2,
+        n_workers: int | None = None,
+        max_cards: int = MAX_CARDS - 1,
+    ) -> None:
+        """Save the average value and quantile tables of the hands of
+        min_cards to max_cards cards. The statistics of the larger hands
+        are still computed, the smaller ones being summed from them"""
+        for n_cards, stats in self.level_stats(min_cards, n_workers):
+            if n_cards > max_cards:
+                continue
+            n_completions = comb(52 - n_cards, MAX_CARDS - n_cards)
+            hand_values.save_hand_value_table(n_cards, stats["sums"] / n_completions)
+            hand_values.save_hand_quantile_table(
+                n_cards,
+                histogram_quantiles(stats),
+                hand_values.HAND_QUANTILE_VALUES_FOLDER,
+            )
+            logger.info("Tables of %d cards hands saved", n_cards)
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+HAND_STATS_CACHE_SIZE = 1 << 16
+
+
+@dataclass
+class CacheInfo:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class HandStatsCache:
+    """Size-bounded LRU cache of hand statistics (quantiles, average values).
+    The statistics do not depend on the suits, so they are keyed by the
+    canonical index of the hand, and shared by every hand of the process"""
+
+    def __init__(self, max_size: int = HAND_STATS_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached statistics of key, computed on a miss"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self._entries[key] = value
+            self._evict()
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def resize(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, len(self._entries), self.max_size
+        )
+
+    def clear(self) -> None:
+        """Empty the cache and reset its counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+HAND_STATS_CACHE = HandStatsCache()
@@ -1,38 +1,53 @@
 from typing import List
 
-import poqrl.hand.hand as hand_lib
-from poqrl.hand.card import Card
+import numpy as np
+
+from poqrl.hand.card import Card, CARDS, cards_mask
+from poqrl.hand.enumeration import CombinationEnumerator
+
+# the generators created without seed (decks, simulations) are seeded by seeds
+# spawned from this seed, in the order of their creation: the runs of a
+# program are reproducible
+DEFAULT_DECK_SEED = 77
+_DEFAULT_SEED_SEQUENCE = np.random.SeedSequence(DEFAULT_DECK_SEED)
+
+Seed = int | np.random.Generator | None
+
+
+def default_seed() -> np.random.SeedSequence:
+    """Return a new seed spawned from DEFAULT_DECK_SEED"""
+    return _DEFAULT_SEED_SEQUENCE.spawn(1)[0]
 
 
 def all_hands(n_cards: int):
-    all_cards = [Card(id=id) for id in range(52)]
-    max_per_index = [52 - n_cards + i for i in range(n_cards)]
-    hand_ids = list(range(n_cards))
+    # imported here as poqrl.hand.hand depends on this module
+    import poqrl.hand.hand as hand_lib
 
-    while hand_ids:
-        while len(hand_ids) != n_cards:
-            hand_ids.append(hand_ids[-1] + 1)
-        yield hand_lib.Hand(card_list=[all_cards[id] for id in hand_ids])
-        while hand_ids and hand_ids[-1] == max_per_index[len(hand_ids) - 1]:
-            hand_ids.pop()
-        if hand_ids:
-            hand_ids[-1] += 1
+    for block in CombinationEnumerator(n_cards).blocks():
+        for hand_ids in block.tolist():
+            yield hand_lib.Hand(card_list=[CARDS[id] for id in hand_ids])
 
 
 def all_hands_from_cards(n_cards: int, card_list: List[Card]):
-    n_cards -= len(card_list)
-    card_ids = [card.id for card in card_list]
-    all_cards = [Card(id=id) for id in range(52)]
-    max_per_index = [52 - n_cards + i for i in range(n_cards)]
-    hand_ids = list(range(n_cards))
-    while hand_ids:
-        while len(hand_ids) != n_cards:
-            hand_ids.append(hand_ids[-1] + 1)
-        if all([card_id not in hand_ids for card_id in card_ids]):
+    import poqrl.hand.hand as hand_lib
+
+    enumerator = CombinationEnumerator(n_cards - len(card_list), cards_mask(card_list))
+    for block in enumerator.blocks():
+        for hand_ids in block.tolist():
             yield hand_lib.Hand(
-                card_list=[all_cards[id] for id in hand_ids] + list(card_list)
+                card_list=[CARDS[id] for id in hand_ids] + list(card_list)
             )
-        while hand_ids and hand_ids[-1] == max_per_index[len(hand_ids) - 1]:
-            hand_ids.pop()
-        if hand_ids:
-            hand_ids[-1] += 1
+
+
+def all_completion_ids(n_cards: int, card_list: List[Card]) -> np.ndarray:
+    """Return the card ids of every completion of card_list into a n_cards hand
+    Returns:
+        an array of shape (n_completions, n_cards),
+        the first columns holding the ids of card_list"""
+    enumerator = CombinationEnumerator(n_cards - len(card_list), cards_mask(card_list))
+    completions = enumerator.combinations()
+    known = np.broadcast_to(
+        np.array([card.id for card in card_list], dtype=completions.dtype),
+        (len(completions), len(card_list)),
+    )
+    return np.concatenate([known, completions], axis=1)
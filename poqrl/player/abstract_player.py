@@ -1,9 +1,12 @@
 from abc import abstractmethod
 from contextlib import suppress
 
+import numpy as np
+
 from poqrl.hand.card import Card
 from poqrl.hand.hand import Hand
 from poqrl.player.utils import ActionError, SituationError
+from poqrl.table.game_state import GameState
 from poqrl.types.street import Street
 from poqrl.types.action import Action, FOLD, RAISE, CALL, CHECK
 
@@ -17,6 +20,10 @@ class AbstractPlayer:
         name: str = "AbstractPlayer",
     ):
         self.table = None
+        # the chips and status of the player are read from the state of its
+        # table, or from its own state while it is not seated
+        self.state = GameState(1)
+        self._seat = 0
         self.base_stack = stack
         self.stack = stack
         self.refill = 1
@@ -26,6 +33,38 @@ class AbstractPlayer:
         self.cards = (None, None)  # useful for graphic display
         self.position = -1
         self.is_in_hand = True
+        # generator of the random decisions, see 'random'
+        self.rng: np.random.RandomState | None = None
+
+    @property
+    def stack(self) -> int:
+        return self.state.stacks[self._seat]
+
+    @stack.setter
+    def stack(self, stack: int):
+        self.state.stacks[self._seat] = stack
+
+    @property
+    def chips_committed(self) -> int:
+        return self.state.chips_committed[self._seat]
+
+    @chips_committed.setter
+    def chips_committed(self, chips_committed: int):
+        self.state.chips_committed[self._seat] = chips_committed
+
+    @property
+    def is_in_hand(self) -> bool:
+        return self.state.is_in_hand[self._seat]
+
+    @is_in_hand.setter
+    def is_in_hand(self, is_in_hand: bool):
+        self.state.is_in_hand[self._seat] = is_in_hand
+
+    @property
+    def random(self):
+        """Generator of the random decisions of the player:
+        the global numpy generator, unless a generator is set in rng"""
+        return np.random if self.rng is None else self.rng
 
     @abstractmethod
     def save(self, folder):
@@ -89,7 +128,14 @@ class AbstractPlayer:
         self.refill = 1
 
     def sit_on_table(self, table, position):
-        """Set the table configuration for the player"""
+        """Set the table configuration for the player.
+        The chips and status of the player are moved to the table state"""
+        state = table.state
+        state.stacks[position] = self.stack
+        state.chips_committed[position] = self.chips_committed
+        state.is_in_hand[position] = self.is_in_hand
+        self.state = state
+        self._seat = position
         self.position = position
         self.table = table
 
@@ -103,87 +149,96 @@ class AbstractPlayer:
         """Method called before a new hand"""
         self.hand = Hand()
         self.cards = (None, None)
-        self.chips_committed = 0
-        self.is_in_hand = True
-        if self.stack <= 0:
-            self.stack = self.base_stack
+        state, seat = self.state, self._seat
+        state.chips_committed[seat] = 0
+        state.is_in_hand[seat] = True
+        if state.stacks[seat] <= 0:
+            state.stacks[seat] = self.base_stack
             self.refill += 1
-        elif self.stack > 10 * self.base_stack:
+        elif state.stacks[seat] > 10 * self.base_stack:
             self.refill -= 9
-            self.stack = self.stack - 9 * self.base_stack
+            state.stacks[seat] -= 9 * self.base_stack
 
     def commit_chips(self, chips_amount: int):
         """Put chips on the table.
         The amount of chips is removed from the stack to be added to the committed chips"""
-        self.stack -= chips_amount
-        self.chips_committed += chips_amount
+        state = self.state
+        state.stacks[self._seat] -= chips_amount
+        state.chips_committed[self._seat] += chips_amount
 
     def call(self) -> Action:
         """Call the last bet. The stack and committed chips are updated accordingly"""
+        state, seat = self.state, self._seat
+        chips_committed = state.chips_committed[seat]
         if (
-            self.chips_committed == self.table.current_bet
-            and self.table.current_bet != 2  # the blend
+            chips_committed == state.current_bet
+            and state.current_bet != 2  # the blend
         ):
             raise ActionError(
                 f"{self.name}-- Call not compatible, as chips committed equal current \
-                    bet ({self.chips_committed})"
+                    bet ({chips_committed})"
             )
-        amount_to_pay = self.table.current_bet - self.chips_committed
-        chips_to_pay = min(amount_to_pay, self.stack)
+        amount_to_pay = state.current_bet - chips_committed
+        chips_to_pay = min(amount_to_pay, state.stacks[seat])
         self.commit_chips(chips_to_pay)
-        if self.stack == 0:
-            self.table.player_all_in = True
+        if state.stacks[seat] == 0:
+            state.player_all_in = True
         return CALL
 
     def raise_pot(self, bet_amount: int) -> Action:
         """Raise the pot.
         The stack and committed chips are updated accordingly,
          as well as the table variables"""
-        current_bet = self.table.current_bet
-        previous_bet = self.table.previous_bet
-        if self.stack <= current_bet:
+        state, seat = self.state, self._seat
+        current_bet = state.current_bet
+        previous_bet = state.previous_bet
+        stack = state.stacks[seat]
+        if stack <= current_bet:
             return self.call()
 
         if (
             bet_amount - current_bet < current_bet - previous_bet
-            and bet_amount < self.stack
+            and bet_amount < stack
         ):
             raise ActionError(
                 f"{self.name} -- Raise amount ({bet_amount}) not compatible with \
                     precedent bet values ({current_bet} and {previous_bet})"
             )
-        chips_to_pay = min(bet_amount - self.chips_committed, self.stack)
+        chips_to_pay = min(bet_amount - state.chips_committed[seat], stack)
         self.commit_chips(chips_to_pay)
-        self.table.previous_bet = current_bet
-        self.table.current_bet = self.chips_committed
-        if self.stack == 0:
-            self.table.player_all_in = True
+        state.previous_bet = current_bet
+        state.current_bet = state.chips_committed[seat]
+        if state.stacks[seat] == 0:
+            state.player_all_in = True
         return RAISE
 
     def fold(self) -> Action:
         """Fold the hand. The player will not play in the rest of the hand"""
-        if self.chips_committed == self.table.current_bet:
+        state, seat = self.state, self._seat
+        if state.chips_committed[seat] == state.current_bet:
             raise ActionError(
                 f"{self.name} -- Fold not usefull as chips committed \
-                    equals current bet ({self.chips_committed})"
+                    equals current bet ({state.chips_committed[seat]})"
             )
-        with suppress(ValueError, AttributeError):
-            for _, player_list in self.table.side_pots:
+        with suppress(ValueError):
+            for _, player_list in state.side_pots:
                 player_list.remove(self.position)
-        self.is_in_hand = False
+        state.is_in_hand[seat] = False
         return FOLD
 
     def check(self) -> Action:
         """Check the pot"""
-        if self.chips_committed < self.table.current_bet:
+        state = self.state
+        chips_committed = state.chips_committed[self._seat]
+        if chips_committed < state.current_bet:
             raise ActionError(
                 f"{self.name} -- Check not authorized as chips_committed \
-                    ({self.chips_committed}) not equal to current_bet ({self.table.current_bet})"
+                    ({chips_committed}) not equal to current_bet ({state.current_bet})"
             )
-        if self.table.current_bet > 2:
+        if state.current_bet > 2:
             # TODO this implementation enables to manage the blends case but is not complete
             raise ActionError(
-                f"{self.name} -- Cannot check when last bet is {self.table.current_bet}"
+                f"{self.name} -- Cannot check when last bet is {state.current_bet}"
             )
         return CHECK
 
@@ -0,0 +1,71 @@
+from abc import abstractmethod
+from typing import Tuple
+
+import numpy as np
+
+from poqrl.hand.utils import Seed
+from poqrl.types.street import Street
+from poqrl.types.action import RAISE, CALL, CHECK, FOLD
+
+
+class BatchPolicy:
+    """Policy of a seat of a 'BatchTable': it decides the actions of the player
+    of this seat on many tables at once"""
+
+    def __init__(self, stack: int = 500, name: str = "BatchPolicy"):
+        self.stack = stack
+        self.name = name
+
+    def reset_hands(self, table, position: int):
+        """Method called before new hands are played on every table"""
+
+    @abstractmethod
+    def act(
+        self, table, tables: np.ndarray, position: int, street: Street
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the actions of the player on the given tables
+        Returns:
+            the action ids, and the amount to raise (ignored if not raising)"""
+
+    def close_hands(self, table, position: int):
+        """Method called at the end of the hands"""
+
+
+class BatchPolicyRandom(BatchPolicy):
+    """Batch version of 'PlayerRandom': on each table, the player draws
+    at the beginning of the hand whether it calls all the bets,
+    and whether it raises when it is not on bet"""
+
+    def __init__(
+        self,
+        stack: int = 400,
+        name="Random Player",
+        aggressivity: float = 0.3,
+        loosiness: float = 0.8,
+        seed: Seed = None,
+    ):
+        super().__init__(stack=stack, name=name)
+        self.aggressivity = aggressivity
+        self.loosiness = loosiness
+        self.rng = np.random.default_rng(seed)
+        self.call_all = None
+        self.aggro_all = None
+
+    def reset_hands(self, table, position: int):
+        self.call_all = self.rng.random(table.n_tables) < self.loosiness
+        self.aggro_all = self.rng.random(table.n_tables) < self.aggressivity
+
+    def act(self, table, tables, position, street):
+        current_bet = table.current_bet[tables]
+        on_bet = table.chips_committed[tables, position] < current_bet
+        actions = np.where(
+            on_bet,
+            np.where(self.call_all[tables], CALL.id, FOLD.id),
+            np.where(self.aggro_all[tables], RAISE.id, CHECK.id),
+        )
+        amounts = np.where(
+            current_bet > 0,
+            3 * current_bet - table.previous_bet[tables],
+            table.pot[tables] // 2,
+        )
+        return actions, amounts
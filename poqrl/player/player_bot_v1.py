@@ -204,7 +204,7 @@ class PlayerBotV1(PlayerTracked):
     def reset_hand(self):
         super().reset_hand()
         self.gradient_variables = {street: [] for street in Street}
-        self.training_street = np.random.choice(self.training_streets)
+        self.training_street = self.random.choice(self.training_streets)
 
     def get_qvalues_network(self):
         net = Sequential()
@@ -250,7 +250,7 @@ class PlayerBotV1(PlayerTracked):
     def get_decision_from_qvalues(self, qvalues, on_bet, training):
         if training:
             choices = [RAISE, CALL] if on_bet else [RAISE, CHECK]
-            decision = np.random.choice(choices)
+            decision = self.random.choice(choices)
         else:
             best_action_value = tf.argmax(qvalues).numpy()
             max_qval = qvalues[best_action_value]
@@ -1,4 +1,3 @@
-import numpy as np
 from typing import Optional, List
 
 from poqrl.player.abstract_player import AbstractPlayer
@@ -25,24 +24,25 @@ class PlayerRandom(AbstractPlayer):
         self.aggro_all = False
 
     def reset_hand(self):
-        self.call_all = np.random.choice([True, False], p=self.p_call_all)
-        self.aggro_all = np.random.choice([True, False], p=self.p_aggro_all)
+        self.call_all = self.random.choice([True, False], p=self.p_call_all)
+        self.aggro_all = self.random.choice([True, False], p=self.p_aggro_all)
         super().reset_hand()
 
     def play_street(self, street: Street) -> Action:
-        if self.chips_committed < self.table.current_bet:
+        state = self.state
+        if state.chips_committed[self._seat] < state.current_bet:
             if self.call_all:
                 return self.call()
             else:
                 return self.fold()
         else:
             if self.aggro_all:
-                if self.stack <= self.table.current_bet:
+                if state.stacks[self._seat] <= state.current_bet:
                     return self.call()
-                if self.table.current_bet > 0:
-                    bet_amount = 3 * self.table.current_bet - self.table.previous_bet
+                if state.current_bet > 0:
+                    bet_amount = 3 * state.current_bet - state.previous_bet
                 else:
-                    bet_amount = int(self.table.pot / 2)
+                    bet_amount = int(state.pot / 2)
                 return self.raise_pot(bet_amount)
             else:
                 return self.check()
@@ -1,35 +1,89 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from collections import deque, defaultdict
+from dataclasses import dataclass
+from operator import attrgetter
 
 
 from poqrl.player.abstract_player import AbstractPlayer
+from poqrl.table.game_state import GameState
 from poqrl.hand.deck import Deck
+from poqrl.hand.evaluator import evaluate_holdings
+from poqrl.hand.utils import Seed
 from poqrl.hand.hand import Hand
 from poqrl.hand.card import Card
 from poqrl.types.street import Street
 from poqrl.types.action import *
 
 
+def _state_attribute(name: str, doc: str) -> property:
+    """Table attribute stored in its game state"""
+
+    def set(table, value):
+        setattr(table.state, name, value)
+
+    return property(attrgetter(f"state.{name}"), set, doc=doc)
+
+
+@dataclass
+class TableSnapshot:
+    """Copy of the state of a hand at a table, without the players
+    Attributes:
+        state: the chips, pots and bets, and the players to play
+        deck: the position of the deck (see 'Deck.snapshot')
+        board: the board cards
+        hands, cards, refills: the hand, hole cards and refill of each player
+        history, hand_info: the actions played in the hand"""
+
+    state: GameState
+    deck: Tuple[List[int], int, int]
+    board: Hand
+    hands: List[Hand]
+    cards: List[Tuple[Card, Card]]
+    refills: List[int]
+    history: Optional[Dict[Street, List]]
+    hand_info: Optional[Dict[int, Dict]]
+
+
+def _copy_history(history: Optional[Dict[Street, List]]):
+    if history is None:
+        return None
+    return {street: list(actions) for street, actions in history.items()}
+
+
+def _copy_hand_info(hand_info: Optional[Dict[int, Dict]]):
+    if hand_info is None:
+        return None
+    return {position: dict(info) for position, info in hand_info.items()}
+
+
 class AbstractTable:
     def __init__(
         self,
         player_list: List[AbstractPlayer],
+        seed: Seed = None,
     ):
         self.players = deque(player_list)
         self.n_players = len(self.players)
-        self.button = self.n_players - 1
+        # state of the hand, shared with the players
+        self.state = GameState(self.n_players)
         self.set_players(player_list)
-        self.deck = Deck()
+        self.deck = Deck(seed=seed)
         self.board = Hand()
-        self.previous_bet = 0
-        self.current_bet = 0
-        self.player_all_in = False
-        self.pot = 0
-        self.side_pots = []
-        self.total_pot = 0
         self.history = None
 
         self.hand_info = None
+        # snapshots of the table before each action applied with 'apply_action'
+        self.undo_stack: List[TableSnapshot] = []
+
+    button = _state_attribute("button", "Position of the button")
+    pot = _state_attribute("pot", "Main pot, shared by the players in hand")
+    side_pots = _state_attribute(
+        "side_pots", "Side pots and the positions of the players who can win them"
+    )
+    total_pot = _state_attribute("total_pot", "Sum of the pots")
+    current_bet = _state_attribute("current_bet", "Chips to commit to call")
+    previous_bet = _state_attribute("previous_bet", "Bet before the last raise")
+    player_all_in = _state_attribute("player_all_in", "Whether a player is all in")
 
     def sit_player(self, player: AbstractPlayer, position: int):
         """Anchor one player to the table"""
@@ -79,35 +133,135 @@ class AbstractTable:
 
     def get_player_action(self, player: AbstractPlayer, street: Street) -> Action:
         play = player.play_street(street)
-        self.history[street].append((player.position, play, self.current_bet))
-
-        self.hand_info[player.position][play.id] += 1
-        self.hand_info[player.position]["total"] += 1
+        self.record_action(player, play, street)
+        return play
 
+    def record_action(self, player: AbstractPlayer, play: Action, street: Street):
+        """Add the action of a player to the history of the hand"""
+        self.history[street].append((player.position, play, self.state.current_bet))
+
+        hand_info = self.hand_info[player.position]
+        hand_info[play.id] += 1
+        hand_info["total"] += 1
+
+    def snapshot(self) -> TableSnapshot:
+        """Return a copy of the state of the hand, without the players.
+        It can be restored on this table, or on a table with the same number
+        of players (e.g. with other policies, for rollouts)"""
+        return TableSnapshot(
+            self.state.copy(),
+            self.deck.snapshot(),
+            self.board.copy(),
+            [player.hand.copy() for player in self.players],
+            [player.cards for player in self.players],
+            [player.refill for player in self.players],
+            _copy_history(self.history),
+            _copy_hand_info(self.hand_info),
+        )
+
+    def restore(self, snapshot: TableSnapshot):
+        """Set the hand back to a snapshot. The snapshot is left unchanged,
+        and can be restored several times"""
+        if len(snapshot.hands) != self.n_players:
+            raise ValueError(
+                f"Cannot restore a snapshot of {len(snapshot.hands)} players "
+                f"on a table of {self.n_players} players"
+            )
+        self.state.update(snapshot.state)
+        self.deck.restore(snapshot.deck)
+        self.board = snapshot.board.copy()
+        for player, hand, cards, refill in zip(
+            self.players, snapshot.hands, snapshot.cards, snapshot.refills
+        ):
+            player.hand = hand.copy()
+            player.cards = cards
+            player.refill = refill
+        self.history = _copy_history(snapshot.history)
+        self.hand_info = _copy_hand_info(snapshot.hand_info)
+
+    def apply_action(
+        self, position: int, action: Action, street: Street, amount: int = 0
+    ) -> Action:
+        """Apply an action for the player at position, without requesting it to
+        the player, and update the players to play as 'play_rounds' does.
+        The action can be cancelled with 'undo'
+        Args:
+            amount: the amount to bet if the action is a raise
+        Returns:
+            the action played (a raise can turn into a call)"""
+        snapshot = self.snapshot()
+        player = self.players[position]
+        if action == RAISE:
+            play = player.raise_pot(amount)
+        elif action == CALL:
+            play = player.call()
+        elif action == CHECK:
+            play = player.check()
+        else:
+            play = player.fold()
+        self.undo_stack.append(snapshot)
+        self.record_action(player, play, street)
+
+        state = self.state
+        state.to_play &= ~(1 << position)
+        state.next_position = position + 1
+        if play == RAISE:
+            state.set_players_to_play(position, 1)
         return play
 
+    def undo(self):
+        """Cancel the last action applied with 'apply_action'"""
+        if not self.undo_stack:
+            raise IndexError("No action to undo")
+        self.restore(self.undo_stack.pop())
+
     def assign_pots(self):
-        self.assign_pot(self.pot, self.get_player_in_hand())
+        # the hands of every contender of a pot are evaluated once, for all the pots
+        positions = {player.position for player in self.get_player_in_hand()}
+        for _, pot_positions in self.side_pots:
+            positions.update(pot_positions)
+        values = self.showdown_values(
+            [self.players[position] for position in sorted(positions)]
+        )
+        self.assign_pot(self.pot, self.get_player_in_hand(), values)
         for pot_and_player in self.side_pots:
             self.assign_pot(
                 pot_and_player[0],
                 [self.players[position] for position in pot_and_player[1]],
+                values,
             )
 
-    def assign_pot(self, pot: int, players: List[AbstractPlayer]):
+    def showdown_values(self, players: List[AbstractPlayer]) -> Dict[int, int]:
+        """Return the hand value of each player (by position) at the showdown"""
+        if len(players) < 2:
+            return {}
+        board = self.board.cards
+        if len(board) != 5:
+            return {player.position: player.hand.value for player in players}
+        holdings = [
+            [card for card in player.hand.cards if not card.is_in(self.board)]
+            for player in players
+        ]
+        return {
+            player.position: value
+            for player, value in zip(players, evaluate_holdings(board, holdings))
+        }
+
+    def assign_pot(
+        self,
+        pot: int,
+        players: List[AbstractPlayer],
+        values: Optional[Dict[int, int]] = None,
+    ):
         if len(players) == 1:
             players[0].stack += pot
             return
-        max_players = [players[0]]
-        max_value = players[0].hand.value
-        for player in players[1:]:
-            player_hand_value = player.hand.value
-            if player_hand_value >= max_value:
-                if player_hand_value == max_value:
-                    max_players.append(player)
-                else:
-                    max_value = player_hand_value
-                    max_players = [player]
+        if values is None or any(player.position not in values for player in players):
+            values = self.showdown_values(players)
+        max_value = max(values[player.position] for player in players)
+        max_players = [
+            player for player in players if values[player.position] == max_value
+        ]
         pot_per_player = int(pot / len(max_players))
         res = pot - len(max_players) * pot_per_player
         for player in max_players:
@@ -118,46 +272,39 @@ class AbstractTable:
         player.stack += pot
 
     def gather_chips_and_continue(self) -> bool:
-        if self.current_bet:
-            n_in_hand = 0
-            if self.player_all_in:
-                side_amount = set([0])
-                for player in self.players:
-                    side_amount.add(player.chips_committed)
-                    if player.is_in_hand:
-                        n_in_hand += 1
-                side_amount = list(side_amount)
-                side_amount.sort()
+        state = self.state
+        if state.current_bet:
+            n_in_hand = sum(state.is_in_hand)
+            chips_committed = state.chips_committed
+            if state.player_all_in:
+                side_amount = sorted(set([0] + chips_committed))
                 vals = [
                     side_amount[i] - side_amount[i - 1]
                     for i in range(1, len(side_amount))
                 ]
                 side_pots = [[0, []] for _ in range(len(vals))]
 
-                for player in self.players:
+                for position in range(self.n_players):
                     i = 0
-                    while player.chips_committed:
+                    while chips_committed[position]:
                         side_pots[i][0] += vals[i]
-                        player.chips_committed -= vals[i]
-                        if player.is_in_hand:
-                            side_pots[i][1].append(player.position)
+                        chips_committed[position] -= vals[i]
+                        if state.is_in_hand[position]:
+                            side_pots[i][1].append(position)
                         i += 1
 
-                side_pots[0][0] += self.pot
-                self.pot, _ = side_pots.pop()
-                self.side_pots += side_pots
-                self.total_pot = self.pot
-                for side_pot in self.side_pots:
-                    self.total_pot += side_pot[0]
+                side_pots[0][0] += state.pot
+                state.pot, _ = side_pots.pop()
+                state.side_pots += side_pots
+                state.total_pot = state.pot
+                for side_pot in state.side_pots:
+                    state.total_pot += side_pot[0]
 
             else:
-                for player in self.players:
-                    self.pot += player.chips_committed
-                    player.chips_committed = 0
-                    if player.is_in_hand:
-                        n_in_hand += 1
-            return n_in_hand, self.get_players_to_play(self.button + 1)
-        return 2, self.get_players_to_play(self.button + 1)
+                state.pot += sum(chips_committed)
+                state.chips_committed = [0] * self.n_players
+            return n_in_hand, self.get_players_to_play(state.button + 1)
+        return 2, self.get_players_to_play(state.button + 1)
 
     def update_button(self):
         self.button = (self.button + 1) % self.n_players
@@ -168,13 +315,9 @@ class AbstractTable:
             player.reset_hand()
         self.board = Hand()
         self.deck.shuffle()
-        # update bet status
-        self.current_bet = 0
-        self.previous_bet = 0
-        # empty the pots
-        self.player_all_in = False
-        self.side_pots = []
-        self.pot = 0
+        # update bet status and empty the pots
+        self.state.reset_hand()
+        self.undo_stack = []
         # clear the precedent hand histroy
         self.history = {street: [] for street in Street}
         self.hand_info = {
@@ -193,22 +336,28 @@ class AbstractTable:
         self.players[(self.button + 2) % self.n_players].raise_pot(2)
 
     def get_players_to_play(self, starting_position: int = 0, exclude_starter: int = 0):
-        player_queue = []
-        for i in range(exclude_starter, self.n_players):
-            player = self.players[(starting_position + i) % self.n_players]
-            if player.is_in_hand and player.stack:
-                player_queue.append(player)
-        return player_queue
+        """Set the players to play in the game state, and return them"""
+        self.state.set_players_to_play(starting_position, exclude_starter)
+        return [self.players[position] for position in self.state.positions_to_play()]
 
     def get_player_in_hand(self):
-        return [player for player in self.players if player.is_in_hand]
+        is_in_hand = self.state.is_in_hand
+        return [player for player in self.players if is_in_hand[player.position]]
 
     def play_rounds(self, player_queue: List[AbstractPlayer], street: Street):
-        while player_queue:
-            player = player_queue.pop(0)
+        """Request the action of the players to play, until none has to play.
+        After a raise, the other players in hand with chips have to play again"""
+        state = self.state
+        state.to_play = 0
+        for player in player_queue:
+            state.to_play |= 1 << player.position
+        if player_queue:
+            state.next_position = player_queue[0].position
+        while state.to_play:
+            player = self.players[state.pop_next_to_play()]
             action = self.get_player_action(player, street)
             if action == RAISE:
-                player_queue = self.get_players_to_play(player.position, 1)
+                state.set_players_to_play(player.position, 1)
 
     def play_preflop(self):
         self.get_blends()
@@ -0,0 +1,366 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.hand.utils import Seed
+from poqrl.player.batch_policy import BatchPolicy
+from poqrl.player.utils import ActionError
+from poqrl.types.street import Street
+from poqrl.types.action import RAISE, CALL, CHECK, FOLD
+
+BOARD_CARDS = 5
+N_ACTIONS = 4
+
+
+class BatchTable:
+    """Play hands on many independent tables in lockstep.
+    The state of the tables (stacks, committed chips, pots, players in hand,
+    players to play) is stored in arrays of shape (n_tables, n_players), and
+    the decisions of a seat are requested to its policy as one batch per step.
+
+    The rules are the ones of 'AbstractTable': on the same deals, and with
+    the same decisions, the stacks of each table are the same.
+    As in 'AbstractTable', the main pot is shared between all the players
+    in hand, and the side pots between the players who paid them"""
+
+    def __init__(self, policies: List[BatchPolicy], n_tables: int, seed: Seed = None):
+        self.policies = policies
+        self.n_players = len(policies)
+        self.n_tables = n_tables
+        self.rng = np.random.default_rng(seed)
+        self.button = self.n_players - 1
+        self.base_stacks = np.array([policy.stack for policy in policies])
+        shape = (n_tables, self.n_players)
+        self.stacks = np.tile(self.base_stacks, (n_tables, 1))
+        self.refill = np.ones(shape, dtype=np.int64)
+        self.chips_committed = np.zeros(shape, dtype=np.int64)
+        self.is_in_hand = np.ones(shape, dtype=bool)
+        self.hole_cards = np.zeros((n_tables, self.n_players, 2), dtype=np.int64)
+        self.board = np.zeros((n_tables, BOARD_CARDS), dtype=np.int64)
+        self.pot = np.zeros(n_tables, dtype=np.int64)
+        self.current_bet = np.zeros(n_tables, dtype=np.int64)
+        self.previous_bet = np.zeros(n_tables, dtype=np.int64)
+        self.player_all_in = np.zeros(n_tables, dtype=bool)
+        # a gathering of the chips adds at most n_players - 1 side pots
+        max_side_pots = len(Street) * self.n_players
+        self.side_pots = np.zeros((n_tables, max_side_pots), dtype=np.int64)
+        self.side_pot_players = np.zeros(
+            (n_tables, max_side_pots, self.n_players), dtype=bool
+        )
+        self.n_side_pots = np.zeros(n_tables, dtype=np.int64)
+        # the players to play in the street, and where to look for the next one
+        self.to_play = np.zeros(shape, dtype=bool)
+        self.next_position = np.zeros(n_tables, dtype=np.int64)
+        # number of actions of each player, per street and action id
+        self.action_counts = np.zeros(
+            (self.n_players, len(Street), N_ACTIONS), dtype=np.int64
+        )
+
+    def get_chips_won(self) -> np.ndarray:
+        """Return the chips won (or lost) by each player on each table"""
+        return self.stacks + self.chips_committed - self.refill * self.base_stacks
+
+    def update_button(self):
+        self.button = (self.button + 1) % self.n_players
+
+    def init_new_hands(self):
+        # refill the ruined players, and bank the chips of the rich ones
+        ruined = self.stacks <= 0
+        rich = self.stacks > 10 * self.base_stacks
+        self.stacks = np.where(ruined, self.base_stacks, self.stacks)
+        self.refill += ruined
+        self.refill -= 9 * rich
+        self.stacks -= 9 * self.base_stacks * rich
+        self.chips_committed[:] = 0
+        self.is_in_hand[:] = True
+        self.current_bet[:] = 0
+        self.previous_bet[:] = 0
+        self.player_all_in[:] = False
+        self.pot[:] = 0
+        self.side_pots[:] = 0
+        self.side_pot_players[:] = False
+        self.n_side_pots[:] = 0
+        for position, policy in enumerate(self.policies):
+            policy.reset_hands(self, position)
+
+    def distribute_cards(self, cards: Optional[np.ndarray] = None):
+        """Distribute two cards to each player and the board cards of each table.
+        Args:
+            cards: array of shape (n_tables, 2 * n_players + 5) of card ids,
+                dealt in the order of 'AbstractTable': two cards to each player
+                then the board. Randomly drawn if not given"""
+        n_cards = 2 * self.n_players + BOARD_CARDS
+        if cards is None:
+            cards = self.rng.random((self.n_tables, 52)).argsort(axis=1)[:, :n_cards]
+        cards = np.asarray(cards, dtype=np.int64)
+        if cards.shape != (self.n_tables, n_cards):
+            raise ValueError(f"Cannot deal cards of shape {cards.shape}")
+        self.hole_cards = cards[:, : 2 * self.n_players].reshape(
+            self.n_tables, self.n_players, 2
+        )
+        self.board = cards[:, 2 * self.n_players :]
+
+    def _check(self, errors: np.ndarray, tables: np.ndarray, position: int, message):
+        if errors.any():
+            raise ActionError(
+                f"{self.policies[position].name} -- {message} "
+                f"(tables {tables[errors].tolist()})"
+            )
+
+    def commit_chips(self, tables: np.ndarray, position: int, amounts: np.ndarray):
+        self.stacks[tables, position] -= amounts
+        self.chips_committed[tables, position] += amounts
+        self.player_all_in[tables[self.stacks[tables, position] == 0]] = True
+
+    def call(self, tables: np.ndarray, position: int):
+        committed = self.chips_committed[tables, position]
+        current_bet = self.current_bet[tables]
+        self._check(
+            (committed == current_bet) & (current_bet != 2),
+            tables,
+            position,
+            "Call not compatible, as chips committed equal current bet",
+        )
+        self.commit_chips(
+            tables,
+            position,
+            np.minimum(current_bet - committed, self.stacks[tables, position]),
+        )
+
+    def raise_pot(
+        self, tables: np.ndarray, position: int, amounts: np.ndarray
+    ) -> np.ndarray:
+        """Raise the pots of the tables, or call if the stack is too short
+        Returns:
+            whether the player raised on each table"""
+        stacks = self.stacks[tables, position]
+        current_bet = self.current_bet[tables]
+        raised = stacks > current_bet
+        self.call(tables[~raised], position)
+        tables, amounts = tables[raised], amounts[raised]
+        stacks, current_bet = stacks[raised], current_bet[raised]
+        self._check(
+            (amounts - current_bet < current_bet - self.previous_bet[tables])
+            & (amounts < stacks),
+            tables,
+            position,
+            "Raise amount not compatible with precedent bet values",
+        )
+        self.commit_chips(
+            tables,
+            position,
+            np.minimum(amounts - self.chips_committed[tables, position], stacks),
+        )
+        self.previous_bet[tables] = current_bet
+        self.current_bet[tables] = self.chips_committed[tables, position]
+        return raised
+
+    def fold(self, tables: np.ndarray, position: int):
+        self._check(
+            self.chips_committed[tables, position] == self.current_bet[tables],
+            tables,
+            position,
+            "Fold not usefull as chips committed equals current bet",
+        )
+        self.is_in_hand[tables, position] = False
+
+    def check(self, tables: np.ndarray, position: int):
+        current_bet = self.current_bet[tables]
+        self._check(
+            self.chips_committed[tables, position] < current_bet,
+            tables,
+            position,
+            "Check not authorized as chips committed not equal to current bet",
+        )
+        self._check(
+            current_bet > 2, tables, position, "Cannot check when last bet is above 2"
+        )
+
+    def play_actions(
+        self,
+        tables: np.ndarray,
+        position: int,
+        actions: np.ndarray,
+        amounts: np.ndarray,
+        street: Street,
+    ) -> np.ndarray:
+        """Apply the actions of a player on the given tables
+        Returns:
+            the id of the action played on each table
+            (a raise is a call when the stack is too short)"""
+        played = np.array(actions, dtype=np.int64)
+        is_raise = played == RAISE.id
+        raised = self.raise_pot(tables[is_raise], position, amounts[is_raise])
+        played[np.flatnonzero(is_raise)[~raised]] = CALL.id
+        self.call(tables[actions == CALL.id], position)
+        self.check(tables[actions == CHECK.id], position)
+        self.fold(tables[actions == FOLD.id], position)
+        self.action_counts[position, street] += np.bincount(played, minlength=N_ACTIONS)
+        return played
+
+    def get_blends(self):
+        tables = np.arange(self.n_tables)
+        small_blind = np.ones(self.n_tables, dtype=np.int64)
+        self.raise_pot(tables, (self.button + 1) % self.n_players, small_blind)
+        self.raise_pot(tables, (self.button + 2) % self.n_players, 2 * small_blind)
+
+    def get_players_to_play(
+        self, tables: np.ndarray, starting_position: int | np.ndarray, exclude_starter=0
+    ):
+        """Set the players to play on the tables: the players in hand
+        with chips, from the starting position"""
+        self.to_play[tables] = self.is_in_hand[tables] & (self.stacks[tables] > 0)
+        if exclude_starter:
+            self.to_play[tables, starting_position] = False
+        self.next_position[tables] = starting_position
+
+    def play_rounds(self, tables: np.ndarray, street: Street):
+        """Request the actions of the players to play, one per table and per step,
+        until no player has to play on any table"""
+        positions = np.arange(self.n_players)
+        while True:
+            tables = tables[self.to_play[tables].any(axis=1)]
+            if not len(tables):
+                return
+            # next player to play after next_position, in the order of the table
+            offsets = (positions - self.next_position[tables, None]) % self.n_players
+            offsets = np.where(self.to_play[tables], offsets, self.n_players)
+            players = (
+                self.next_position[tables] + offsets.min(axis=1)
+            ) % self.n_players
+            for position, policy in enumerate(self.policies):
+                playing = tables[players == position]
+                if not len(playing):
+                    continue
+                actions, amounts = policy.act(self, playing, position, street)
+                played = self.play_actions(
+                    playing,
+                    position,
+                    np.asarray(actions),
+                    np.asarray(amounts, dtype=np.int64),
+                    street,
+                )
+                raised = played == RAISE.id
+                self.get_players_to_play(playing[raised], position, 1)
+                self.to_play[playing[~raised], position] = False
+                self.next_position[playing[~raised]] = (position + 1) % self.n_players
+
+    def play_street(self, tables: np.ndarray, street: Street):
+        self.current_bet[tables] = 0
+        self.previous_bet[tables] = 0
+        self.play_rounds(tables, street)
+
+    def _gather_side_pots(self, tables: np.ndarray):
+        """Split the committed chips into a pot per distinct committed amount.
+        The pot of the biggest amount is the new main pot"""
+        committed = self.chips_committed[tables]
+        rows = np.arange(len(tables))
+        levels = np.sort(committed, axis=1)
+        steps = np.diff(levels, axis=1, prepend=0)
+        # the players with at least a level pay the step to this level
+        amounts = steps * (self.n_players - np.arange(self.n_players))
+        is_level = steps > 0
+        players = self.is_in_hand[tables][:, None, :] & (
+            committed[:, None, :] >= levels[:, :, None]
+        )
+        amounts[rows, is_level.argmax(axis=1)] += self.pot[tables]
+        last = self.n_players - 1 - is_level[:, ::-1].argmax(axis=1)
+        self.pot[tables] = amounts[rows, last]
+        is_level[rows, last] = False
+        slots = self.n_side_pots[tables, None] + is_level.cumsum(axis=1) - 1
+        level_rows, level_columns = np.nonzero(is_level)
+        level_slots = slots[level_rows, level_columns]
+        self.side_pots[tables[level_rows], level_slots] = amounts[
+            level_rows, level_columns
+        ]
+        self.side_pot_players[tables[level_rows], level_slots] = players[
+            level_rows, level_columns
+        ]
+        self.n_side_pots[tables] += is_level.sum(axis=1)
+
+    def gather_chips_and_continue(
+        self, tables: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Gather the committed chips in the pots, and set the players to play
+        the next street
+        Returns:
+            whether the hand continues on each table, and the number of players
+            to play the next street"""
+        betting = self.current_bet[tables] > 0
+        all_in = self.player_all_in[tables]
+        self._gather_side_pots(tables[betting & all_in])
+        gathered = tables[betting & ~all_in]
+        self.pot[gathered] += self.chips_committed[gathered].sum(axis=1)
+        self.chips_committed[tables[betting]] = 0
+        continues = ~betting | (self.is_in_hand[tables].sum(axis=1) > 1)
+        self.get_players_to_play(tables, (self.button + 1) % self.n_players)
+        return continues, self.to_play[tables].sum(axis=1)
+
+    def showdown_values(self) -> np.ndarray:
+        """Return the hand value of each player on the tables with a showdown
+        (0 on the other tables)"""
+        values = np.zeros((self.n_tables, self.n_players), dtype=np.int64)
+        showdown = np.flatnonzero(self.is_in_hand.sum(axis=1) > 1)
+        if len(showdown):
+            hands = np.concatenate(
+                [
+                    self.hole_cards[showdown],
+                    np.broadcast_to(
+                        self.board[showdown, None, :],
+                        (len(showdown), self.n_players, BOARD_CARDS),
+                    ),
+                ],
+                axis=2,
+            )
+            values[showdown] = evaluate_batch(hands.reshape(-1, 7)).reshape(
+                len(showdown), self.n_players
+            )
+        return values
+
+    def assign_pot(self, pots: np.ndarray, players: np.ndarray, values: np.ndarray):
+        """Share each pot between the best players allowed to win it.
+        The remaining chips go to the last of the best players"""
+        values = np.where(players, values, -1)
+        winners = players & (values == values.max(axis=1, keepdims=True))
+        n_winners = winners.sum(axis=1)
+        shares = pots // np.maximum(n_winners, 1)
+        self.stacks += winners * shares[:, None]
+        last = self.n_players - 1 - winners[:, ::-1].argmax(axis=1)
+        self.stacks[np.arange(self.n_tables), last] += np.where(
+            n_winners > 0, pots - n_winners * shares, 0
+        )
+
+    def assign_pots(self):
+        values = self.showdown_values()
+        self.assign_pot(self.pot, self.is_in_hand, values)
+        for side_pot in range(self.n_side_pots.max()):
+            self.assign_pot(
+                self.side_pots[:, side_pot],
+                self.side_pot_players[:, side_pot] & self.is_in_hand,
+                values,
+            )
+
+    def close_hands(self):
+        self.assign_pots()
+        for position, policy in enumerate(self.policies):
+            policy.close_hands(self, position)
+
+    def play_hands(self, cards: Optional[np.ndarray] = None):
+        """Play a hand on every table"""
+        self.update_button()
+        self.init_new_hands()
+        self.distribute_cards(cards)
+        self.get_blends()
+        tables = np.arange(self.n_tables)
+        self.get_players_to_play(tables, (self.button + 3) % self.n_players)
+        self.play_rounds(tables, Street.PREFLOP)
+        continues, n_to_play = self.gather_chips_and_continue(tables)
+        for street in (Street.FLOP, Street.TURN, Street.RIVER):
+            # the other tables go to the showdown, or are won by the last player
+            tables = tables[continues & (n_to_play > 1)]
+            if not len(tables):
+                break
+            self.play_street(tables, street)
+            continues, n_to_play = self.gather_chips_and_continue(tables)
+        self.close_hands()
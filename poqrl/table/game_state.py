@@ -0,0 +1,111 @@
+from typing import Any, Dict, List
+
+
+class GameState:
+    """State of a hand at a table: the chips and status of each seat, the pots
+    and bets, and the players who still have to play in the street.
+    It is shared by the table and the players sitting at it.
+
+    The players to play are a bit mask of the positions: the next player
+    is found from a pointer on the positions without building any list"""
+
+    __slots__ = (
+        "n_players",
+        "stacks",
+        "chips_committed",
+        "is_in_hand",
+        "button",
+        "pot",
+        "side_pots",
+        "total_pot",
+        "current_bet",
+        "previous_bet",
+        "player_all_in",
+        "to_play",
+        "next_position",
+    )
+
+    def __init__(self, n_players: int):
+        self.n_players = n_players
+        self.stacks: List[int] = [0] * n_players
+        self.chips_committed: List[int] = [0] * n_players
+        self.is_in_hand: List[bool] = [True] * n_players
+        self.button = n_players - 1
+        self.to_play = 0
+        self.next_position = 0
+        self.reset_hand()
+
+    def reset_hand(self):
+        """Reset the pots and bets before a new hand"""
+        self.pot = 0
+        self.side_pots: List[List[Any]] = []
+        self.total_pot = 0
+        self.current_bet = 0
+        self.previous_bet = 0
+        self.player_all_in = False
+
+    def set_players_to_play(self, starting_position: int, exclude_starter: int = 0):
+        """Set the players to play: the players in hand with chips,
+        in the order of the table from starting_position"""
+        to_play = 0
+        for position in range(self.n_players):
+            if self.is_in_hand[position] and self.stacks[position]:
+                to_play |= 1 << position
+        if exclude_starter:
+            to_play &= ~(1 << starting_position)
+        self.to_play = to_play
+        self.next_position = starting_position % self.n_players
+
+    def positions_to_play(self) -> List[int]:
+        """Return the positions of the players to play, in their order"""
+        return [
+            position % self.n_players
+            for position in range(
+                self.next_position, self.next_position + self.n_players
+            )
+            if self.to_play >> (position % self.n_players) & 1
+        ]
+
+    def pop_next_to_play(self) -> int:
+        """Return the position of the next player to play, and remove it
+        from the players to play"""
+        to_play = self.to_play
+        after = to_play >> self.next_position
+        if after:
+            position = self.next_position + (after & -after).bit_length() - 1
+        else:
+            position = (to_play & -to_play).bit_length() - 1
+        self.to_play = to_play & ~(1 << position)
+        self.next_position = position + 1
+        return position
+
+    def copy(self) -> "GameState":
+        state = GameState.__new__(GameState)
+        state.update(self)
+        return state
+
+    def update(self, other: "GameState"):
+        """Set the state to a copy of other, in place: the players and the
+        table sharing this state see the change"""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+        self.stacks = list(other.stacks)
+        self.chips_committed = list(other.chips_committed)
+        self.is_in_hand = list(other.is_in_hand)
+        self.side_pots = [[pot, list(players)] for pot, players in other.side_pots]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.copy()._as_dict()
+
+    def _as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, state_dict: Dict[str, Any]) -> "GameState":
+        state = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(state, name, state_dict[name])
+        return state.copy()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GameState) and self._as_dict() == other._as_dict()
@@ -0,0 +1,150 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import os
+
+import numpy as np
+
+from poqrl.hand.utils import default_seed
+from poqrl.player.abstract_player import AbstractPlayer
+from poqrl.player.player_tracked import PlayerTracked
+from poqrl.table.abstract_table import AbstractTable
+
+SIMULATION_CHUNK_SIZE = 100
+
+
+@dataclass
+class SimulationReport:
+    """Merged results of hands played on several tables
+    Attributes:
+        chips_won: the chips won by each player (by position)
+        trackers: the tracker of each tracked player (by position)
+        action_counts: the number of actions of each player (by position), by action id
+        histories: the history of each hand, if kept"""
+
+    n_players: int
+    n_hands: int = 0
+    seed: Optional[int] = None
+    chips_won: List[int] = field(default_factory=list)
+    trackers: Dict[int, Dict[str, Dict]] = field(default_factory=dict)
+    action_counts: List[Dict] = field(default_factory=list)
+    histories: List[Dict] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.chips_won:
+            self.chips_won = [0] * self.n_players
+        if not self.action_counts:
+            self.action_counts = [defaultdict(int) for _ in range(self.n_players)]
+
+    def add(self, other: "SimulationReport") -> "SimulationReport":
+        """Merge the report of other hands, played after the ones of this report"""
+        self.n_hands += other.n_hands
+        for position in range(self.n_players):
+            self.chips_won[position] += other.chips_won[position]
+            for action_id, count in other.action_counts[position].items():
+                self.action_counts[position][action_id] += count
+        for position, tracker in other.trackers.items():
+            merged = self.trackers.setdefault(position, PlayerTracked.empty_tracker())
+            for street_name, street_tracker in tracker.items():
+                for key, count in street_tracker.items():
+                    merged[street_name][key] += count
+        self.histories += other.histories
+        return self
+
+
+def play_chunk(
+    players: List[AbstractPlayer],
+    n_hands: int,
+    seed_sequence: np.random.SeedSequence,
+    keep_history: bool = False,
+) -> SimulationReport:
+    """Play hands on a new table, with the players reset.
+    The deck and the generator of the players' decisions are seeded by
+    seed_sequence, so the result does not depend on the process"""
+    deck_seed, players_seed = seed_sequence.spawn(2)
+    rng = np.random.RandomState(np.random.MT19937(players_seed))
+    for player in players:
+        player.reset_player()
+        player.rng = rng
+    table = AbstractTable(players, seed=np.random.default_rng(deck_seed))
+    report = SimulationReport(len(players), n_hands)
+    for _ in range(n_hands):
+        table.play_hand()
+        for position, hand_info in table.hand_info.items():
+            for action_id, count in hand_info.items():
+                report.action_counts[position][action_id] += count
+        if keep_history:
+            report.histories.append(table.history)
+    for position, player in enumerate(players):
+        report.chips_won[position] = player.get_chips_won()
+        if isinstance(player, PlayerTracked):
+            report.trackers[position] = player.tracker
+    return report
+
+
+# the players of a worker process, copied once by the pool initializer
+_WORKER_PLAYERS: List[AbstractPlayer] = []
+
+
+def _init_worker(players: List[AbstractPlayer]) -> None:
+    global _WORKER_PLAYERS
+    _WORKER_PLAYERS = players
+
+
+def _play_worker_chunk(
+    n_hands: int, seed_sequence: np.random.SeedSequence, keep_history: bool
+) -> SimulationReport:
+    return play_chunk(_WORKER_PLAYERS, n_hands, seed_sequence, keep_history)
+
+
+def run_simulation(
+    players: List[AbstractPlayer],
+    n_hands: int,
+    seed: int | np.random.SeedSequence | None = None,
+    n_workers: int = 1,
+    chunk_size: int = SIMULATION_CHUNK_SIZE,
+    keep_history: bool = False,
+) -> SimulationReport:
+    """Play n_hands hands with frozen players, split in chunks of chunk_size
+    hands played on independent tables, in this process or,
+    if n_workers > 1, by a pool of n_workers processes (0 for one per CPU).
+    Each chunk resets the players and has its own seed, and the reports are
+    merged in the order of the chunks: for a given seed, the report does not
+    depend on the number of workers. The players are played in place in this
+    process (their generator is restored at the end), and copied once in each
+    worker process. Without seed, the seed is spawned by 'default_seed'"""
+    if isinstance(seed, np.random.SeedSequence):
+        seed_sequence = seed
+    else:
+        seed_sequence = default_seed() if seed is None else np.random.SeedSequence(seed)
+    chunk_sizes = [chunk_size] * (n_hands // chunk_size)
+    if n_hands % chunk_size:
+        chunk_sizes.append(n_hands % chunk_size)
+    seed_sequences = seed_sequence.spawn(len(chunk_sizes))
+    n_workers = n_workers or os.cpu_count() or 1
+    report = SimulationReport(
+        len(players), seed=seed if isinstance(seed, int) else None
+    )
+    if n_workers <= 1:
+        rngs = [player.rng for player in players]
+        try:
+            for chunk_hands, seed_sequence in zip(chunk_sizes, seed_sequences):
+                report.add(
+                    play_chunk(players, chunk_hands, seed_sequence, keep_history)
+                )
+        finally:
+            for player, rng in zip(players, rngs):
+                player.rng = rng
+        return report
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(players,)
+    ) as executor:
+        for chunk_report in executor.map(
+            _play_worker_chunk,
+            chunk_sizes,
+            seed_sequences,
+            [keep_history] * len(chunk_sizes),
+        ):
+            report.add(chunk_report)
+    return report
@@ -2,9 +2,14 @@ from pathlib import Path
 from typing import List, Type
 
 from tqdm import tqdm
+import numpy as np
 import tensorflow as tf
 
+from poqrl.hand.utils import default_seed
 from poqrl.table.abstract_table import AbstractTable
+from poqrl.table.batch_table import BatchTable
+from poqrl.player.batch_policy import BatchPolicy
+from poqrl.training.simulation import run_simulation
 from poqrl.player.abstract_player import AbstractPlayer
 from poqrl.player.player_tracked import PlayerTracked
 from poqrl.types.street import Street
@@ -16,6 +21,7 @@ def train_bot(
     n_hand: int = 1000,
     saving_folder: Path | None = None,
     checkpoint: int = 100,
+    seed: int | np.random.SeedSequence | None = None,
 ):
     print(f"Training {bot.name}")
     for competitor in competitors:
@@ -24,7 +30,7 @@ def train_bot(
     bot.reset_player()
     bot.training = True
 
-    table = AbstractTable(player_list=[bot] + competitors)
+    table = AbstractTable(player_list=[bot] + competitors, seed=seed)
 
     for _ in tqdm(range(n_hand)):
         table.play_hand()
@@ -34,7 +40,16 @@ def train_bot(
     # PlayerTracked.display_tracker(bot.tracker)
 
 
-def test_bot(bot: PlayerTracked, competitors: List[PlayerTracked], n_hand=1000):
+def test_bot(
+    bot: PlayerTracked,
+    competitors: List[PlayerTracked],
+    n_hand=1000,
+    n_workers: int = 1,
+    seed: int | np.random.SeedSequence | None = None,
+):
+    """Play n_hand hands with frozen players, and merge the tracker of the bot.
+    The hands are played in this process, or spread over n_workers
+    processes if n_workers > 1 (see 'run_simulation')"""
     print(f"Testing {bot.name}")
     for competitor in competitors:
         competitor.reset_player()
@@ -42,11 +57,26 @@ def test_bot(bot: PlayerTracked, competitors: List[PlayerTracked], n_hand=1000):
     bot.reset_player()
     bot.training = False
 
-    table = AbstractTable(player_list=[bot] + competitors)
-    for _ in tqdm(range(n_hand)):
-        table.play_hand()
-    print(table)
+    report = run_simulation([bot] + competitors, n_hand, seed, n_workers)
+    for player, chips_won in zip([bot] + competitors, report.chips_won):
+        print(f"{player.name}: {chips_won} chips won")
+    bot.tracker = report.trackers[0]
     PlayerTracked.display_tracker(bot.tracker)
+    return report
+
+
+def test_batch_policies(
+    policies: List[BatchPolicy], n_hand: int = 1000, n_tables: int = 1000, seed=None
+):
+    """Play n_hand hands on each of n_tables tables in lockstep,
+    and return the average chips won per hand by each policy"""
+    table = BatchTable(policies, n_tables, seed=seed)
+    for _ in tqdm(range(n_hand)):
+        table.play_hands()
+    chips_won = table.get_chips_won().sum(axis=0) / (n_hand * n_tables)
+    for policy, policy_chips_won in zip(policies, chips_won):
+        print(f"{policy.name}: {policy_chips_won:.3f} chips per hand")
+    return chips_won
 
 
 def train_loop(
@@ -58,11 +88,15 @@ def train_loop(
     n_testing,
     n_training_loop,
     saving_folder,
+    seed: int | None = None,
 ):
+    """The hands of every training and test phase are dealt from seeds
+    spawned from seed (see 'default_seed' if None)"""
+    seeds = default_seed() if seed is None else np.random.SeedSequence(seed)
     try:
         for i in range(1):
-            train_bot(bot, init_player_list, n_training)
-            test_bot(bot, init_player_list, n_testing)
+            train_bot(bot, init_player_list, n_training, seed=seeds.spawn(1)[0])
+            test_bot(bot, init_player_list, n_testing, seed=seeds.spawn(1)[0])
 
         bot.save_data(saving_folder)
         print("END OF WARMING")
@@ -72,9 +106,16 @@ def train_loop(
             for competitor in competitors:
                 competitor.load_data_from_path(saving_folder / bot_name)
             for i in range(2):
-                train_bot(bot, competitors, n_training, saving_folder, checkpoint=400)
+                train_bot(
+                    bot,
+                    competitors,
+                    n_training,
+                    saving_folder,
+                    checkpoint=400,
+                    seed=seeds.spawn(1)[0],
+                )
                 bot.save_data(saving_folder)
-                test_bot(bot, competitors, n_testing)
+                test_bot(bot, competitors, n_testing, seed=seeds.spawn(1)[0])
     except KeyboardInterrupt:
         bot.save_data(saving_folder)
         return bot, None
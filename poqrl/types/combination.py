@@ -0,0 +1,34 @@
+from enum import IntEnum, unique
+
+
+@unique
+class Combination(IntEnum):
+    """Define the hand categories, by increasing strength"""
+
+    HIGH = 0
+    PAIR = 1
+    TWO_PAIRS = 2
+    SET = 3
+    QUINTE = 4
+    FLUSH = 5
+    FULL_HOUSE = 6
+    SQUARE = 7
+    QUINTE_FLUSH = 8
+
+    @property
+    def label(self) -> str:
+        return self.name.lower().replace("_", " ")
+
+
+# lowest hand value of each combination
+COMBINATION_BASE_VALUES = (
+    0,
+    1302540,
+    2400780,
+    2524332,
+    2579244,
+    2589444,
+    2594552,
+    2598296,
+    2598920,
+)
@@ -0,0 +1,277 @@
+"""Micro-benchmarks of the poqrl.hand hot paths.
+
+Every benchmark draws its inputs with a fixed seed, and reports the number of
+operations per second, the peak memory allocated by one call and the number of
+memory blocks still allocated after a call. The results are saved as JSON and
+compared to a baseline: a benchmark slower than the baseline by more than the
+threshold is a regression, and the script exits with an error."""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import typer
+
+from poqrl.hand.card import CARDS
+from poqrl.hand.deck import Deck
+from poqrl.hand.evaluator import evaluate_batch
+from poqrl.hand.hand import Hand
+from poqrl.hand.stats_cache import HAND_STATS_CACHE
+from poqrl.hand.utils import all_hands_from_cards
+import poqrl.hand.hand_values as hand_values
+
+# a benchmark returns a function running one call, and the number of operations of a call
+Benchmark = Callable[[np.random.Generator], Tuple[Callable[[], object], int]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+N_HANDS = 1000
+
+
+def benchmark(name: str):
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+def random_hands(rng: np.random.Generator, sizes: List[int]) -> List[Hand]:
+    """Draw N_HANDS hands, with sizes cycling over sizes"""
+    return [
+        Hand(
+            [CARDS[card_id] for card_id in rng.permutation(52)[: sizes[i % len(sizes)]]]
+        )
+        for i in range(N_HANDS)
+    ]
+
+
+@benchmark("hand_evaluate")
+def bench_hand_evaluate(rng):
+    hands = random_hands(rng, [5, 6, 7, 7])
+
+    def run():
+        for hand in hands:
+            hand.evaluate()
+
+    return run, len(hands)
+
+
+@benchmark("hand_scan_evaluate")
+def bench_hand_scan_evaluate(rng):
+    hands = random_hands(rng, [5, 6, 7, 7])
+
+    def run():
+        for hand in hands:
+            hand.scan_evaluate()
+
+    return run, len(hands)
+
+
+@benchmark("evaluate_batch_7")
+def bench_evaluate_batch(rng):
+    card_ids = np.argsort(rng.random((1 << 16, 52)), axis=1)[:, :7]
+    return (lambda: evaluate_batch(card_ids)), len(card_ids)
+
+
+# the statistics missing from the tables are computed once per canonical hand,
+# and then found in HAND_STATS_CACHE: both costs are reported
+@benchmark("hand_avg_value")
+def bench_hand_avg_value(rng):
+    # without tables, each average value is a Monte Carlo estimation
+    hands = random_hands(rng, [2, 3, 4])[:10]
+
+    def run():
+        HAND_STATS_CACHE.clear()
+        for hand in hands:
+            hand._avg_value = None
+            hand.avg_value
+
+    return run, len(hands)
+
+
+@benchmark("hand_avg_value_cached")
+def bench_hand_avg_value_cached(rng):
+    hands = random_hands(rng, [2, 3, 4])
+
+    def run():
+        for hand in hands:
+            hand._avg_value = None
+            hand.avg_value
+
+    return run, len(hands)
+
+
+@benchmark("hand_quantile_values")
+def bench_hand_quantile_values(rng):
+    hands = random_hands(rng, [5, 6])[:100]
+
+    def run():
+        HAND_STATS_CACHE.clear()
+        for hand in hands:
+            hand._quantile_values = None
+            hand.quantile_values
+
+    return run, len(hands)
+
+
+@benchmark("hand_quantile_values_cached")
+def bench_hand_quantile_values_cached(rng):
+    hands = random_hands(rng, [5, 6])
+
+    def run():
+        for hand in hands:
+            hand._quantile_values = None
+            hand.quantile_values
+
+    return run, len(hands)
+
+
+@benchmark("hand_light_hash")
+def bench_hand_light_hash(rng):
+    hands = random_hands(rng, [2, 3, 4, 5, 6, 7])
+
+    def run():
+        for hand in hands:
+            hand.light_hash
+
+    return run, len(hands)
+
+
+@benchmark("hand_canonical_index")
+def bench_hand_canonical_index(rng):
+    hands = random_hands(rng, [2, 5, 6, 7])
+
+    def run():
+        for hand in hands:
+            hand.canonical_index
+
+    return run, len(hands)
+
+
+@benchmark("deck_distribute_random_card")
+def bench_deck_distribute(rng):
+    deck = Deck(seed=rng)
+    n_cards = 17
+
+    def run():
+        deck.shuffle()
+        for _ in range(n_cards):
+            deck.distribute_random_card()
+
+    return run, n_cards
+
+
+@benchmark("all_hands_from_cards")
+def bench_all_hands_from_cards(rng):
+    cards = [CARDS[card_id] for card_id in rng.permutation(52)[:5]]
+
+    def run():
+        for _ in all_hands_from_cards(7, cards):
+            pass
+
+    return run, 1081
+
+
+def measure(name: str, seed: int, min_time: float, repeat: int) -> Dict[str, float]:
+    run, n_operations = BENCHMARKS[name](np.random.default_rng(seed))
+    run()  # warm up: tables, caches
+    n_calls = 1
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    if elapsed > 0:
+        n_calls = max(1, int(min_time / elapsed))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            run()
+        best = min(best, (time.perf_counter() - start) / n_calls)
+
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.reset_peak()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    retained_blocks = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+    return {
+        "ops_per_sec": n_operations / best,
+        "peak_bytes_per_op": peak / n_operations,
+        "retained_blocks_per_op": retained_blocks / n_operations,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Print the speed of each benchmark relatively to the baseline,
+    and return the names of the regressions"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:32s} {result['ops_per_sec']:14.0f} ops/s (no baseline)")
+            continue
+        ratio = result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+        flag = ""
+        if ratio < 1 - threshold:
+            regressions.append(name)
+            flag = "REGRESSION"
+        print(f"{name:32s} {result['ops_per_sec']:14.0f} ops/s x{ratio:5.2f} {flag}")
+    return regressions
+
+
+def main(
+    output: Path = Path("store/benchmark_hand.json"),
+    baseline: Path = Path("store/benchmark_hand_baseline.json"),
+    save_baseline: bool = False,
+    threshold: float = 0.2,
+    seed: int = 77,
+    min_time: float = 0.2,
+    repeat: int = 5,
+    only: Optional[List[str]] = typer.Option(None),
+):
+    """Run the benchmarks, save the results and compare them to the baseline"""
+    names = only or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        results[name] = measure(name, seed, min_time, repeat)
+        print(
+            f"{name:32s} {results[name]['ops_per_sec']:14.0f} ops/s "
+            f"{results[name]['peak_bytes_per_op']:10.1f} peak B/op "
+            f"{results[name]['retained_blocks_per_op']:8.2f} blocks/op"
+        )
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": seed,
+        "data_dir": str(hand_values.DATA_DIR),
+        "benchmarks": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    if save_baseline:
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved in {baseline}")
+        return
+    if not baseline.exists():
+        print(f"No baseline in {baseline}, run with --save-baseline to create it")
+        return
+    regressions = compare(
+        results, json.loads(baseline.read_text())["benchmarks"], threshold
+    )
+    if regressions:
+        print(f"{len(regressions)} regressions above {threshold:.0%}: {regressions}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,26 +1,39 @@
+from pathlib import Path
+from typing import Optional
+
 from tqdm import tqdm
 import typer
-from poqrl.hand.utils import all_hands
-from poqrl.hand.hand_values import HAND_AVG_VALUES, save_hand_value_dict
-
-
-def main(n_card_hand: int):
 
-    if not n_card_hand in HAND_AVG_VALUES:
-        raise ValueError(f"No hash table for hand of size {n_card_hand}")
+from poqrl.hand.precompute import HistogramJob, PrecomputeJob, SHARD_SIZE
 
-    hand_values_hash_table = HAND_AVG_VALUES[n_card_hand]
 
-    try:
-        for hand in tqdm(all_hands(n_card_hand)):
-            hand_key = hand.hash
-            if hand_key not in hand_values_hash_table:
-                hand_values_hash_table[
-                    hand_key
-                ] = hand.compute_7cards_hand_average_value()
-        save_hand_value_dict(n_card_hand, hand_values_hash_table)
-    except KeyboardInterrupt:
-        save_hand_value_dict(n_card_hand, hand_values_hash_table)
+def main(
+    min_card_hand: int = 2,
+    max_card_hand: int = 6,
+    checkpoint_dir: Path = Path("store/precompute"),
+    n_workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+    exact: bool = False,
+):
+    """Compute the average value and quantile tables of the hands of
+    min_card_hand to max_card_hand cards. The job can be interrupted,
+    and resumes from its checkpoints when run again.
+    By default, the completions of the 6 cards hands are evaluated once and
+    the quantiles of every size come from histograms. With --exact,
+    each size is computed separately with exact quantiles"""
+    if not exact:
+        job = HistogramJob(checkpoint_dir, shard_size)
+        n_pending = len(job.pending_shards())
+        for _ in tqdm(job.run(n_workers), total=n_pending, desc="histograms"):
+            pass
+        job.save_tables(min_card_hand, n_workers, max_cards=max_card_hand)
+        return
+    for n_card_hand in range(max_card_hand, min_card_hand - 1, -1):
+        job = PrecomputeJob(n_card_hand, checkpoint_dir, shard_size)
+        n_pending = len(job.pending_shards())
+        for _ in tqdm(job.run(n_workers), total=n_pending, desc=f"{n_card_hand} cards"):
+            pass
+        job.save_tables()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+import typer
+from poqrl.hand.hand_values import (
+    HAND_QUANTILE_VALUES_FOLDER,
+    load_hand_value_dict,
+    load_hand_quantiles,
+    hash_table_to_array,
+    save_hand_value_table,
+    save_hand_quantile_table,
+)
+
+
+def main(min_card_hand: int = 2, max_card_hand: int = 6):
+    """Convert the pickled hand value and quantile hash tables
+    into memory-mappable hand tables"""
+    for n_card_hand in range(min_card_hand, max_card_hand + 1):
+        hand_value_dict = load_hand_value_dict(n_card_hand)
+        if hand_value_dict:
+            save_hand_value_table(
+                n_card_hand, hash_table_to_array(n_card_hand, hand_value_dict)
+            )
+            print(
+                f"{len(hand_value_dict)} average values of {n_card_hand} cards converted"
+            )
+        quantiles = load_hand_quantiles(n_card_hand, HAND_QUANTILE_VALUES_FOLDER)
+        if quantiles:
+            save_hand_quantile_table(
+                n_card_hand,
+                hash_table_to_array(n_card_hand, quantiles),
+                HAND_QUANTILE_VALUES_FOLDER,
+            )
+            print(f"{len(quantiles)} quantiles of {n_card_hand} cards converted")
+
+
+if __name__ == "__main__":
+    typer.run(main)
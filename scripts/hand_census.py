@@ -0,0 +1,35 @@
+"""Evaluate every hand of a given size, and compare the counts of each
+combination, the number of distinct values and the checksum of the values
+with the reference ones: an end-to-end correctness and throughput check
+of the hand evaluator."""
+
+import time
+
+import typer
+
+from poqrl.hand.census import hand_census
+from poqrl.types.combination import Combination
+
+
+def main(n_cards: int = 7, n_workers: int = None):
+    start = time.perf_counter()
+    census = hand_census(n_cards, n_workers)
+    elapsed = time.perf_counter() - start
+    for combination, count in zip(Combination, census.combination_counts):
+        print(f"{combination.label:14s} {count:12d}")
+    print(
+        f"{len(census.value_counts)} distinct values, checksum {census.checksum:#018x}"
+    )
+    print(
+        f"{census.n_hands} hands in {elapsed:.1f}s: {census.n_hands / elapsed:.0f} hands/s"
+    )
+    errors = census.mismatches()
+    for error in errors:
+        print(error)
+    if errors:
+        raise typer.Exit(code=1)
+    print("Census verified")
+
+
+if __name__ == "__main__":
+    typer.run(main)
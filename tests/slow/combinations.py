@@ -1,14 +1,19 @@
 from collections import defaultdict
-from poqrl.hand.hand import Hand
-from poqrl.hand.card import Card
+
+from poqrl.hand.census import REFERENCE_COMBINATION_COUNTS
 from poqrl.hand.utils import all_hands
+from poqrl.types.combination import Combination
 
 
 def test_all_hands(n_card):
     combination_occurencies = defaultdict(int)
     for hand in all_hands(n_card):
-        combination_occurencies[hand.get_combination()]
+        combination_occurencies[hand.get_combination()] += 1
     return combination_occurencies
 
 
-print(test_all_hands(5))
+occurencies = test_all_hands(5)
+print(occurencies)
+assert [occurencies[combination.label] for combination in Combination] == list(
+    REFERENCE_COMBINATION_COUNTS[5]
+)
@@ -1,6 +1,7 @@
 # pylint: skip-file
 import pytest
-from poqrl.hand.card import Card
+from poqrl.hand.card import Card, cards_mask, mask_ids, mask_cards
+from poqrl.hand.hand import Hand
 
 
 def test_card_from_hash():
@@ -37,3 +38,40 @@ def test_card_comparison():
     assert not Card(high=11, suit=0) <= Card(high=0, suit=0)
     assert not Card(high=3, suit=2) == Card(high=2, suit=3)
     assert not Card(id=13) == Card(id=14)
+
+
+def test_card_interning():
+    assert Card(id=35) is Card(card_hash="Jh")
+    assert Card(high=9, suit=2) is Card(id=35)
+    assert len({Card(id=id) for id in range(52)} | {Card(id=3)}) == 52
+
+
+def test_card_immutable_and_picklable():
+    import pickle
+
+    card = Card(card_hash="Td")
+    with pytest.raises(AttributeError):
+        card.high = 3
+    assert pickle.loads(pickle.dumps(card)) is card
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"id": 52}, {"high": 13, "suit": 0}, {"card_hash": "1c"}, {}]
+)
+def test_card_wrong_arguments(kwargs):
+    with pytest.raises(ValueError):
+        Card(**kwargs)
+
+
+def test_card_masks():
+    hand = Hand(hand_hash="AsKd7h")
+    assert hand.mask == cards_mask(hand.cards)
+    assert Card(card_hash="Kd").is_in(hand)
+    assert not Card(card_hash="Ks").is_in(hand)
+    hand.add_card(Card(card_hash="Ks"))
+    assert Card(card_hash="Ks").is_in(hand)
+    assert mask_ids(hand.mask) == sorted(card.id for card in hand.cards)
+    assert mask_cards(cards_mask([Card(id=3), Card(id=50)])) == [
+        Card(id=3),
+        Card(id=50),
+    ]
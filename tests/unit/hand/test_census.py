@@ -0,0 +1,34 @@
+import numpy as np
+
+from poqrl.hand.census import Census, block_census, hand_census, range_census
+from poqrl.hand.enumeration import CombinationEnumerator
+from poqrl.hand.hand import Hand
+from poqrl.types.combination import Combination
+
+
+def test_hand_census_5_cards():
+    census = hand_census(5, n_workers=1)
+    assert census.mismatches() == []
+    assert census.combination_counts[Combination.QUINTE_FLUSH] == 40
+
+
+def test_census_merge_order():
+    n_hands = len(CombinationEnumerator(5))
+    first = range_census(5, 0, n_hands // 3)
+    second = range_census(5, n_hands // 3, n_hands)
+    merged = Census(5).add(second).add(first)
+    assert merged.n_hands == n_hands
+    assert merged.checksum == hand_census(5, n_workers=1).checksum
+
+
+def test_block_census_ambiguous_values():
+    # a flush and a full house with the same value
+    flush = Hand(hand_hash="9cTcQcKcAc")
+    full_house = Hand(hand_hash="2c3c2d3d2h")
+    assert flush.value == full_house.value
+    census = block_census(
+        np.array([[card.id for card in hand.cards] for hand in (flush, full_house)])
+    )
+    assert census.value_counts == {flush.value: 2}
+    assert census.combination_counts[Combination.FLUSH] == 1
+    assert census.combination_counts[Combination.FULL_HOUSE] == 1
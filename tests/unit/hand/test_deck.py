@@ -0,0 +1,53 @@
+from poqrl.hand.card import Card, FULL_DECK_MASK
+from poqrl.hand.deck import Deck
+from poqrl.hand.utils import DEFAULT_DECK_SEED, default_seed
+
+
+def deal(deck, n_cards):
+    return [deck.distribute_random_card() for _ in range(n_cards)]
+
+
+def test_deck_distribute_all_cards():
+    deck = Deck(seed=0)
+    cards = deal(deck, 52)
+    assert len(set(cards)) == 52
+    assert deck.distributed_mask == FULL_DECK_MASK
+    assert deck.remaining_mask == 0
+    assert deck.deck == []
+
+
+def test_deck_distributed_cards():
+    distributed = [Card(card_hash="As"), Card(card_hash="Kh")]
+    deck = Deck(list(distributed), seed=1)
+    cards = deal(deck, 50)
+    assert not set(cards) & set(distributed)
+    deck.shuffle()
+    assert len(deck.deck) == 52
+    assert len(set(deal(deck, 52))) == 52
+
+
+def test_deck_seed():
+    assert deal(Deck(seed=7), 17) == deal(Deck(seed=7), 17)
+    assert deal(Deck(seed=7), 17) != deal(Deck(seed=8), 17)
+    deck = Deck(seed=7)
+    first_hand = deal(deck, 17)
+    deck.shuffle()
+    assert deal(deck, 17) != first_hand
+
+
+def test_deck_snapshot_restore():
+    deck = Deck(seed=3)
+    dealt = deal(deck, 5)
+    snapshot = deck.snapshot()
+    deal(deck, 10)
+    deck.restore(snapshot)
+    assert deck.ditributed_cards == dealt
+    assert len(deck.deck) == 47
+    assert not set(deal(deck, 47)) & set(dealt)
+
+
+def test_deck_default_seed():
+    seed = default_seed()
+    assert seed.entropy == DEFAULT_DECK_SEED
+    assert default_seed().spawn_key != seed.spawn_key
+    assert deal(Deck(), 17) != deal(Deck(), 17)
@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+from poqrl.hand.card import CARDS
+from poqrl.hand.decoding import (
+    AMBIGUOUS_VALUES,
+    decode_combination,
+    decode_combinations,
+    decode_value,
+)
+from poqrl.hand.hand import Hand
+from poqrl.types.combination import Combination
+
+
+@pytest.mark.parametrize(
+    "hand_hash, combination, highs",
+    [
+        ("Ks7d9c9d8sKhQh", Combination.TWO_PAIRS, (11, 7, 10)),
+        ("KsKd9c9d8sKhQh", Combination.FULL_HOUSE, (11, 7)),
+        ("As7d5c4d2s3hQh", Combination.QUINTE, (3,)),
+        ("2s3s4s5sAs", Combination.QUINTE_FLUSH, (3,)),
+        ("AsAdAcAh2s", Combination.SQUARE, (12, 0)),
+        ("7c2d4h5s9c", Combination.HIGH, (7, 5, 3, 2, 0)),
+        # the value of the best high hands is above the lowest pair
+        ("AcKdQhJs9c", Combination.HIGH, (12, 11, 10, 9, 7)),
+        ("2c2d3h4s5c", Combination.PAIR, (0, 3, 2, 1)),
+        ("2c2d2h4s5c", Combination.SET, (0, 3, 2)),
+        ("Ks8sJs9sTh4s", Combination.FLUSH, (11, 9, 7, 6, 2)),
+    ],
+)
+def test_decode_value(hand_hash, combination, highs):
+    decoded = decode_value(Hand(hand_hash=hand_hash).value)
+    assert decoded.combination == combination
+    assert decoded.highs == highs
+
+
+@pytest.mark.parametrize("n_card", [5, 7])
+def test_decode_combination(n_card):
+    rng = random.Random(n_card)
+    values = []
+    for _ in range(2000):
+        hand = Hand(rng.sample(CARDS, n_card))
+        values.append(hand.value)
+        if hand.value not in AMBIGUOUS_VALUES:
+            assert decode_combination(
+                hand.value
+            ).label == hand._get_combination_from_scan(*hand._scan())
+    assert decode_combinations(np.array(values)).tolist() == [
+        decode_combination(value) for value in values
+    ]
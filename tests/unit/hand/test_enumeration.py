@@ -0,0 +1,51 @@
+# pylint: skip-file
+from itertools import combinations
+from math import comb
+
+import numpy as np
+import pytest
+from poqrl.hand.card import Card, cards_mask
+from poqrl.hand.enumeration import (
+    CombinationEnumerator,
+    rank_combination,
+    unrank_combination,
+    unrank_combinations,
+)
+
+
+@pytest.mark.parametrize("n, k", [(10, 3), (8, 1), (7, 7), (12, 5)])
+def test_rank_unrank(n, k):
+    colex = sorted(combinations(range(n), k), key=lambda c: c[::-1])
+    for rank, indices in enumerate(colex):
+        assert rank_combination(indices) == rank
+        assert unrank_combination(rank, k) == list(indices)
+    assert unrank_combinations(np.arange(len(colex)), k).tolist() == [
+        list(c) for c in colex
+    ]
+
+
+def test_unrank_large_ranks():
+    ranks = np.array([0, 1234567, comb(52, 7) - 1])
+    for rank, indices in zip(ranks, unrank_combinations(ranks, 7)):
+        assert unrank_combination(int(rank), 7) == indices.tolist()
+
+
+def test_enumerator_with_dead_cards():
+    dead_cards = [Card(id=7), Card(id=35), Card(id=51), Card(id=3)]
+    enumerator = CombinationEnumerator(3, cards_mask(dead_cards))
+    assert len(enumerator) == comb(48, 3)
+    blocks = np.concatenate(list(enumerator.blocks(block_size=1000)))
+    assert blocks.shape == (17296, 3)
+    assert not np.isin(blocks, [7, 35, 51, 3]).any()
+    assert len({tuple(ids) for ids in blocks.tolist()}) == 17296
+    assert enumerator.rank(blocks[1234]) == 1234
+    assert enumerator.unrank(1234) == blocks[1234].tolist()
+
+
+def test_enumerator_split():
+    enumerator = CombinationEnumerator(2)
+    chunks = enumerator.split(7)
+    assert chunks[0][0] == 0 and chunks[-1][1] == 1326
+    assert all(stop == start for (_, stop), (start, _) in zip(chunks, chunks[1:]))
+    ids = np.concatenate([enumerator.combinations(*chunk) for chunk in chunks])
+    assert (ids == enumerator.combinations()).all()
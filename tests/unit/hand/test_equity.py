@@ -0,0 +1,59 @@
+import pytest
+
+import poqrl.hand.equity as equity_lib
+from poqrl.hand.card import Card
+from poqrl.hand.equity import equity, Equity
+from poqrl.hand.hand import Hand
+
+
+def test_equity_river():
+    board = Hand(hand_hash="2s7sTh9dJc")
+    assert equity([Hand(hand_hash="AsKs"), Hand(hand_hash="8c8d")], board) == [
+        Equity(win=0.0, tie=0.0, loss=1.0, share=0.0),
+        Equity(win=1.0, tie=0.0, loss=0.0, share=1.0),
+    ]
+    # both players play the straight of the board
+    board = Hand(hand_hash="9d8c7hTsJs")
+    result = equity([Hand(hand_hash="2c3c"), Hand(hand_hash="2d4d")], board)
+    assert result[0] == result[1] == Equity(win=0.0, tie=1.0, loss=0.0, share=0.5)
+
+
+def test_equity_turn():
+    # the hearts of the river make the flush of the first player,
+    # but 9h makes a full house for the second player
+    board = Hand(hand_hash="2h7hTh9c")
+    result = equity([Hand(hand_hash="AhKd"), Hand(hand_hash="TcTd")], board)
+    assert result[0].win == pytest.approx(8 / 44)
+    assert result[1].win == pytest.approx(36 / 44)
+    for player in result:
+        assert player.win + player.tie + player.loss == pytest.approx(1.0)
+
+
+def test_equity_dead_cards():
+    board = Hand(hand_hash="2h7hTh9c")
+    holdings = [Hand(hand_hash="AhKd"), Hand(hand_hash="TcTd")]
+    result = equity(holdings, board, dead=[Card(card_hash="3h"), Card(card_hash="4h")])
+    assert result[0].win == pytest.approx(6 / 42)
+
+
+def test_equity_pool(monkeypatch):
+    holdings = [Hand(hand_hash="AsAh"), Hand(hand_hash="KsKh"), Hand(hand_hash="QdJd")]
+    board = Hand(hand_hash="2c7d")
+    expected = equity(holdings, board)
+    monkeypatch.setattr(equity_lib, "POOL_MIN_RUNOUTS", 1)
+    result = equity(holdings, board, n_workers=2)
+    for player, expected_player in zip(result, expected):
+        assert player.win == pytest.approx(expected_player.win)
+        assert player.share == pytest.approx(expected_player.share)
+
+
+def test_equity_wrong_arguments():
+    with pytest.raises(ValueError):
+        equity([Hand(hand_hash="AsAh"), Hand(hand_hash="AsKh")])
+    with pytest.raises(ValueError):
+        equity([Hand(hand_hash="AsAh")])
+    with pytest.raises(ValueError):
+        equity(
+            [Hand(hand_hash="AsAh"), Hand(hand_hash="KsKh")],
+            Hand(hand_hash="2c3c4c5c6c7c"),
+        )
@@ -0,0 +1,119 @@
+# pylint: skip-file
+import random
+
+import numpy as np
+import pytest
+from poqrl.hand.card import CARDS
+import poqrl.hand.evaluator as evaluator
+from poqrl.hand.evaluator import (
+    Evaluator,
+    lookup_evaluate,
+    evaluate_batch,
+    evaluate_holdings,
+)
+from poqrl.hand.hand import Hand, HAND_MIN_VAL, HAND_MAX_VAL
+
+
+@pytest.mark.parametrize(
+    "hand_hash",
+    [
+        "Ks7d9c9d8sKhQh",
+        "KsKd9c9d8sKhQh",
+        "Ks7h9c9h8hKhQh",
+        "As7d5c4d2s3hQh",
+        "KsKd9cKd8sKhQh",
+        "KsTs9s9d8sJsQs",
+        "7s8s9h4s7d4hKh",
+        "2s3s4s5sAs",
+        "AsAdKsKd2s2d",
+        "7c2d4h5s9c",
+    ],
+)
+def test_lookup_evaluate(hand_hash):
+    hand = Hand(hand_hash=hand_hash)
+    assert lookup_evaluate(hand.cards) == hand.scan_evaluate()
+
+
+@pytest.mark.parametrize("n_card", [5, 6, 7])
+def test_lookup_evaluate_random_hands(n_card):
+    rng = random.Random(n_card)
+    for _ in range(2000):
+        cards = rng.sample(CARDS, n_card)
+        value = lookup_evaluate(cards)
+        assert HAND_MIN_VAL <= value <= HAND_MAX_VAL
+        assert value == Hand(cards).scan_evaluate()
+
+
+def test_lookup_evaluate_wrong_size():
+    with pytest.raises(ValueError):
+        lookup_evaluate(list(CARDS[:4]))
+
+
+def test_evaluator_selection():
+    hand = Hand(hand_hash="Ks7h9c9h8hKhQh")
+    hand.evaluator = Evaluator.SCAN
+    assert hand.value == Hand(hand_hash="Ks7h9c9h8hKhQh").value
+
+
+@pytest.mark.parametrize("n_card", [5, 6, 7])
+def test_evaluate_batch(n_card):
+    rng = np.random.default_rng(n_card)
+    card_ids = np.argsort(rng.random((3000, 52)), axis=1)[:, :n_card]
+    # force some flushes
+    for i in range(100):
+        suited = 13 * (i % 4) + rng.choice(13, size=5, replace=False)
+        others = rng.permutation(np.setdiff1d(np.arange(52), suited))
+        card_ids[i] = np.concatenate([suited, others])[:n_card]
+    values = evaluate_batch(card_ids)
+    expected = [Hand([CARDS[id] for id in ids]).scan_evaluate() for ids in card_ids]
+    assert values.tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "card_ids", [np.zeros((3, 4), dtype=int), np.zeros((3, 7), dtype=int)]
+)
+def test_evaluate_batch_wrong_hands(card_ids):
+    with pytest.raises(ValueError):
+        evaluate_batch(card_ids)
+
+
+def test_evaluate_holdings():
+    rng = random.Random(11)
+    for _ in range(200):
+        cards = rng.sample(CARDS, 17)
+        board = cards[:5]
+        holdings = [cards[i : i + 2] for i in range(5, 17, 2)]
+        assert evaluate_holdings(board, holdings) == [
+            Hand(holding + board).scan_evaluate() for holding in holdings
+        ]
+
+
+def test_load_lookup_table(tmp_path, monkeypatch):
+    table = np.array(evaluator.lookup_table())
+    builds = []
+
+    def build():
+        builds.append(1)
+        return table
+
+    monkeypatch.setattr(evaluator, "build_lookup_table", build)
+    path = tmp_path / evaluator.LOOKUP_TABLE_NAME
+    assert np.array_equal(evaluator.load_lookup_table(path), table)
+    assert np.array_equal(evaluator.load_lookup_table(path), table)
+    assert len(builds) == 1
+    assert [file.name for file in tmp_path.iterdir()] == [path.name]
+    # tables of an older layout, or truncated, are rebuilt
+    np.save(path, table.T.copy())
+    assert np.array_equal(evaluator.load_lookup_table(path), table)
+    path.write_bytes(path.read_bytes()[:1000])
+    assert np.array_equal(evaluator.load_lookup_table(path), table)
+    assert len(builds) == 3
+
+
+def test_load_lookup_table_read_only(tmp_path, monkeypatch):
+    table = np.array(evaluator.lookup_table())
+    monkeypatch.setattr(evaluator, "build_lookup_table", lambda: table)
+    (tmp_path / "file").write_text("")
+    # the parent of the table is a file: the table cannot be saved
+    path = tmp_path / "file" / evaluator.LOOKUP_TABLE_NAME
+    assert np.array_equal(evaluator.load_lookup_table(path), table)
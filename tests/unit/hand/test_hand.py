@@ -149,3 +149,16 @@ def test_combination(hand_hash: str, hand_combination: str):
 )
 def test_hand_values(hand_hash1, hand_hash2):
     assert Hand(hand_hash=hand_hash1) > Hand(hand_hash=hand_hash2)
+
+
+@pytest.mark.parametrize(
+    "hand_hash", ["Ks7h9c9h8hKhQh", "KsTs9s9d8sJsQs", "As7d5c4d2s3hQh", "2s2dTd2cTc2h5s"]
+)
+def test_add_card_incremental_value(hand_hash):
+    full_hand = Hand(hand_hash=hand_hash)
+    hand = Hand(full_hand.cards[:2])
+    for n_card, card in enumerate(full_hand.cards[2:], 3):
+        hand.add_card(card)
+        if n_card >= 5:
+            assert hand.value == Hand(list(hand.cards)).scan_evaluate()
+    assert hand.value == full_hand.value
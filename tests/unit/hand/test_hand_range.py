@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from poqrl.hand.card import CARDS, Card
+from poqrl.hand.equity import equity
+from poqrl.hand.hand import Hand
+import poqrl.hand.hand_range as hand_range
+from poqrl.hand.hand_range import (
+    BOARD_SHOWDOWNS_CACHE,
+    COMBO_IDS,
+    N_COMBOS,
+    Range,
+    combo_index,
+    hand_vs_range_equity,
+)
+
+
+@pytest.mark.parametrize(
+    "notation, n_combos",
+    [
+        ("AA", 6),
+        ("AKs", 4),
+        ("AKo", 12),
+        ("AK", 16),
+        ("TT+", 30),
+        ("77-99", 18),
+        ("ATs+", 16),
+        ("A5s-A2s", 16),
+        ("AKs, TT+, A5s-A2s, KQo:0.5", 62),
+    ],
+)
+def test_range_parse(notation, n_combos):
+    assert len(Range.parse(notation)) == n_combos
+
+
+def test_range_parse_wrong_notation():
+    for notation in [
+        "AAs",
+        "AX",
+        "AK-QJ",
+        "AKs:x",
+        "A5s-A2o",
+        "A5s-A2",
+        "TT-76",
+        "TT-77s",
+        "TT+-77",
+        "A5-AA",
+    ]:
+        with pytest.raises(ValueError):
+            Range.parse(notation)
+
+
+def test_range_weights():
+    hand_range = Range.parse("AKs, KQo:0.5")
+    assert hand_range.weights.sum() == 4 + 6
+    ace_king = combo_index(Card(card_hash="As"), Card(card_hash="Ks"))
+    assert hand_range.weights[ace_king] == 1.0
+    assert set(COMBO_IDS[ace_king].tolist()) == {51, 50}
+    assert len(hand_range.remove_cards([Card(card_hash="As")])) == 3 + 12
+
+
+@pytest.mark.parametrize("board_hash", ["2c7dTh9sJc", "2c7dTh9s"])
+def test_hand_vs_range_equity(board_hash):
+    board = Hand(hand_hash=board_hash)
+    hand = Hand(hand_hash="AsKd")
+    villain = Range.parse("AKs, TT+, QJo:0.5")
+    total = weights = 0.0
+    for combo in np.flatnonzero(villain.weights):
+        cards = [CARDS[card_id] for card_id in COMBO_IDS[combo]]
+        if set(cards) & set(hand.cards + board.cards):
+            continue
+        share = equity([hand, Hand(cards)], board)[0].share
+        total += villain.weights[combo] * share
+        weights += villain.weights[combo]
+    assert hand_vs_range_equity(hand, villain, board) == pytest.approx(total / weights)
+
+
+def test_range_vs_range_equity():
+    board = Hand(hand_hash="2c7dTh9s")
+    full_range = Range(np.ones(N_COMBOS))
+    assert full_range.equity(full_range, board) == pytest.approx(0.5)
+    hero, villain = Range.parse("22+, AK"), Range.parse("AQs+, JJ+")
+    assert hero.equity(villain, board) + villain.equity(hero, board) == pytest.approx(
+        1.0
+    )
+    combo_equities = hero.combo_equities(villain, board)
+    assert np.isnan(combo_equities[hero.weights == 0]).all()
+    aces = combo_index(Card(card_hash="As"), Card(card_hash="Ah"))
+    assert combo_equities[aces] > 0.8
+
+
+def test_range_equity_direct_showdowns(monkeypatch):
+    board = Hand(hand_hash="2c7dTh")
+    dead = [Card(card_hash="Ks")]
+    hero, villain = Range.parse("AKs, 99"), Range.parse("22+, AQs+, KJo")
+    direct = hero.combo_equities(villain, board, dead)
+    hits = BOARD_SHOWDOWNS_CACHE.info().hits
+    monkeypatch.setattr(hand_range, "MAX_DIRECT_COMBOS", 0)
+    ranked = hero.combo_equities(villain, board, dead)
+    assert BOARD_SHOWDOWNS_CACHE.info().hits == hits + 1
+    assert np.allclose(direct, ranked, equal_nan=True)
+    assert np.isnan(direct[combo_index(*dead, Card(card_hash="As"))])
+
+
+def test_range_equity_needs_flop():
+    hero, villain = Range.parse("22+"), Range.parse("AK")
+    for board in [None, Hand(), Hand(hand_hash="2c7d")]:
+        with pytest.raises(ValueError):
+            hero.equity(villain, board)
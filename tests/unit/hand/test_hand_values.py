@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from poqrl.hand.card import Card
+from poqrl.hand.hand import Hand
+import poqrl.hand.evaluator as evaluator
+import poqrl.hand.hand_values as hand_values
+from poqrl.hand.hand_values import (
+    HAND_AVG_TABLES,
+    LazyHandTables,
+    set_data_dir,
+    save_hand_table,
+    open_hand_table,
+    read_hand_table_header,
+    hash_table_to_array,
+)
+from poqrl.hand.isomorphism import hand_indexer
+
+
+def test_hand_table_round_trip(tmp_path):
+    path = tmp_path / "values.table"
+    table = np.arange(169 * 3, dtype=np.float32).reshape(169, 3)
+    save_hand_table(path, table, 2)
+    header, offset = read_hand_table_header(path)
+    assert header["n_cards"] == 2
+    assert offset % 64 == 0
+    opened = open_hand_table(path)
+    assert opened.shape == (169, 3)
+    assert np.array_equal(opened, table)
+    with pytest.raises(ValueError):
+        opened[0, 0] = 1.0
+
+
+def test_hand_table_wrong_file(tmp_path):
+    path = tmp_path / "values.table"
+    with pytest.raises(ValueError):
+        save_hand_table(path, np.zeros(170), 2)
+    path.write_bytes(b"not a hand table")
+    with pytest.raises(ValueError):
+        open_hand_table(path)
+
+
+def test_hash_table_to_array():
+    hand = Hand(card_list=[Card(card_hash="As"), Card(card_hash="Kh")])
+    table = hash_table_to_array(2, {hand.light_hash: 0.5, "2c2d": 0.25})
+    assert table.shape == (169,)
+    assert table[hand.canonical_index] == 0.5
+    assert table[hand_indexer((2,)).index([Card(id=0), Card(id=13)])] == 0.25
+    assert np.isnan(table).sum() == 167
+
+
+def test_lazy_hand_tables():
+    loaded = []
+
+    def loader(n_cards):
+        loaded.append(n_cards)
+        return {"hand": n_cards}
+
+    tables = LazyHandTables("test", loader, range(2, 5))
+    assert loaded == []
+    assert 3 in tables and 5 not in tables
+    assert loaded == []
+    assert tables[3] == {"hand": 3}
+    assert tables[3] is tables[3]
+    assert loaded == [3]
+    assert tables.get(5) is None
+    assert list(tables) == [2, 3, 4]
+    tables.clear()
+    assert not tables.is_loaded(3)
+
+
+def test_set_data_dir(tmp_path):
+    previous_data_dir = hand_values.DATA_DIR
+    evaluator.lookup_table()
+    try:
+        set_data_dir(tmp_path)
+        assert evaluator._LOOKUP_TABLE is None
+        assert hand_values.HAND_VALUES_HASH_PATH == tmp_path / "hand_values"
+        values = np.full(169, np.nan)
+        values[7] = 0.5
+        hand_values.save_hand_value_table(2, values)
+        assert HAND_AVG_TABLES[2][7] == 0.5
+    finally:
+        set_data_dir(previous_data_dir)
+    assert not HAND_AVG_TABLES.is_loaded(2)
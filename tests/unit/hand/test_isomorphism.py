@@ -0,0 +1,61 @@
+# pylint: skip-file
+import random
+from itertools import combinations
+
+import pytest
+from poqrl.hand.card import Card, CARDS
+from poqrl.hand.hand import Hand
+from poqrl.hand.isomorphism import HandIndexer, hand_indexer
+
+
+@pytest.mark.parametrize(
+    "rounds, size",
+    [
+        ((2,), 169),
+        ((3,), 1755),
+        ((5,), 134459),
+        ((7,), 6009159),
+        ((2, 3), 1286792),
+        ((2, 5), 123156254),
+    ],
+)
+def test_indexer_size(rounds, size):
+    assert len(hand_indexer(rounds)) == size
+
+
+@pytest.mark.parametrize("rounds", [(3,), (2, 1)])
+def test_indexer_exhaustive(rounds):
+    indexer = HandIndexer(rounds)
+    indices = set()
+    for card_ids in combinations(range(52), sum(rounds)):
+        for first_round in combinations(card_ids, rounds[0]):
+            other_rounds = [id for id in card_ids if id not in first_round]
+            indices.add(
+                indexer.index([CARDS[id] for id in first_round + tuple(other_rounds)])
+            )
+    assert indices == set(range(len(indexer)))
+    for index in range(len(indexer)):
+        assert indexer.index(indexer.unindex(index)) == index
+
+
+@pytest.mark.parametrize("rounds", [(7,), (6,), (4,), (2, 5), (2, 3), (1, 1, 1, 1)])
+def test_indexer_suit_permutation(rounds):
+    rng = random.Random(sum(rounds))
+    indexer = hand_indexer(rounds)
+    for _ in range(300):
+        cards = rng.sample(CARDS, sum(rounds))
+        permutation = rng.sample(range(4), 4)
+        permuted = [Card(high=card.high, suit=permutation[card.suit]) for card in cards]
+        index, suits = indexer.index_with_permutation(indexer.round_masks(cards))
+        assert indexer.index(permuted) == indexer.index(cards) == index
+        canonical = [Card(high=card.high, suit=suits[card.suit]) for card in cards]
+        assert set(canonical) == set(indexer.unindex(index))
+
+
+def test_hand_canonical_index():
+    assert (
+        Hand(hand_hash="AsKs").canonical_index == Hand(hand_hash="KdAd").canonical_index
+    )
+    assert (
+        Hand(hand_hash="AsKs").canonical_index != Hand(hand_hash="AsKd").canonical_index
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from poqrl.hand.card import Card, cards_mask
+from poqrl.hand.equity import equity
+from poqrl.hand.hand import Hand
+from poqrl.hand.monte_carlo import (
+    MC_TOLERANCE,
+    monte_carlo,
+    mc_equity,
+    mc_hand_value,
+    sample_cards,
+)
+
+
+def test_sample_cards():
+    dead = [Card(id=0), Card(id=13), Card(id=51)]
+    draws = sample_cards(np.random.default_rng(0), cards_mask(dead), 5, 1000)
+    assert draws.shape == (1000, 5)
+    assert all(len(set(row)) == 5 for row in draws.tolist())
+    assert not np.isin(draws, [0, 13, 51]).any()
+    with pytest.raises(ValueError):
+        sample_cards(np.random.default_rng(0), (1 << 50) - 1, 3, 10)
+
+
+def test_monte_carlo_stops():
+    def sample(rng, n_samples):
+        return rng.normal(size=(1, n_samples))
+
+    estimate = monte_carlo(sample, tolerance=0.01, block_size=1000, seed=0)[0]
+    assert estimate.standard_error <= 0.01
+    assert estimate.n_samples % 1000 == 0
+    low, high = estimate.interval
+    assert low < estimate.mean < high
+    estimate = monte_carlo(sample, tolerance=0.0, max_samples=2500, block_size=1000)[0]
+    assert estimate.n_samples == 2500
+    estimate = monte_carlo(sample, tolerance=0.0, time_budget=0.0, block_size=1000)[0]
+    assert estimate.n_samples == 1000
+
+
+def test_mc_hand_value():
+    hand = Hand(hand_hash="AsKs2c3d")
+    estimate = mc_hand_value(hand.cards, seed=7)
+    assert mc_hand_value(hand.cards, seed=7) == estimate
+    low, high = estimate.interval
+    expected = hand.compute_7cards_hand_average_value()
+    assert low - estimate.standard_error < expected < high + estimate.standard_error
+    assert hand.compute_mc_avg_value(n_samples=1000, seed=7) == (
+        mc_hand_value(hand.cards, 0.0, np.inf, seed=7, max_samples=1000).mean
+    )
+
+
+def test_compute_mc_avg_value_reproducible():
+    # the default estimate only depends on the canonical hand
+    value = Hand(hand_hash="AsKs2c3d").compute_mc_avg_value()
+    assert Hand(hand_hash="Ks2dAs3c").compute_mc_avg_value() == value
+    assert Hand(hand_hash="AhKh2s3c").compute_mc_avg_value() == value
+    expected = Hand(hand_hash="AsKs2c3d").compute_7cards_hand_average_value()
+    assert abs(value - expected) < 4 * MC_TOLERANCE
+
+
+def test_mc_equity():
+    holdings = [Hand(hand_hash="AhKd"), Hand(hand_hash="TcTd")]
+    board = Hand(hand_hash="2h7h")
+    estimates = mc_equity(
+        [holding.cards for holding in holdings], board.cards, tolerance=2e-3, seed=3
+    )
+    exact = equity(holdings, board)
+    for estimate, player in zip(estimates, exact):
+        assert abs(estimate.mean - player.share) < 4 * estimate.standard_error
+    assert sum(estimate.mean for estimate in estimates) == pytest.approx(1.0)
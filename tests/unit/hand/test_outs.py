@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from poqrl.hand.card import Card
+from poqrl.hand.hand import Hand
+from poqrl.hand.outs import draw_features, next_card_distribution
+from poqrl.types.combination import Combination
+
+
+def test_next_card_distribution_values():
+    hand = Hand(hand_hash="AsKs7s2h9d")
+    distribution = next_card_distribution(hand)
+    assert distribution.value == hand.value
+    assert distribution.combination == Combination.HIGH
+    assert len(distribution.card_ids) == 47
+    for card_id, value, combination in zip(
+        distribution.card_ids, distribution.values, distribution.combinations
+    ):
+        next_hand = Hand(card_list=hand.cards + [Card(id=int(card_id))])
+        assert value == next_hand.value
+        assert Combination(combination).label == next_hand.get_combination()
+
+
+def test_next_card_outs():
+    # 9 flush cards, and 3 non spade threes and sevens for a straight
+    distribution = next_card_distribution(Hand(hand_hash="4s5s6sKs8d2c"))
+    assert distribution.combination == Combination.HIGH
+    probabilities = distribution.combination_probabilities
+    assert probabilities[Combination.QUINTE] == pytest.approx(6 / 46)
+    assert probabilities[Combination.FLUSH] == pytest.approx(9 / 46)
+    assert Card(card_hash="7h") in distribution.outs
+    assert Card(card_hash="Tc") not in distribution.outs
+    # the 16 non spade cards pairing the hand improve it too
+    assert distribution.out_probability == pytest.approx(31 / 46)
+
+
+def test_next_card_distribution_suit_isomorphism():
+    hand = Hand(hand_hash="4s5s6sKs8d2c")
+    # spades -> hearts, diamonds -> spades, clubs -> diamonds
+    isomorphic = Hand(hand_hash="4h5h6hKh8s2d")
+    suits = {"s": "h", "d": "s", "c": "d", "h": "c"}
+    outs = [
+        str(Card(card_hash=card.hash[0] + suits[card.hash[1]]))
+        for card in next_card_distribution(hand).outs
+    ]
+    assert sorted(outs) == sorted(
+        str(card) for card in next_card_distribution(isomorphic).outs
+    )
+    np.testing.assert_array_equal(draw_features(hand), draw_features(isomorphic))
+
+
+def test_next_card_distribution_hand_size():
+    with pytest.raises(ValueError):
+        next_card_distribution(Hand(hand_hash="AsKs7s2h"))
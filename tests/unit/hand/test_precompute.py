@@ -0,0 +1,108 @@
+from math import comb
+
+import numpy as np
+import pytest
+
+import poqrl.hand.hand_values as hand_values
+from poqrl.hand.hand import Hand
+from poqrl.hand.isomorphism import hand_indexer
+from poqrl.hand.precompute import (
+    BIN_EDGES,
+    HistogramJob,
+    PrecomputeJob,
+    aggregate_stats,
+    child_indices,
+    compute_hand_histograms,
+    compute_hand_rows,
+    histogram_quantiles,
+)
+
+
+def test_compute_hand_rows():
+    rows = compute_hand_rows(5, 1000, 1003)
+    assert rows.shape == (3, 12)
+    for index, row in zip(range(1000, 1003), rows):
+        hand = Hand(card_list=hand_indexer((5,)).unindex(index))
+        assert np.isclose(row[0], hand.compute_7cards_hand_average_value())
+        assert np.allclose(row[1:], hand.compute_quantile_values())
+
+
+def test_precompute_job_resumes(tmp_path):
+    # the last shard holds the last 8 canonical hands of 6 cards
+    job = PrecomputeJob(6, tmp_path, shard_size=481490)
+    assert job.shards()[-1] == (962980, 962988)
+    for start, stop in job.shards()[:-1]:
+        job.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        job.save_shard(start, stop, np.zeros((stop - start, 12)))
+    with pytest.raises(ValueError):
+        job.assemble()
+    assert list(job.run(n_workers=1)) == [(962980, 962988)]
+    assert job.pending_shards() == []
+    rows = job.assemble()
+    assert rows.shape == (962988, 12)
+    assert np.array_equal(rows[-8:], compute_hand_rows(6, 962980, 962988))
+
+    previous_data_dir = hand_values.DATA_DIR
+    try:
+        hand_values.set_data_dir(tmp_path)
+        job.save_tables()
+        assert hand_values.HAND_AVG_TABLES[6].shape == (962988,)
+        assert hand_values.HAND_7_QUANTILE_10_TABLES[6].shape == (962988, 11)
+    finally:
+        hand_values.set_data_dir(previous_data_dir)
+
+
+def test_compute_hand_histograms():
+    stats = compute_hand_histograms(6, 5000, 5100)
+    rows = compute_hand_rows(6, 5000, 5100)
+    assert stats["histograms"].sum(axis=1).tolist() == [46] * 100
+    assert np.allclose(stats["sums"] / 46, rows[:, 0])
+    assert np.array_equal(stats["minimums"], rows[:, 1])
+    assert np.array_equal(stats["maximums"], rows[:, -1])
+    quantiles = histogram_quantiles(stats)
+    assert np.array_equal(quantiles[:, [0, -1]], rows[:, [1, -1]])
+    assert np.abs(quantiles - rows[:, 1:]).max() <= BIN_EDGES[1] - BIN_EDGES[0]
+
+
+def test_histogram_job_save_tables(tmp_path, monkeypatch):
+    job = HistogramJob(tmp_path)
+    stats = compute_hand_histograms(6, 0, 2)
+    monkeypatch.setattr(
+        job, "level_stats", lambda min_cards, n_workers: [(6, stats), (5, stats)]
+    )
+    saved = []
+    monkeypatch.setattr(
+        hand_values, "save_hand_value_table", lambda n_cards, _: saved.append(n_cards)
+    )
+    monkeypatch.setattr(hand_values, "save_hand_quantile_table", lambda *_: None)
+    job.save_tables(5, max_cards=5)
+    assert saved == [5]
+
+
+def test_aggregate_stats():
+    children = child_indices(5, 2000, 2003)
+    assert children.shape == (3, 47)
+    child_rows, positions = np.unique(children, return_inverse=True)
+    shards = [compute_hand_histograms(6, index, index + 1) for index in child_rows]
+    child_stats = {
+        name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]
+    }
+    stats = aggregate_stats(5, child_stats, positions.reshape(children.shape))
+    expected = compute_hand_histograms(5, 2000, 2003)
+    for name in expected:
+        assert np.array_equal(stats[name], expected[name])
+
+
+def test_aggregated_histogram_quantiles():
+    # the 7 cards values of this 2 cards hand have gaps of several bins
+    children = child_indices(2, 139, 140)
+    child_rows, positions = np.unique(children, return_inverse=True)
+    shards = [compute_hand_histograms(3, index, index + 1) for index in child_rows]
+    child_stats = {
+        name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]
+    }
+    stats = aggregate_stats(2, child_stats, positions.reshape(children.shape))
+    rows = compute_hand_rows(2, 139, 140)
+    assert np.allclose(stats["sums"] / comb(50, 5), rows[:, 0])
+    quantiles = histogram_quantiles(stats)
+    assert np.abs(quantiles - rows[:, 1:]).max() < BIN_EDGES[1] - BIN_EDGES[0]
@@ -0,0 +1,43 @@
+import numpy as np
+
+import poqrl.hand.hand as hand_lib
+from poqrl.hand.hand import Hand
+from poqrl.hand.stats_cache import HAND_STATS_CACHE, HandStatsCache
+
+
+def test_hand_stats_cache():
+    cache = HandStatsCache(max_size=2)
+    computed = []
+
+    def compute(key):
+        computed.append(key)
+        return key * 10
+
+    assert cache.get(1, lambda: compute(1)) == 10
+    assert cache.get(2, lambda: compute(2)) == 20
+    assert cache.get(1, lambda: compute(1)) == 10
+    # 2 is the least recently used entry
+    assert cache.get(3, lambda: compute(3)) == 30
+    assert 2 not in cache and 1 in cache
+    assert computed == [1, 2, 3]
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (1, 3, 1, 2)
+    cache.resize(1)
+    assert len(cache) == 1 and cache.info().evictions == 2
+    cache.clear()
+    assert cache.info().misses == 0 and len(cache) == 0
+
+
+def test_board_quantiles_shared(monkeypatch):
+    monkeypatch.setattr(hand_lib, "HAND_7_QUANTILE_10_TABLES", {})
+    monkeypatch.setattr(hand_lib, "HAND_7_QUANTILE_10_VALUES", {5: None})
+    HAND_STATS_CACHE.clear()
+    board = Hand(hand_hash="2c7dTh9sJc")
+    # the same board texture, with the suits permuted
+    isomorphic_board = Hand(hand_hash="2h7cTs9dJh")
+    quantiles = board.quantile_values
+    assert np.array_equal(isomorphic_board.quantile_values, quantiles)
+    assert np.array_equal(quantiles, board.compute_quantile_values())
+    info = HAND_STATS_CACHE.info()
+    assert (info.hits, info.misses) == (1, 1)
+    HAND_STATS_CACHE.clear()
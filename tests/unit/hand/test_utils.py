@@ -1,4 +1,4 @@
-from poqrl.hand.utils import all_hands, all_hands_from_cards
+from poqrl.hand.utils import all_hands, all_hands_from_cards, all_completion_ids
 from poqrl.hand.card import Card
 
 
@@ -15,3 +15,12 @@ def test_all_hands_from_cards():
     for hand in all_hands_from_cards(7, cards):
         hand_dict[hand.hash] = 1
     assert len(hand_dict) == 17296
+
+
+def test_all_completion_ids():
+    cards = [Card(id=7), Card(id=35), Card(id=51), Card(id=3)]
+    completions = all_completion_ids(7, cards)
+    assert completions.shape == (17296, 7)
+    assert (completions[:, :4] == [7, 35, 51, 3]).all()
+    assert len({tuple(sorted(ids)) for ids in completions.tolist()}) == 17296
+    assert all(len(set(ids)) == 7 for ids in completions.tolist())
@@ -1,9 +1,13 @@
 from typing import List, Tuple, Union
+import numpy as np
 import pytest
 
 from poqrl.player.abstract_player import AbstractPlayer
+from poqrl.player.player_random import PlayerRandom
 from poqrl.table.abstract_table import AbstractTable
 from poqrl.hand.hand import Hand
+from poqrl.types.action import CHECK, FOLD, RAISE
+from poqrl.types.street import Street
 
 
 class PlayerMock(AbstractPlayer):
@@ -160,6 +164,40 @@ def test_assign_pots(player_config_list, side_pots, expected_stacks):
     assert stacks == expected_stacks
 
 
+def test_assign_pots_side_pot_player_out_of_hand():
+    player_list = []
+    for stack, hand_hash in [
+        (100, "Ks9hJdKdQs4h3d"),
+        (90, "Jh8s9cTc8c7s5d"),
+        (70, "8d9dTd8h7c5s6d"),
+    ]:
+        player = AbstractPlayer()
+        player.hand = Hand(hand_hash=hand_hash)
+        player.stack = stack
+        player_list.append(player)
+
+    table = AbstractTable(player_list=player_list)
+    player_list[2].is_in_hand = False
+    table.side_pots = [[10, [1, 2]]]
+    table.assign_pots()
+    assert [player.stack for player in table.players] == [100, 100, 70]
+
+
+def test_showdown_values():
+    board_hash = "Ks9hJd4h3d"
+    player_list = []
+    for hole_hash in ["KdQs", "Th8s", "4d4c", "Qh2h"]:
+        player = AbstractPlayer()
+        player.hand = Hand(hand_hash=hole_hash + board_hash)
+        player_list.append(player)
+    table = AbstractTable(player_list=player_list)
+    table.board = Hand(hand_hash=board_hash)
+    values = table.showdown_values(player_list)
+    assert values == {
+        player.position: player.hand.scan_evaluate() for player in player_list
+    }
+
+
 @pytest.mark.parametrize(
     "player_conf_list, expected_chips_committeds, expected_stacks, \
     expected_is_in_hands",
@@ -355,3 +393,60 @@ def test_play_hand(player_conf_list, expected_stacks):
 
     table.play_hand()
     assert [player.stack for player in player_list] == expected_stacks
+
+
+def make_flop_table():
+    np.random.seed(5)
+    table = AbstractTable([PlayerRandom() for _ in range(4)], seed=5)
+    table.update_button()
+    table.init_new_hand()
+    table.distribute_hands()
+    table.play_preflop()
+    table.gather_chips_and_continue()
+    table.distribute_flop()
+    return table
+
+
+def test_snapshot_restore():
+    table = make_flop_table()
+    snapshot = table.snapshot()
+    stacks = [player.stack for player in table.players]
+    hands = [player.hand.mask for player in table.players]
+    table.distribute_turn()
+    table.players[0].stack += 50
+    table.history[Street.TURN].append((0, CHECK, 0))
+
+    for _ in range(2):
+        table.restore(snapshot)
+        assert table.state == snapshot.state
+        assert len(table.board.cards) == 3
+        assert [player.stack for player in table.players] == stacks
+        assert [player.hand.mask for player in table.players] == hands
+        assert table.history[Street.TURN] == []
+        assert len(table.deck.deck) == 52 - 3 - 2 * table.n_players
+        table.distribute_turn()
+        table.distribute_river()
+        table.close_hand()
+
+
+def test_apply_action_undo():
+    table = AbstractTable([PlayerMock(100, []) for _ in range(3)])
+    table.button = table.n_players - 1
+    table.init_new_hand()
+    table.get_blends()
+    table.get_players_to_play(2)
+    state = table.state.copy()
+
+    assert table.apply_action(2, RAISE, Street.PREFLOP, 6) == RAISE
+    assert table.current_bet == 6
+    assert table.state.positions_to_play() == [0, 1]
+    assert table.apply_action(0, FOLD, Street.PREFLOP) == FOLD
+    assert table.state.positions_to_play() == [1]
+
+    table.undo()
+    assert table.players[0].is_in_hand
+    table.undo()
+    assert table.state == state
+    assert table.history[Street.PREFLOP] == []
+    with pytest.raises(IndexError):
+        table.undo()
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from poqrl.hand.card import CARDS
+from poqrl.player.batch_policy import BatchPolicy, BatchPolicyRandom
+from poqrl.player.player_random import PlayerRandom
+from poqrl.player.utils import ActionError
+from poqrl.table.abstract_table import AbstractTable
+from poqrl.table.batch_table import BatchTable
+from poqrl.types.action import CHECK
+
+# (stack, aggressivity, loosiness): the random players always take the same decision
+PLAYER_CONFS = [(30, 1, 1), (400, 0, 1), (12, 1, 0), (60, 0, 0), (25, 1, 1), (90, 0, 1)]
+
+
+class PresetDeck:
+    """Deck dealing given cards, one list of cards per hand"""
+
+    def __init__(self, hands):
+        self.hands = iter(hands)
+        self.cards = []
+
+    def shuffle(self):
+        self.cards = list(next(self.hands))
+
+    def distribute_random_card(self):
+        return self.cards.pop(0)
+
+
+def test_batch_table_matches_abstract_table():
+    n_tables, n_hands = 30, 12
+    policies = [
+        BatchPolicyRandom(stack, aggressivity=aggressivity, loosiness=loosiness)
+        for stack, aggressivity, loosiness in PLAYER_CONFS
+    ]
+    batch_table = BatchTable(policies, n_tables, seed=3)
+    rng = np.random.default_rng(5)
+    deals = [
+        rng.random((n_tables, 52)).argsort(axis=1)[:, : 2 * len(PLAYER_CONFS) + 5]
+        for _ in range(n_hands)
+    ]
+    for cards in deals:
+        batch_table.play_hands(cards)
+    chips_won = batch_table.get_chips_won()
+
+    for table_index in range(n_tables):
+        players = [
+            PlayerRandom(stack, aggressivity=aggressivity, loosiness=loosiness)
+            for stack, aggressivity, loosiness in PLAYER_CONFS
+        ]
+        table = AbstractTable(players)
+        table.deck = PresetDeck(
+            [[CARDS[card_id] for card_id in cards[table_index]] for cards in deals]
+        )
+        for _ in range(n_hands):
+            table.play_hand()
+        assert [player.get_chips_won() for player in players] == chips_won[
+            table_index
+        ].tolist()
+        assert [player.stack for player in players] == batch_table.stacks[
+            table_index
+        ].tolist()
+    assert chips_won.sum() == 0
+
+
+def test_batch_table_random_deals():
+    policies = [BatchPolicyRandom(seed=seed) for seed in range(4)]
+    table = BatchTable(policies, 50, seed=0)
+    for _ in range(5):
+        table.play_hands()
+    assert table.get_chips_won().sum() == 0
+    assert (table.action_counts.sum(axis=(1, 2)) > 0).all()
+
+
+class PolicyCheck(BatchPolicy):
+    def act(self, table, tables, position, street):
+        return np.full(len(tables), CHECK.id), np.zeros(len(tables))
+
+
+def test_batch_table_action_error():
+    table = BatchTable(
+        [BatchPolicyRandom(aggressivity=1, loosiness=1), PolicyCheck(), PolicyCheck()],
+        4,
+    )
+    with pytest.raises(ActionError):
+        table.play_hands()
@@ -0,0 +1,47 @@
+import pickle
+
+from poqrl.table.game_state import GameState
+
+
+def make_state():
+    state = GameState(4)
+    state.stacks = [100, 0, 50, 200]
+    state.is_in_hand = [True, True, False, True]
+    return state
+
+
+def test_set_players_to_play():
+    state = make_state()
+    state.set_players_to_play(3)
+    assert state.positions_to_play() == [3, 0]
+    state.set_players_to_play(3, exclude_starter=1)
+    assert state.positions_to_play() == [0]
+
+
+def test_pop_next_to_play():
+    state = GameState(4)
+    state.stacks = [10] * 4
+    state.set_players_to_play(2)
+    order = []
+    while state.to_play:
+        order.append(state.pop_next_to_play())
+    assert order == [2, 3, 0, 1]
+
+
+def test_copy_is_independent():
+    state = make_state()
+    state.side_pots = [[30, [0, 3]]]
+    copy = state.copy()
+    assert copy == state
+    copy.stacks[0] = 0
+    copy.side_pots[0][1].append(1)
+    assert state.stacks[0] == 100
+    assert state.side_pots == [[30, [0, 3]]]
+    assert copy != state
+
+
+def test_dict_and_pickle_round_trip():
+    state = make_state()
+    state.set_players_to_play(1)
+    assert GameState.from_dict(state.to_dict()) == state
+    assert pickle.loads(pickle.dumps(state)) == state
@@ -0,0 +1,62 @@
+import numpy as np
+
+from poqrl.player.player_random import PlayerRandom
+from poqrl.player.player_tracked import PlayerTracked
+from poqrl.training.simulation import run_simulation
+from poqrl.types.action import CALL, CHECK, FOLD, RAISE
+
+
+class PlayerTrackedRandom(PlayerTracked):
+    def get_action(self, street, on_bet):
+        if on_bet:
+            return [CALL, FOLD, RAISE][self.random.randint(3)]
+        return [CHECK, RAISE][self.random.randint(2)]
+
+    def get_amount_to_raise(self, street, from_bet):
+        return max(2 * self.table.current_bet - self.table.previous_bet, 2)
+
+    def close_hand(self):
+        pass
+
+
+def players():
+    return [
+        PlayerTrackedRandom(100, name="tracked"),
+        PlayerRandom(name="random 1"),
+        PlayerRandom(name="random 2"),
+    ]
+
+
+def test_run_simulation_reproducible():
+    report = run_simulation(players(), 250, seed=4, n_workers=1, chunk_size=40)
+    assert report.n_hands == 250
+    assert sum(report.chips_won) == 0
+    assert report.trackers[0]["PREFLOP"]["total"] > 0
+    assert list(report.trackers) == [0]
+    parallel_report = run_simulation(players(), 250, seed=4, n_workers=2, chunk_size=40)
+    assert parallel_report == report
+    assert run_simulation(players(), 250, seed=5, n_workers=1, chunk_size=40) != report
+
+
+def test_run_simulation_history():
+    report = run_simulation(players(), 30, seed=1, n_workers=1, keep_history=True)
+    assert len(report.histories) == 30
+    n_actions = sum(
+        len(actions) for history in report.histories for actions in history.values()
+    )
+    assert n_actions == sum(counts["total"] for counts in report.action_counts)
+
+
+def test_run_simulation_keeps_global_generator():
+    np.random.seed(3)
+    expected = np.random.random_sample()
+    np.random.seed(3)
+    run_simulation(players(), 20, seed=2)
+    assert np.random.random_sample() == expected
+
+
+def test_run_simulation_plays_players_in_place():
+    table_players = players()
+    report = run_simulation(table_players, 20, seed=2, chunk_size=20)
+    assert [player.get_chips_won() for player in table_players] == report.chips_won
+    assert all(player.rng is None for player in table_players)